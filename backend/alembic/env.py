@@ -6,6 +6,7 @@ import os
 from logging.config import fileConfig
 
 from alembic import context
+from alembic.operations import ops
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
@@ -42,6 +43,26 @@ target_metadata = MappedBase.metadata
 alembic_config.set_main_option('sqlalchemy.url', SQLALCHEMY_DATABASE_URL.render_as_string(hide_password=False))
 
 
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    # 仅在指定数据库中创建的索引（Index.ddl_if，例如 pg_trgm GIN 索引、MySQL ngram 全文索引），不在其他数据库中生成迁移
+    if type_ == 'index' and not reflected:
+        ddl_if = getattr(obj, '_ddl_if', None)
+        if ddl_if is not None and ddl_if.dialect is not None:
+            return ddl_if.dialect == context.get_context().dialect.name
+    return True
+
+
+def uses_pg_trgm(operations: list[ops.MigrateOperation]) -> bool:
+    # 是否创建了依赖 pg_trgm 扩展的三元组索引
+    for operation in operations:
+        if isinstance(operation, ops.OpContainer) and uses_pg_trgm(operation.ops):
+            return True
+        if isinstance(operation, ops.CreateIndexOp):
+            if 'gin_trgm_ops' in (operation.kw.get('postgresql_ops') or {}).values():
+                return True
+    return False
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -63,6 +84,7 @@ def run_migrations_offline():
         compare_type=True,
         compare_server_default=True,
         transaction_per_migration=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -77,6 +99,10 @@ def do_run_migrations(connection: Connection) -> None:
             if script.upgrade_ops.is_empty():
                 directives[:] = []
                 print('\nNo changes in model detected')
+                return
+            # 三元组索引依赖 pg_trgm 扩展，在迁移中先创建扩展，而不是每次执行迁移时隐式创建
+            if connection.dialect.name == 'postgresql' and uses_pg_trgm(script.upgrade_ops.ops):
+                script.upgrade_ops.ops.insert(0, ops.ExecuteSQLOp('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
 
     context.configure(
         connection=connection,
@@ -84,6 +110,7 @@ def do_run_migrations(connection: Connection) -> None:
         compare_type=True,
         compare_server_default=True,
         transaction_per_migration=True,
+        include_object=include_object,
         process_revision_directives=process_revision_directives,
     )
 
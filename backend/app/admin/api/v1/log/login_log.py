@@ -6,12 +6,20 @@ from fastapi import APIRouter, Depends, Query
 
 from backend.app.admin.schema.login_log import DeleteLoginLogParam, GetLoginLogDetail
 from backend.app.admin.service.login_log_service import login_log_service
-from backend.common.pagination import DependsPagination, PageData, paging_data
+from backend.common.pagination import (
+    CursorPageData,
+    DependsCursorPagination,
+    DependsPagination,
+    PageData,
+    cursor_paging_data,
+    paging_data,
+)
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.core.conf import settings
+from backend.database.db import CurrentReadSession
 
 router = APIRouter()
 
@@ -25,13 +33,33 @@ router = APIRouter()
     ],
 )
 async def get_login_logs_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     username: Annotated[str | None, Query(description='用户名')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
     ip: Annotated[str | None, Query(description='IP 地址')] = None,
 ) -> ResponseSchemaModel[PageData[GetLoginLogDetail]]:
     log_select = await login_log_service.get_select(username=username, status=status, ip=ip)
-    page_data = await paging_data(db, log_select)
+    page_data = await paging_data(db, log_select, settings.PAGINATION_LOG_TOTAL_MODE)
+    return response_base.success(data=page_data)
+
+
+@router.get(
+    '/cursor',
+    summary='游标分页获取登录日志',
+    description='基于游标分页，不统计总数，适用于数据量较大时的顺序翻页',
+    dependencies=[
+        DependsJwtAuth,
+        DependsCursorPagination,
+    ],
+)
+async def get_login_logs_cursor(
+    db: CurrentReadSession,
+    username: Annotated[str | None, Query(description='用户名')] = None,
+    status: Annotated[int | None, Query(description='状态')] = None,
+    ip: Annotated[str | None, Query(description='IP 地址')] = None,
+) -> ResponseSchemaModel[CursorPageData[GetLoginLogDetail]]:
+    log_select = await login_log_service.get_select(username=username, status=status, ip=ip)
+    page_data = await cursor_paging_data(db, log_select, 'created_time', 'id')
     return response_base.success(data=page_data)
 
 
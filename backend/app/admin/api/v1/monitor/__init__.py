@@ -2,12 +2,22 @@
 # -*- coding: utf-8 -*-
 from fastapi import APIRouter
 
+from backend.app.admin.api.v1.monitor.cache import router as cache_router
+from backend.app.admin.api.v1.monitor.database import router as database_router
 from backend.app.admin.api.v1.monitor.online import router as token_router
+from backend.app.admin.api.v1.monitor.opera_log import router as opera_log_router
+from backend.app.admin.api.v1.monitor.password_hash import router as password_hash_router
 from backend.app.admin.api.v1.monitor.redis import router as redis_router
 from backend.app.admin.api.v1.monitor.server import router as server_router
+from backend.app.admin.api.v1.monitor.writer import router as writer_router
 
 router = APIRouter(prefix='/monitors')
 
 router.include_router(redis_router, prefix='/redis', tags=['redis监控'])
 router.include_router(server_router, prefix='/server', tags=['服务器监控'])
+router.include_router(cache_router, prefix='/cache', tags=['缓存监控'])
+router.include_router(database_router, prefix='/database', tags=['数据库监控'])
 router.include_router(token_router, prefix='/sessions', tags=['会话监控'])
+router.include_router(writer_router, prefix='/writers', tags=['日志写入监控'])
+router.include_router(password_hash_router, prefix='/password-hash', tags=['密码哈希监控'])
+router.include_router(opera_log_router, prefix='/opera-logs', tags=['操作日志统计'])
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import APIRouter
+
+from backend.common.response.response_schema import ResponseModel, response_base
+from backend.common.security.jwt import user_local_cache
+from backend.common.security.rbac import DependsRBAC
+from backend.utils.request_parse import (
+    ip_location_local_cache,
+    ip_location_negative_cache,
+    user_agent_local_cache,
+)
+
+router = APIRouter()
+
+
+@router.get('', summary='进程内缓存监控', dependencies=[DependsRBAC])
+async def get_cache_info() -> ResponseModel:
+    data = {
+        'jwt_user': user_local_cache.stats(),
+        'ip_location': ip_location_local_cache.stats(),
+        'ip_location_negative': ip_location_negative_cache.stats(),
+        'user_agent': user_agent_local_cache.stats(),
+    }
+    return response_base.success(data=data)
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import APIRouter
+
+from backend.common.response.response_schema import ResponseModel, response_base
+from backend.common.security.rbac import DependsRBAC
+from backend.database.db import async_engine_pool_metrics, async_read_engine_pool_metrics
+
+router = APIRouter()
+
+
+@router.get('', summary='数据库连接池监控', dependencies=[DependsRBAC])
+async def get_database_info() -> ResponseModel:
+    data = {
+        'primary': async_engine_pool_metrics.stats(),
+    }
+    if async_read_engine_pool_metrics is not None:
+        data['replica'] = async_read_engine_pool_metrics.stats()
+    return response_base.success(data=data)
@@ -9,7 +9,13 @@ from fastapi import APIRouter, Depends, Path, Query, Request
 from backend.app.admin.schema.token import GetTokenDetail
 from backend.common.enums import StatusType
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
-from backend.common.security.jwt import DependsJwtAuth, jwt_decode, revoke_token, superuser_verify
+from backend.common.security.jwt import (
+    DependsJwtAuth,
+    get_session_generation_key,
+    jwt_decode,
+    revoke_token,
+    superuser_verify,
+)
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
 from backend.core.conf import settings
@@ -22,8 +28,40 @@ router = APIRouter()
 async def get_sessions(
     username: Annotated[str | None, Query(description='用户名')] = None,
 ) -> ResponseSchemaModel[list[GetTokenDetail]]:
-    token_keys = await redis_client.keys(f'{settings.TOKEN_REDIS_PREFIX}:*')
+    token_keys = [key async for key in redis_client.scan_iter(match=f'{settings.TOKEN_REDIS_PREFIX}:*')]
     online_clients = await redis_client.smembers(settings.TOKEN_ONLINE_REDIS_PREFIX)
+    # token 可能在扫描后过期，仅保留仍存在的 token
+    tokens = [token for token in await redis_client.mget(token_keys) if token] if token_keys else []
+    token_payloads = [jwt_decode(token) for token in tokens]
+    user_ids = list({token_payload.id for token_payload in token_payloads})
+    generation_keys = [f'{settings.TOKEN_GENERATION_REDIS_PREFIX}:{user_id}' for user_id in user_ids]
+    generations = {
+        user_id: int(generation or 0)
+        for user_id, generation in zip(user_ids, await redis_client.mget(generation_keys) if user_ids else [])
+    }
+    # 排除已通过令牌代数整体吊销的 token，撤销时保留的会话除外
+    revoked = [
+        token_payload for token_payload in token_payloads if token_payload.generation != generations[token_payload.id]
+    ]
+    session_generation_keys = [
+        get_session_generation_key(token_payload.id, token_payload.session_uuid) for token_payload in revoked
+    ]
+    kept_generations = await redis_client.mget(session_generation_keys) if session_generation_keys else []
+    kept_sessions = {
+        token_payload.session_uuid
+        for token_payload, kept in zip(revoked, kept_generations)
+        if kept is not None and int(kept) == generations[token_payload.id]
+    }
+    token_payloads = [
+        token_payload
+        for token_payload in token_payloads
+        if token_payload.generation == generations[token_payload.id] or token_payload.session_uuid in kept_sessions
+    ]
+    extra_info_keys = [
+        f'{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{token_payload.id}:{token_payload.session_uuid}'
+        for token_payload in token_payloads
+    ]
+    extra_infos = await redis_client.mget(extra_info_keys) if extra_info_keys else []
     data: list[GetTokenDetail] = []
 
     def append_token_detail() -> None:
@@ -41,9 +79,7 @@ async def get_sessions(
             )
         )
 
-    for key in token_keys:
-        token = await redis_client.get(key)
-        token_payload = jwt_decode(token)
+    for token_payload, extra_info in zip(token_payloads, extra_infos):
         user_id = token_payload.id
         session_uuid = token_payload.session_uuid
         token_detail = GetTokenDetail(
@@ -59,7 +95,6 @@ async def get_sessions(
             last_login_time='未知',
             expire_time=token_payload.expire_time,
         )
-        extra_info = await redis_client.get(f'{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}')
         if extra_info:
             extra_info = json.loads(extra_info)
             # 排除 swagger 登录生成的 token
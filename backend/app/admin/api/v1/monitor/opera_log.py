@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from backend.app.admin.service.opera_log_rollup_service import opera_log_rollup_service
+from backend.common.response.response_schema import ResponseModel, response_base
+from backend.common.security.rbac import DependsRBAC
+
+router = APIRouter()
+
+
+@router.get('', summary='操作日志请求量及耗时趋势', dependencies=[DependsRBAC])
+async def get_opera_log_series(
+    start_time: Annotated[datetime | None, Query(description='开始时间，默认为结束时间前一小时')] = None,
+    end_time: Annotated[datetime | None, Query(description='结束时间，默认为当前时间')] = None,
+    interval: Annotated[int, Query(ge=1, le=1440, description='统计间隔（分钟）')] = 1,
+    path: Annotated[str | None, Query(description='路由路径')] = None,
+    method: Annotated[str | None, Query(description='请求方法')] = None,
+) -> ResponseModel:
+    data = await opera_log_rollup_service.get_series(
+        start_time=start_time,
+        end_time=end_time,
+        interval=interval,
+        path=path,
+        method=method,
+    )
+    return response_base.success(data=data)
+
+
+@router.get('/endpoints', summary='操作日志接口请求量及耗时统计', dependencies=[DependsRBAC])
+async def get_opera_log_endpoints(
+    start_time: Annotated[datetime | None, Query(description='开始时间，默认为结束时间前一小时')] = None,
+    end_time: Annotated[datetime | None, Query(description='结束时间，默认为当前时间')] = None,
+    method: Annotated[str | None, Query(description='请求方法')] = None,
+) -> ResponseModel:
+    data = await opera_log_rollup_service.get_endpoints(start_time=start_time, end_time=end_time, method=method)
+    return response_base.success(data=data)
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import APIRouter
+
+from backend.common.response.response_schema import ResponseModel, response_base
+from backend.common.security.password import password_hash_service
+from backend.common.security.rbac import DependsRBAC
+
+router = APIRouter()
+
+
+@router.get('', summary='密码哈希进程池监控', dependencies=[DependsRBAC])
+async def get_password_hash_info() -> ResponseModel:
+    return response_base.success(data=password_hash_service.stats())
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import APIRouter
+
+from backend.common.response.response_schema import ResponseModel, response_base
+from backend.common.security.rbac import DependsRBAC
+from backend.middleware.opera_log_middleware import opera_log_writer
+
+router = APIRouter()
+
+
+@router.get('', summary='日志批量写入监控', dependencies=[DependsRBAC])
+async def get_writer_info() -> ResponseModel:
+    data = {
+        'opera_log': opera_log_writer.stats(),
+    }
+    return response_base.success(data=data)
@@ -17,7 +17,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 
 router = APIRouter()
 
@@ -59,7 +59,7 @@ async def get_data_rule(
     ],
 )
 async def get_data_rules_paged(
-    db: CurrentSession, name: Annotated[str | None, Query(description='规则名称')] = None
+    db: CurrentReadSession, name: Annotated[str | None, Query(description='规则名称')] = None
 ) -> ResponseSchemaModel[PageData[GetDataRuleDetail]]:
     data_rule_select = await data_rule_service.get_select(name=name)
     page_data = await paging_data(db, data_rule_select)
@@ -18,7 +18,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 
 router = APIRouter()
 
@@ -54,7 +54,7 @@ async def get_data_scope_rules(
     ],
 )
 async def get_data_scopes_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     name: Annotated[str | None, Query(description='范围名称')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
 ) -> ResponseSchemaModel[PageData[GetDataScopeDetail]]:
@@ -19,7 +19,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 
 router = APIRouter()
 
@@ -59,7 +59,7 @@ async def get_role(pk: Annotated[int, Path(description='角色 ID')]) -> Respons
     ],
 )
 async def get_roles_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     name: Annotated[str | None, Query(description='角色名称')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
 ) -> ResponseSchemaModel[PageData[GetRoleDetail]]:
@@ -19,7 +19,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 
 router = APIRouter()
 
@@ -53,7 +53,7 @@ async def get_user_roles(pk: Annotated[int, Path(description='用户 ID')]) -> R
     ],
 )
 async def get_users_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     dept: Annotated[int | None, Query(description='部门 ID')] = None,
     username: Annotated[str | None, Query(description='用户名')] = None,
     phone: Annotated[str | None, Query(description='手机号')] = None,
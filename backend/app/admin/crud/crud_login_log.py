@@ -7,6 +7,8 @@ from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import LoginLog
 from backend.app.admin.schema.login_log import CreateLoginLogParam
+from backend.database.bulk import build_rows, bulk_insert, get_table_columns
+from backend.database.search import contains
 
 
 class CRUDLoginLog(CRUDPlus[LoginLog]):
@@ -21,16 +23,17 @@ class CRUDLoginLog(CRUDPlus[LoginLog]):
         :param ip: IP 地址
         :return:
         """
+        whereclause = []
         filters = {}
 
         if username is not None:
-            filters['username__like'] = f'%{username}%'
+            whereclause.append(contains(self.model.username, username))
         if status is not None:
             filters['status'] = status
         if ip is not None:
-            filters['ip__like'] = f'%{ip}%'
+            whereclause.append(contains(self.model.ip, ip))
 
-        return await self.select_order('created_time', 'desc', **filters)
+        return await self.select_order('created_time', 'desc', *whereclause, **filters)
 
     async def create(self, db: AsyncSession, obj: CreateLoginLogParam) -> None:
         """
@@ -40,7 +43,20 @@ class CRUDLoginLog(CRUDPlus[LoginLog]):
         :param obj: 创建登录日志参数
         :return:
         """
-        await self.create_model(db, obj, commit=True)
+        await self.bulk_create(db, [obj])
+        await db.commit()
+
+    async def bulk_create(self, db: AsyncSession, objs: list[CreateLoginLogParam]) -> None:
+        """
+        批量创建登录日志
+
+        :param db: 数据库会话
+        :param objs: 创建登录日志参数列表
+        :return:
+        """
+        # 仅追加写入，跳过 ORM 对象实例化，直接转换为行数据
+        columns = await get_table_columns(db, LoginLog.__table__)
+        await bulk_insert(db, LoginLog.__table__, build_rows(LoginLog.__table__, objs, columns))
 
     async def delete(self, db: AsyncSession, pks: list[int]) -> int:
         """
@@ -7,6 +7,8 @@ from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import OperaLog
 from backend.app.admin.schema.opera_log import CreateOperaLogParam
+from backend.database.bulk import build_rows, bulk_insert, get_table_columns
+from backend.database.search import contains
 
 
 class CRUDOperaLogDao(CRUDPlus[OperaLog]):
@@ -21,16 +23,17 @@ class CRUDOperaLogDao(CRUDPlus[OperaLog]):
         :param ip: IP 地址
         :return:
         """
+        whereclause = []
         filters = {}
 
         if username is not None:
-            filters['username__like'] = f'%{username}%'
+            whereclause.append(contains(self.model.username, username))
         if status is not None:
             filters['status__eq'] = status
         if ip is not None:
-            filters['ip__like'] = f'%{ip}%'
+            whereclause.append(contains(self.model.ip, ip))
 
-        return await self.select_order('created_time', 'desc', **filters)
+        return await self.select_order('created_time', 'desc', *whereclause, **filters)
 
     async def create(self, db: AsyncSession, obj: CreateOperaLogParam) -> None:
         """
@@ -40,7 +43,7 @@ class CRUDOperaLogDao(CRUDPlus[OperaLog]):
         :param obj: 操作日志创建参数
         :return:
         """
-        await self.create_model(db, obj)
+        await self.bulk_create(db, [obj])
 
     async def bulk_create(self, db: AsyncSession, objs: list[CreateOperaLogParam]) -> None:
         """
@@ -50,7 +53,9 @@ class CRUDOperaLogDao(CRUDPlus[OperaLog]):
         :param objs: 操作日志创建参数列表
         :return:
         """
-        await self.create_models(db, objs)
+        # 仅追加写入，跳过 ORM 对象实例化，直接转换为行数据
+        columns = await get_table_columns(db, OperaLog.__table__)
+        await bulk_insert(db, OperaLog.__table__, build_rows(OperaLog.__table__, objs, columns))
 
     async def delete(self, db: AsyncSession, pks: list[int]) -> int:
         """
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import ColumnElement, Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy_crud_plus import CRUDPlus
+
+from backend.app.admin.model import OperaLogRollup
+
+
+class CRUDOperaLogRollup(CRUDPlus[OperaLogRollup]):
+    """操作日志汇总数据库操作类"""
+
+    async def get_by_node(self, db: AsyncSession, node: str, buckets: list[datetime]) -> Sequence[OperaLogRollup]:
+        """
+        获取写入节点指定时间的汇总
+
+        :param db: 数据库会话
+        :param node: 写入节点
+        :param buckets: 统计时间列表
+        :return:
+        """
+        return await self.select_models(db, node=node, bucket__in=buckets)
+
+    @staticmethod
+    def _where(
+        start_time: datetime, end_time: datetime, path: str | None, method: str | None
+    ) -> list[ColumnElement[bool]]:
+        whereclause = [OperaLogRollup.bucket >= start_time, OperaLogRollup.bucket < end_time]
+        if path is not None:
+            whereclause.append(OperaLogRollup.path == path)
+        if method is not None:
+            whereclause.append(OperaLogRollup.method == method)
+        return whereclause
+
+    async def get_stats(
+        self,
+        db: AsyncSession,
+        keys: Sequence[ColumnElement],
+        start_time: datetime,
+        end_time: datetime,
+        path: str | None,
+        method: str | None,
+    ) -> Sequence[Row]:
+        """
+        获取时间范围内的请求次数、耗时及耗时分位数草图
+
+        草图无法在数据库中合并，逐行返回后在应用内按维度合并；计数与草图在同一查询中读取，保证两者一致
+
+        :param db: 数据库会话
+        :param keys: 统计维度
+        :param start_time: 开始时间
+        :param end_time: 结束时间
+        :param path: 路由路径
+        :param method: 请求方法
+        :return: 维度字段及 count、error_count、cost_time_sum、cost_time_max、cost_time_sketch
+        """
+        stmt = select(
+            *keys,
+            OperaLogRollup.count,
+            OperaLogRollup.error_count,
+            OperaLogRollup.cost_time_sum,
+            OperaLogRollup.cost_time_max,
+            OperaLogRollup.cost_time_sketch,
+        ).where(*self._where(start_time, end_time, path, method))
+        result = await db.execute(stmt)
+        return result.all()
+
+
+opera_log_rollup_dao: CRUDOperaLogRollup = CRUDOperaLogRollup(OperaLogRollup)
@@ -14,7 +14,8 @@ from backend.app.admin.schema.user import (
     AddUserParam,
     UpdateUserParam,
 )
-from backend.common.security.jwt import get_hash_password
+from backend.common.security.password import password_hash_service
+from backend.database.search import contains
 from backend.utils.timezone import timezone
 
 
@@ -70,7 +71,7 @@ class CRUDUser(CRUDPlus[User]):
         :return:
         """
         salt = bcrypt.gensalt()
-        obj.password = get_hash_password(obj.password, salt)
+        obj.password = await password_hash_service.hash(obj.password, salt)
         dict_obj = obj.model_dump(exclude={'roles'})
         dict_obj.update({'salt': salt})
         new_user = self.model(**dict_obj)
@@ -180,7 +181,7 @@ class CRUDUser(CRUDPlus[User]):
         :return:
         """
         salt = bcrypt.gensalt()
-        new_pwd = get_hash_password(password, salt)
+        new_pwd = await password_hash_service.hash(password, salt)
         return await self.update_model(db, pk, {'password': new_pwd, 'salt': salt})
 
     async def get_list(self, dept: int | None, username: str | None, phone: str | None, status: int | None) -> Select:
@@ -193,20 +194,22 @@ class CRUDUser(CRUDPlus[User]):
         :param status: 用户状态
         :return:
         """
+        whereclause = []
         filters = {}
 
         if dept:
             filters['dept_id'] = dept
         if username:
-            filters['username__like'] = f'%{username}%'
+            whereclause.append(contains(self.model.username, username))
         if phone:
-            filters['phone_like'] = f'%{phone}%'
+            whereclause.append(contains(self.model.phone, phone))
         if status is not None:
             filters['status'] = status
 
         return await self.select_order(
             'id',
             'desc',
+            *whereclause,
             load_options=[
                 selectinload(self.model.dept).options(noload(Dept.parent), noload(Dept.children), noload(Dept.users)),
                 selectinload(self.model.roles).options(noload(Role.users), noload(Role.menus), noload(Role.scopes)),
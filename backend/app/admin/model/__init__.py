@@ -6,5 +6,6 @@ from backend.app.admin.model.dept import Dept
 from backend.app.admin.model.login_log import LoginLog
 from backend.app.admin.model.menu import Menu
 from backend.app.admin.model.opera_log import OperaLog
+from backend.app.admin.model.opera_log_rollup import OperaLogRollup
 from backend.app.admin.model.role import Role
 from backend.app.admin.model.user import User
@@ -2,12 +2,15 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, Index, String
 from sqlalchemy.dialects.mysql import LONGTEXT
 from sqlalchemy.dialects.postgresql import TEXT
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.common.model import DataClassBase, id_key
+from backend.core.conf import settings
+from backend.database.partition import partition_table_args
+from backend.database.search import search_indexes
 from backend.utils.timezone import timezone
 
 
@@ -15,11 +18,21 @@ class LoginLog(DataClassBase):
     """登录日志表"""
 
     __tablename__ = 'sys_login_log'
+    __table_args__ = (
+        Index('ix_sys_login_log_created_time_id', 'created_time', 'id'),
+        # MySQL 分区表不支持全文索引
+        *search_indexes('sys_login_log', 'username', 'ip', fulltext=not settings.LOG_TABLE_PARTITION_ENABLED),
+        {'comment': '登录日志表', **partition_table_args()},
+    )
 
-    id: Mapped[id_key] = mapped_column(init=False)
+    if settings.LOG_TABLE_PARTITION_ENABLED:
+        # 分区表的主键及唯一约束必须包含分区键，主键为 (id, created_time)，ID 由自增保证唯一
+        id: Mapped[id_key] = mapped_column(init=False, unique=False)
+    else:
+        id: Mapped[id_key] = mapped_column(init=False)
     user_uuid: Mapped[str] = mapped_column(String(50), comment='用户UUID')
     username: Mapped[str] = mapped_column(String(20), comment='用户名')
-    status: Mapped[int] = mapped_column(insert_default=0, comment='登录状态(0失败 1成功)')
+    status: Mapped[int] = mapped_column(index=True, insert_default=0, comment='登录状态(0失败 1成功)')
     ip: Mapped[str] = mapped_column(String(50), comment='登录IP地址')
     country: Mapped[str | None] = mapped_column(String(50), comment='国家')
     region: Mapped[str | None] = mapped_column(String(50), comment='地区')
@@ -31,5 +44,9 @@ class LoginLog(DataClassBase):
     msg: Mapped[str] = mapped_column(LONGTEXT().with_variant(TEXT, 'postgresql'), comment='提示消息')
     login_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), comment='登录时间')
     created_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), init=False, default_factory=timezone.now, comment='创建时间'
+        DateTime(timezone=True),
+        init=False,
+        default_factory=timezone.now,
+        primary_key=settings.LOG_TABLE_PARTITION_ENABLED,
+        comment='创建时间',
     )
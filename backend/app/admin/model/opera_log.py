@@ -2,12 +2,15 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, Index, String
 from sqlalchemy.dialects.mysql import JSON, LONGTEXT
 from sqlalchemy.dialects.postgresql import TEXT
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.common.model import DataClassBase, id_key
+from backend.core.conf import settings
+from backend.database.partition import partition_table_args
+from backend.database.search import search_indexes
 from backend.utils.timezone import timezone
 
 
@@ -15,8 +18,18 @@ class OperaLog(DataClassBase):
     """操作日志表"""
 
     __tablename__ = 'sys_opera_log'
+    __table_args__ = (
+        Index('ix_sys_opera_log_created_time_id', 'created_time', 'id'),
+        # MySQL 分区表不支持全文索引
+        *search_indexes('sys_opera_log', 'username', 'ip', fulltext=not settings.LOG_TABLE_PARTITION_ENABLED),
+        {'comment': '操作日志表', **partition_table_args()},
+    )
 
-    id: Mapped[id_key] = mapped_column(init=False)
+    if settings.LOG_TABLE_PARTITION_ENABLED:
+        # 分区表的主键及唯一约束必须包含分区键，主键为 (id, created_time)，ID 由自增保证唯一
+        id: Mapped[id_key] = mapped_column(init=False, unique=False)
+    else:
+        id: Mapped[id_key] = mapped_column(init=False)
     trace_id: Mapped[str] = mapped_column(String(32), comment='请求跟踪 ID')
     username: Mapped[str | None] = mapped_column(String(20), comment='用户名')
     method: Mapped[str] = mapped_column(String(20), comment='请求类型')
@@ -31,11 +44,17 @@ class OperaLog(DataClassBase):
     browser: Mapped[str | None] = mapped_column(String(50), comment='浏览器')
     device: Mapped[str | None] = mapped_column(String(50), comment='设备')
     args: Mapped[str | None] = mapped_column(JSON(), comment='请求参数')
-    status: Mapped[int] = mapped_column(comment='操作状态（0异常 1正常）')
+    status: Mapped[int] = mapped_column(index=True, comment='操作状态（0异常 1正常）')
     code: Mapped[str] = mapped_column(String(20), insert_default='200', comment='操作状态码')
     msg: Mapped[str | None] = mapped_column(LONGTEXT().with_variant(TEXT, 'postgresql'), comment='提示消息')
     cost_time: Mapped[float] = mapped_column(insert_default=0.0, comment='请求耗时（ms）')
+    query_count: Mapped[int] = mapped_column(insert_default=0, comment='SQL 执行次数')
+    query_cost_time: Mapped[float] = mapped_column(insert_default=0.0, comment='SQL 耗时（ms）')
     opera_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), comment='操作时间')
     created_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), init=False, default_factory=timezone.now, comment='创建时间'
+        DateTime(timezone=True),
+        init=False,
+        default_factory=timezone.now,
+        primary_key=settings.LOG_TABLE_PARTITION_ENABLED,
+        comment='创建时间',
     )
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.common.model import DataClassBase, id_key
+
+
+class OperaLogRollup(DataClassBase):
+    """操作日志分钟汇总表"""
+
+    __tablename__ = 'sys_opera_log_rollup'
+
+    id: Mapped[id_key] = mapped_column(init=False)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, comment='统计时间（分钟）')
+    node: Mapped[str] = mapped_column(String(64), comment='写入节点（主机名:进程 ID）')
+    path: Mapped[str] = mapped_column(String(500), comment='路由路径')
+    method: Mapped[str] = mapped_column(String(20), comment='请求方法')
+    code: Mapped[str] = mapped_column(String(20), comment='操作状态码')
+    count: Mapped[int] = mapped_column(comment='请求次数')
+    error_count: Mapped[int] = mapped_column(comment='异常次数')
+    cost_time_sum: Mapped[float] = mapped_column(comment='请求总耗时（ms）')
+    cost_time_max: Mapped[float] = mapped_column(comment='请求最大耗时（ms）')
+    cost_time_sketch: Mapped[dict[str, Any]] = mapped_column(JSON(), comment='请求耗时分位数草图')
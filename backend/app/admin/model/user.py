@@ -12,6 +12,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from backend.app.admin.model.m2m import sys_user_role
 from backend.common.model import Base, id_key
 from backend.database.db import uuid4_str
+from backend.database.search import search_indexes
 from backend.utils.timezone import timezone
 
 if TYPE_CHECKING:
@@ -22,6 +23,7 @@ class User(Base):
     """用户表"""
 
     __tablename__ = 'sys_user'
+    __table_args__ = (*search_indexes('sys_user', 'username', 'phone'), {'comment': '用户表'})
 
     id: Mapped[id_key] = mapped_column(init=False)
     uuid: Mapped[str] = mapped_column(String(50), init=False, default_factory=uuid4_str, unique=True)
@@ -5,6 +5,7 @@ from datetime import datetime
 from pydantic import ConfigDict, Field
 
 from backend.common.schema import SchemaBase
+from backend.utils.timezone import timezone
 
 
 class LoginLogSchemaBase(SchemaBase):
@@ -28,6 +29,8 @@ class LoginLogSchemaBase(SchemaBase):
 class CreateLoginLogParam(LoginLogSchemaBase):
     """创建登录日志参数"""
 
+    created_time: datetime = Field(default_factory=timezone.now, description='创建时间，登录时生成')
+
 
 class UpdateLoginLogParam(LoginLogSchemaBase):
     """更新登录日志参数"""
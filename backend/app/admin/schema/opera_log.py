@@ -7,6 +7,7 @@ from pydantic import ConfigDict, Field
 
 from backend.common.enums import StatusType
 from backend.common.schema import SchemaBase
+from backend.utils.timezone import timezone
 
 
 class OperaLogSchemaBase(SchemaBase):
@@ -30,12 +31,17 @@ class OperaLogSchemaBase(SchemaBase):
     code: str = Field(description='状态码')
     msg: str | None = Field(None, description='消息')
     cost_time: float = Field(description='耗时')
+    query_count: int = Field(0, description='SQL 执行次数')
+    query_cost_time: float = Field(0.0, description='SQL 耗时')
     opera_time: datetime = Field(description='操作时间')
 
 
 class CreateOperaLogParam(OperaLogSchemaBase):
     """创建操作日志参数"""
 
+    route: str | None = Field(None, description='路由路径，仅用于汇总统计，不写入日志表')
+    created_time: datetime = Field(default_factory=timezone.now, description='创建时间，请求结束时生成')
+
 
 class UpdateOperaLogParam(OperaLogSchemaBase):
     """更新操作日志参数"""
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from datetime import datetime
+from functools import cached_property
 from typing import Any
 
 from pydantic import ConfigDict, Field, HttpUrl, model_validator
@@ -93,6 +94,27 @@ class GetUserInfoWithRelationDetail(GetUserInfoDetail):
     dept: GetDeptDetail | None = Field(None, description='部门信息')
     roles: list[GetRoleWithRelationDetail] = Field(description='角色列表')
 
+    @cached_property
+    def perms(self) -> frozenset[str]:
+        """已启用菜单的权限标识集合，仅在首次访问时构建"""
+        return frozenset(
+            perm
+            for role in self.roles
+            for menu in role.menus
+            if menu and menu.perms and menu.status == StatusType.enable
+            for perm in menu.perms.split(',')
+        )
+
+    @cached_property
+    def has_enabled_role(self) -> bool:
+        """是否存在已启用的角色"""
+        return any(role.status == StatusType.enable for role in self.roles)
+
+    @cached_property
+    def has_menus(self) -> bool:
+        """角色是否已分配菜单"""
+        return any(len(role.menus) > 0 for role in self.roles)
+
 
 class GetCurrentUserInfoWithRelationDetail(GetUserInfoWithRelationDetail):
     """当前用户信息关联详情"""
@@ -22,8 +22,8 @@ from backend.common.security.jwt import (
     create_refresh_token,
     get_token,
     jwt_decode,
-    password_verify,
 )
+from backend.common.security.password import password_hash_service
 from backend.core.conf import settings
 from backend.database.db import async_db_session, uuid4_str
 from backend.database.redis import redis_client
@@ -50,7 +50,7 @@ class AuthService:
         if user.password is None:
             raise errors.AuthorizationError(msg='用户名或密码有误')
         else:
-            if not password_verify(password, user.password):
+            if not await password_hash_service.verify(password, user.password):
                 raise errors.AuthorizationError(msg='用户名或密码有误')
 
         if not user.status:
@@ -112,7 +112,7 @@ class AuthService:
                     browser=request.state.browser,
                     device=request.state.device,
                 )
-                refresh_token = await create_refresh_token(access_token.session_uuid, user.id, user.is_multi_login)
+                refresh_token = await create_refresh_token(access_token.session_uuid, user.id, access_token.generation)
                 response.set_cookie(
                     key=settings.COOKIE_REFRESH_TOKEN_KEY,
                     value=refresh_token.refresh_token,
@@ -171,21 +171,15 @@ class AuthService:
         :param request: FastAPI 请求对象
         :return:
         """
-        codes = set()
-        if request.user.is_superuser:
-            async with async_db_session.begin() as db:
-                menus = await menu_dao.get_all(db, None, None)
-                for menu in menus:
-                    if menu.perms:
-                        codes.add(*menu.perms.split(','))
-        else:
-            roles = request.user.roles
-            if roles:
-                for role in roles:
-                    for menu in role.menus:
-                        if menu.perms:
-                            codes.add(*menu.perms.split(','))
+        if not request.user.is_superuser:
+            return list(request.user.perms)
 
+        codes = set()
+        async with async_db_session.begin() as db:
+            menus = await menu_dao.get_all(db, None, None)
+            for menu in menus:
+                if menu.perms:
+                    codes.update(menu.perms.split(','))
         return list(codes)
 
     @staticmethod
@@ -206,9 +200,6 @@ class AuthService:
                 raise errors.NotFoundError(msg='用户不存在')
             elif not user.status:
                 raise errors.AuthorizationError(msg='用户已被锁定, 请联系统管理员')
-            if not user.is_multi_login:
-                if await redis_client.keys(match=f'{settings.TOKEN_REDIS_PREFIX}:{user.id}:*'):
-                    raise errors.ForbiddenError(msg='此用户已在异地登录，请重新登录并及时修改密码')
             new_token = await create_new_token(
                 refresh_token,
                 token_payload.session_uuid,
@@ -14,7 +14,7 @@ from backend.app.admin.schema.data_rule import (
 )
 from backend.common.exception import errors
 from backend.core.conf import settings
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, async_read_db_session
 from backend.utils.import_parse import dynamic_import_data_model
 
 
@@ -72,7 +72,7 @@ class DataRuleService:
     @staticmethod
     async def get_all() -> Sequence[DataRule]:
         """获取所有数据规则"""
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             data_rules = await data_rule_dao.get_all(db)
             return data_rules
 
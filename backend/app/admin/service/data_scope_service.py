@@ -13,9 +13,8 @@ from backend.app.admin.schema.data_scope import (
     UpdateDataScopeRuleParam,
 )
 from backend.common.exception import errors
-from backend.core.conf import settings
-from backend.database.db import async_db_session
-from backend.database.redis import redis_client
+from backend.common.security.jwt import invalidate_user_cache
+from backend.database.db import async_db_session, async_read_db_session
 
 
 class DataScopeService:
@@ -38,7 +37,7 @@ class DataScopeService:
     @staticmethod
     async def get_all() -> Sequence[DataScope]:
         """获取所有数据范围"""
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             data_scopes = await data_scope_dao.get_all(db)
             return data_scopes
 
@@ -98,10 +97,12 @@ class DataScopeService:
                 if await data_scope_dao.get_by_name(db, obj.name):
                     raise errors.ConflictError(msg='数据范围已存在')
             count = await data_scope_dao.update(db, pk, obj)
+            user_ids = set()
             for role in await data_scope.awaitable_attrs.roles:
                 for user in await role.awaitable_attrs.users:
-                    await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+                    user_ids.add(user.id)
+        await invalidate_user_cache(*user_ids)
+        return count
 
     @staticmethod
     async def update_data_scope_rule(*, pk: int, rule_ids: UpdateDataScopeRuleParam) -> int:
@@ -125,14 +126,16 @@ class DataScopeService:
         :return:
         """
         async with async_db_session.begin() as db:
-            count = await data_scope_dao.delete(db, obj.pks)
+            user_ids = set()
             for pk in obj.pks:
                 data_rule = await data_scope_dao.get(db, pk)
                 if data_rule:
                     for role in await data_rule.awaitable_attrs.roles:
                         for user in await role.awaitable_attrs.users:
-                            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+                            user_ids.add(user.id)
+            count = await data_scope_dao.delete(db, obj.pks)
+        await invalidate_user_cache(*user_ids)
+        return count
 
 
 data_scope_service: DataScopeService = DataScopeService()
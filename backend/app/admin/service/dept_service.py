@@ -8,9 +8,8 @@ from backend.app.admin.crud.crud_dept import dept_dao
 from backend.app.admin.model import Dept
 from backend.app.admin.schema.dept import CreateDeptParam, UpdateDeptParam
 from backend.common.exception import errors
-from backend.core.conf import settings
-from backend.database.db import async_db_session
-from backend.database.redis import redis_client
+from backend.common.security.jwt import invalidate_user_cache
+from backend.database.db import async_db_session, async_read_db_session
 from backend.utils.build_tree import get_tree_data
 
 
@@ -45,7 +44,7 @@ class DeptService:
         :param status: 状态
         :return:
         """
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             dept_select = await dept_dao.get_all(request, db, name, leader, phone, status)
             tree_data = get_tree_data(dept_select)
             return tree_data
@@ -109,9 +108,9 @@ class DeptService:
             if children:
                 raise errors.ConflictError(msg='部门下存在子部门，无法删除')
             count = await dept_dao.delete(db, pk)
-            for user in dept.users:
-                await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+            user_ids = [user.id for user in dept.users]
+        await invalidate_user_cache(*user_ids)
+        return count
 
 
 dept_service: DeptService = DeptService()
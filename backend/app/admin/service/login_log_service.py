@@ -7,9 +7,13 @@ from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.admin.crud.crud_login_log import login_log_dao
+from backend.app.admin.model import LoginLog
 from backend.app.admin.schema.login_log import CreateLoginLogParam, DeleteLoginLogParam
 from backend.common.log import log
-from backend.database.db import async_db_session
+from backend.core.conf import settings
+from backend.database.db import async_db_session, async_engine
+from backend.database.partition import RetentionResult, apply_retention
+from backend.utils.request_parse import parse_ip_info
 
 
 class LoginLogService:
@@ -51,6 +55,7 @@ class LoginLogService:
         :return:
         """
         try:
+            await parse_ip_info(request)
             obj = CreateLoginLogParam(
                 user_uuid=user_uuid,
                 username=username,
@@ -70,6 +75,17 @@ class LoginLogService:
         except Exception as e:
             log.error(f'登录日志创建失败: {e}')
 
+    @staticmethod
+    async def bulk_create(*, objs: list[CreateLoginLogParam]) -> None:
+        """
+        批量创建登录日志
+
+        :param objs: 登录日志创建参数列表
+        :return:
+        """
+        async with async_db_session.begin() as db:
+            await login_log_dao.bulk_create(db, objs)
+
     @staticmethod
     async def delete(*, obj: DeleteLoginLogParam) -> int:
         """
@@ -88,5 +104,14 @@ class LoginLogService:
         async with async_db_session.begin() as db:
             await login_log_dao.delete_all(db)
 
+    @staticmethod
+    async def clean() -> RetentionResult:
+        """
+        清理过期登录日志
+
+        分区表删除过期分区并预创建未来的分区，非分区表分批删除过期数据
+        """
+        return await apply_retention(async_engine, LoginLog.__table__, settings.LOGIN_LOG_RETENTION_DAYS)
+
 
 login_log_service: LoginLogService = LoginLogService()
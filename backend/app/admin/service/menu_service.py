@@ -8,9 +8,8 @@ from backend.app.admin.crud.crud_menu import menu_dao
 from backend.app.admin.model import Menu
 from backend.app.admin.schema.menu import CreateMenuParam, UpdateMenuParam
 from backend.common.exception import errors
-from backend.core.conf import settings
-from backend.database.db import async_db_session
-from backend.database.redis import redis_client
+from backend.common.security.jwt import invalidate_user_cache
+from backend.database.db import async_db_session, async_read_db_session
 from backend.utils.build_tree import get_tree_data, get_vben5_tree_data
 
 
@@ -40,7 +39,7 @@ class MenuService:
         :param status: 状态
         :return:
         """
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             menu_data = await menu_dao.get_all(db, title=title, status=status)
             menu_tree = get_tree_data(menu_data)
             return menu_tree
@@ -53,7 +52,7 @@ class MenuService:
         :param request: FastAPI 请求对象
         :return:
         """
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             if request.user.is_superuser:
                 menu_data = await menu_dao.get_sidebar(db, None)
             else:
@@ -108,10 +107,12 @@ class MenuService:
             if obj.parent_id == menu.id:
                 raise errors.ForbiddenError(msg='禁止关联自身为父级')
             count = await menu_dao.update(db, pk, obj)
+            user_ids = set()
             for role in await menu.awaitable_attrs.roles:
                 for user in await role.awaitable_attrs.users:
-                    await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+                    user_ids.add(user.id)
+        await invalidate_user_cache(*user_ids)
+        return count
 
     @staticmethod
     async def delete(*, pk: int) -> int:
@@ -127,11 +128,13 @@ class MenuService:
                 raise errors.ConflictError(msg='菜单下存在子菜单，无法删除')
             menu = await menu_dao.get(db, pk)
             count = await menu_dao.delete(db, pk)
+            user_ids = set()
             if menu:
                 for role in await menu.awaitable_attrs.roles:
                     for user in await role.awaitable_attrs.users:
-                        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+                        user_ids.add(user.id)
+        await invalidate_user_cache(*user_ids)
+        return count
 
 
 menu_service: MenuService = MenuService()
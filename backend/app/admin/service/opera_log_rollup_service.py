@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import socket
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.admin.crud.crud_opera_log_rollup import opera_log_rollup_dao
+from backend.app.admin.model import OperaLogRollup
+from backend.app.admin.schema.opera_log import CreateOperaLogParam
+from backend.common.enums import StatusType
+from backend.common.exception import errors
+from backend.core.conf import settings
+from backend.database.db import async_engine, async_read_db_session
+from backend.database.partition import delete_in_chunks
+from backend.utils.sketch import QuantileSketch
+from backend.utils.timezone import timezone
+
+
+@dataclass
+class _Rollup:
+    """汇总累加器"""
+
+    count: int = 0
+    error_count: int = 0
+    cost_time_sum: float = 0.0
+    cost_time_max: float = 0.0
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def add(self, cost_time: float, error: bool) -> None:
+        self.count += 1
+        self.error_count += error
+        self.cost_time_sum += cost_time
+        self.cost_time_max = max(self.cost_time_max, cost_time)
+        self.sketch.add(cost_time)
+
+    def merge(self, row: Any) -> None:
+        """
+        合并汇总行
+
+        :param row: 包含 count、error_count、cost_time_sum、cost_time_max、cost_time_sketch 的行
+        :return:
+        """
+        self.count += int(row.count)
+        self.error_count += int(row.error_count)
+        self.cost_time_sum += float(row.cost_time_sum)
+        self.cost_time_max = max(self.cost_time_max, float(row.cost_time_max))
+        self.sketch.merge(QuantileSketch.from_dict(row.cost_time_sketch))
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'error_count': self.error_count,
+            'avg_cost_time': round(self.cost_time_sum / self.count, 3) if self.count else 0.0,
+            'p50_cost_time': _round(self.sketch.quantile(0.5)),
+            'p95_cost_time': _round(self.sketch.quantile(0.95)),
+            'p99_cost_time': _round(self.sketch.quantile(0.99)),
+            'max_cost_time': round(self.cost_time_max, 3),
+        }
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 3) if value is not None else None
+
+
+def _localize(t: datetime) -> datetime:
+    """
+    转换为当前时区时间，MySQL 读取的时间不带时区信息，视为当前时区时间
+
+    :param t: 时间
+    :return:
+    """
+    return t.replace(tzinfo=timezone.tz_info) if t.tzinfo is None else timezone.from_datetime(t)
+
+
+def _node() -> str:
+    """写入节点标识，每个进程仅维护自身的汇总行，多进程写入无需加锁，查询时再合并"""
+    return f'{socket.gethostname()}:{os.getpid()}'[:64]
+
+
+class OperaLogRollupService:
+    """操作日志汇总服务类"""
+
+    @staticmethod
+    async def record(db: AsyncSession, *, logs: list[CreateOperaLogParam]) -> None:
+        """
+        将一批操作日志合并到分钟汇总
+
+        与日志写入使用同一事务，日志写入失败重试时汇总随之回滚，不会重复计数
+
+        :param db: 数据库会话
+        :param logs: 操作日志列表
+        :return:
+        """
+        rollups: dict[tuple[datetime, str, str, str], _Rollup] = {}
+        for obj in logs:
+            bucket = _localize(obj.opera_time).replace(second=0, microsecond=0)
+            key = (bucket, obj.route or obj.path, obj.method, obj.code)
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = _Rollup()
+            rollup.add(obj.cost_time, obj.status == StatusType.disable)
+
+        node = _node()
+        buckets = list({key[0] for key in rollups})
+        rows = await opera_log_rollup_dao.get_by_node(db, node, buckets)
+        existing = {(_localize(row.bucket), row.path, row.method, row.code): row for row in rows}
+        for key, rollup in rollups.items():
+            row = existing.get(key)
+            if row is None:
+                bucket, path, method, code = key
+                db.add(
+                    OperaLogRollup(
+                        bucket=bucket,
+                        node=node,
+                        path=path,
+                        method=method,
+                        code=code,
+                        count=rollup.count,
+                        error_count=rollup.error_count,
+                        cost_time_sum=rollup.cost_time_sum,
+                        cost_time_max=rollup.cost_time_max,
+                        cost_time_sketch=rollup.sketch.to_dict(),
+                    )
+                )
+                continue
+            rollup.merge(row)
+            row.count = rollup.count
+            row.error_count = rollup.error_count
+            row.cost_time_sum = rollup.cost_time_sum
+            row.cost_time_max = rollup.cost_time_max
+            row.cost_time_sketch = rollup.sketch.to_dict()
+        await db.flush()
+
+    @staticmethod
+    def _get_range(start_time: datetime | None, end_time: datetime | None) -> tuple[datetime, datetime]:
+        """
+        获取统计时间范围
+
+        :param start_time: 开始时间，默认为结束时间前一小时
+        :param end_time: 结束时间，默认为当前时间
+        :return:
+        """
+        end_time = _localize(end_time) if end_time else timezone.now()
+        start_time = _localize(start_time) if start_time else end_time - timedelta(hours=1)
+        if start_time >= end_time:
+            raise errors.RequestError(msg='开始时间必须早于结束时间')
+        if end_time - start_time > timedelta(hours=settings.OPERA_LOG_ROLLUP_QUERY_MAX_HOURS):
+            raise errors.RequestError(msg=f'统计时间范围不能超过 {settings.OPERA_LOG_ROLLUP_QUERY_MAX_HOURS} 小时')
+        return start_time, end_time
+
+    async def get_series(
+        self,
+        *,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        interval: int,
+        path: str | None,
+        method: str | None,
+    ) -> list[dict[str, Any]]:
+        """
+        获取请求量及耗时时间序列
+
+        :param start_time: 开始时间，默认为结束时间前一小时
+        :param end_time: 结束时间，默认为当前时间
+        :param interval: 统计间隔（分钟）
+        :param path: 路由路径
+        :param method: 请求方法
+        :return:
+        """
+        start_time, end_time = self._get_range(start_time, end_time)
+        seconds = interval * 60
+
+        def truncate(bucket: datetime) -> datetime:
+            timestamp = int(_localize(bucket).timestamp()) // seconds * seconds
+            return datetime.fromtimestamp(timestamp, timezone.tz_info)
+
+        series: dict[datetime, _Rollup] = {}
+        async with async_read_db_session() as db:
+            rows = await opera_log_rollup_dao.get_stats(db, [OperaLogRollup.bucket], start_time, end_time, path, method)
+        for row in rows:
+            series.setdefault(truncate(row.bucket), _Rollup()).merge(row)
+        return [{'time': time, **rollup.summary()} for time, rollup in sorted(series.items())]
+
+    async def get_endpoints(
+        self,
+        *,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        method: str | None,
+    ) -> list[dict[str, Any]]:
+        """
+        获取各接口的请求量及耗时统计，按请求量降序
+
+        :param start_time: 开始时间，默认为结束时间前一小时
+        :param end_time: 结束时间，默认为当前时间
+        :param method: 请求方法
+        :return:
+        """
+        start_time, end_time = self._get_range(start_time, end_time)
+        keys = [OperaLogRollup.path, OperaLogRollup.method]
+        endpoints: dict[tuple[str, str], _Rollup] = {}
+        async with async_read_db_session() as db:
+            rows = await opera_log_rollup_dao.get_stats(db, keys, start_time, end_time, None, method)
+        for row in rows:
+            endpoints.setdefault((row.path, row.method), _Rollup()).merge(row)
+        data = [{'path': path, 'method': method, **rollup.summary()} for (path, method), rollup in endpoints.items()]
+        return sorted(data, key=lambda item: item['count'], reverse=True)
+
+    @staticmethod
+    async def clean() -> int:
+        """清理过期操作日志汇总"""
+        before = timezone.now() - timedelta(days=settings.OPERA_LOG_ROLLUP_RETENTION_DAYS)
+        return await delete_in_chunks(async_engine, OperaLogRollup.__table__, before, column='bucket')
+
+
+opera_log_rollup_service: OperaLogRollupService = OperaLogRollupService()
@@ -3,8 +3,13 @@
 from sqlalchemy import Select
 
 from backend.app.admin.crud.crud_opera_log import opera_log_dao
+from backend.app.admin.model import OperaLog
 from backend.app.admin.schema.opera_log import CreateOperaLogParam, DeleteOperaLogParam
-from backend.database.db import async_db_session
+from backend.app.admin.service.opera_log_rollup_service import opera_log_rollup_service
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import async_db_session, async_engine
+from backend.database.partition import RetentionResult, apply_retention
 
 
 class OperaLogService:
@@ -43,6 +48,13 @@ class OperaLogService:
         """
         async with async_db_session.begin() as db:
             await opera_log_dao.bulk_create(db, objs)
+            if settings.OPERA_LOG_ROLLUP_ENABLED:
+                try:
+                    async with db.begin_nested():
+                        await opera_log_rollup_service.record(db, logs=objs)
+                except Exception as e:
+                    # 汇总失败仅回滚至保存点，不影响日志写入
+                    log.error(f'操作日志汇总失败: {e}')
 
     @staticmethod
     async def delete(*, obj: DeleteOperaLogParam) -> int:
@@ -62,5 +74,14 @@ class OperaLogService:
         async with async_db_session.begin() as db:
             await opera_log_dao.delete_all(db)
 
+    @staticmethod
+    async def clean() -> RetentionResult:
+        """
+        清理过期操作日志
+
+        分区表删除过期分区并预创建未来的分区，非分区表分批删除过期数据
+        """
+        return await apply_retention(async_engine, OperaLog.__table__, settings.OPERA_LOG_RETENTION_DAYS)
+
 
 opera_log_service: OperaLogService = OperaLogService()
@@ -16,9 +16,8 @@ from backend.app.admin.schema.role import (
     UpdateRoleScopeParam,
 )
 from backend.common.exception import errors
-from backend.core.conf import settings
-from backend.database.db import async_db_session
-from backend.database.redis import redis_client
+from backend.common.security.jwt import invalidate_user_cache
+from backend.database.db import async_db_session, async_read_db_session
 from backend.utils.build_tree import get_tree_data
 
 
@@ -42,7 +41,7 @@ class RoleService:
     @staticmethod
     async def get_all() -> Sequence[Role]:
         """获取所有角色"""
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             roles = await role_dao.get_all(db)
             return roles
 
@@ -65,7 +64,7 @@ class RoleService:
         :param pk: 角色 ID
         :return:
         """
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             role = await role_dao.get_with_relation(db, pk)
             if not role:
                 raise errors.NotFoundError(msg='角色不存在')
@@ -118,9 +117,9 @@ class RoleService:
                 if await role_dao.get_by_name(db, obj.name):
                     raise errors.ConflictError(msg='角色已存在')
             count = await role_dao.update(db, pk, obj)
-            for user in await role.awaitable_attrs.users:
-                await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+            user_ids = [user.id for user in await role.awaitable_attrs.users]
+        await invalidate_user_cache(*user_ids)
+        return count
 
     @staticmethod
     async def update_role_menu(*, pk: int, menu_ids: UpdateRoleMenuParam) -> int:
@@ -140,9 +139,9 @@ class RoleService:
                 if not menu:
                     raise errors.NotFoundError(msg='菜单不存在')
             count = await role_dao.update_menus(db, pk, menu_ids)
-            for user in await role.awaitable_attrs.users:
-                await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+            user_ids = [user.id for user in await role.awaitable_attrs.users]
+        await invalidate_user_cache(*user_ids)
+        return count
 
     @staticmethod
     async def update_role_scope(*, pk: int, scope_ids: UpdateRoleScopeParam) -> int:
@@ -162,9 +161,9 @@ class RoleService:
                 if not scope:
                     raise errors.NotFoundError(msg='数据范围不存在')
             count = await role_dao.update_scopes(db, pk, scope_ids)
-            for user in await role.awaitable_attrs.users:
-                await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+            user_ids = [user.id for user in await role.awaitable_attrs.users]
+        await invalidate_user_cache(*user_ids)
+        return count
 
     @staticmethod
     async def delete(*, obj: DeleteRoleParam) -> int:
@@ -175,13 +174,15 @@ class RoleService:
         :return:
         """
         async with async_db_session.begin() as db:
-            count = await role_dao.delete(db, obj.pks)
+            user_ids = set()
             for pk in obj.pks:
                 role = await role_dao.get(db, pk)
                 if role:
                     for user in await role.awaitable_attrs.users:
-                        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+                        user_ids.add(user.id)
+            count = await role_dao.delete(db, obj.pks)
+        await invalidate_user_cache(*user_ids)
+        return count
 
 
 role_service: RoleService = RoleService()
@@ -19,7 +19,14 @@ from backend.app.admin.schema.user import (
 from backend.common.enums import UserPermissionType
 from backend.common.exception import errors
 from backend.common.response.response_code import CustomErrorCode
-from backend.common.security.jwt import get_token, jwt_decode, password_verify, superuser_verify
+from backend.common.security.jwt import (
+    get_token,
+    invalidate_user_cache,
+    jwt_decode,
+    revoke_user_tokens,
+    superuser_verify,
+)
+from backend.common.security.password import password_hash_service
 from backend.core.conf import settings
 from backend.database.db import async_db_session
 from backend.database.redis import redis_client
@@ -115,8 +122,8 @@ class UserService:
                 if not await role_dao.get(db, role_id):
                     raise errors.NotFoundError(msg='角色不存在')
             count = await user_dao.update(db, user, obj)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await invalidate_user_cache(user.id)
+        return count
 
     @staticmethod
     async def update_permission(*, request: Request, pk: int, type: UserPermissionType) -> int:
@@ -128,6 +135,8 @@ class UserService:
         :param type: 权限类型
         :return:
         """
+        revoke = False
+        keep_session_uuid = None
         async with async_db_session.begin() as db:
             superuser_verify(request)
             match type:
@@ -156,27 +165,21 @@ class UserService:
                     user = await user_dao.get(db, pk)
                     if not user:
                         raise errors.NotFoundError(msg='用户不存在')
-                    multi_login = user.is_multi_login if pk != user.id else request.user.is_multi_login
+                    multi_login = user.is_multi_login if pk != request.user.id else request.user.is_multi_login
                     new_multi_login = not multi_login
                     count = await user_dao.set_multi_login(db, pk, new_multi_login)
-                    token = get_token(request)
-                    token_payload = jwt_decode(token)
-                    if pk == user.id:
-                        # 系统管理员修改自身时，除当前 token 外，其他 token 失效
-                        if not new_multi_login:
-                            key_prefix = f'{settings.TOKEN_REDIS_PREFIX}:{user.id}'
-                            await redis_client.delete_prefix(
-                                key_prefix, exclude=f'{key_prefix}:{token_payload.session_uuid}'
-                            )
-                    else:
-                        # 系统管理员修改他人时，他人 token 全部失效
-                        if not new_multi_login:
-                            key_prefix = f'{settings.TOKEN_REDIS_PREFIX}:{user.id}'
-                            await redis_client.delete_prefix(key_prefix)
+                    if not new_multi_login:
+                        # 系统管理员修改他人时，他人 token 全部失效；修改自身时，除当前会话外，其他 token 失效
+                        revoke = True
+                        if pk == request.user.id:
+                            keep_session_uuid = jwt_decode(get_token(request)).session_uuid
                 case _:
                     raise errors.RequestError(msg='权限类型不存在')
 
-        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
+        # 事务提交后再撤销 token，避免提交失败时 token 已被撤销
+        if revoke:
+            await revoke_user_tokens(user.id, keep_session_uuid)
+        await invalidate_user_cache(user.id)
         return count
 
     @staticmethod
@@ -195,14 +198,9 @@ class UserService:
             if not user:
                 raise errors.NotFoundError(msg='用户不存在')
             count = await user_dao.reset_password(db, user.id, password)
-            key_prefix = [
-                f'{settings.TOKEN_REDIS_PREFIX}:{user.id}',
-                f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user.id}',
-                f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}',
-            ]
-            for prefix in key_prefix:
-                await redis_client.delete(prefix)
-            return count
+        await revoke_user_tokens(user.id)
+        await invalidate_user_cache(user.id)
+        return count
 
     @staticmethod
     async def update_nickname(*, request: Request, nickname: str) -> int:
@@ -220,8 +218,8 @@ class UserService:
             if not user:
                 raise errors.NotFoundError(msg='用户不存在')
             count = await user_dao.update_nickname(db, token_payload.id, nickname)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await invalidate_user_cache(user.id)
+        return count
 
     @staticmethod
     async def update_avatar(*, request: Request, avatar: str) -> int:
@@ -239,8 +237,8 @@ class UserService:
             if not user:
                 raise errors.NotFoundError(msg='用户不存在')
             count = await user_dao.update_avatar(db, token_payload.id, avatar)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await invalidate_user_cache(user.id)
+        return count
 
     @staticmethod
     async def update_email(*, request: Request, captcha: str, email: str) -> int:
@@ -265,8 +263,8 @@ class UserService:
                 raise errors.CustomError(error=CustomErrorCode.CAPTCHA_ERROR)
             await redis_client.delete(f'{settings.EMAIL_CAPTCHA_REDIS_PREFIX}:{request.state.ip}')
             count = await user_dao.update_email(db, token_payload.id, email)
-            await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
-            return count
+        await invalidate_user_cache(user.id)
+        return count
 
     @staticmethod
     async def update_password(*, request: Request, obj: ResetPasswordParam) -> int:
@@ -283,19 +281,14 @@ class UserService:
             user = await user_dao.get(db, token_payload.id)
             if not user:
                 raise errors.NotFoundError(msg='用户不存在')
-            if not password_verify(obj.old_password, user.password):
+            if not await password_hash_service.verify(obj.old_password, user.password):
                 raise errors.RequestError(msg='原密码错误')
             if obj.new_password != obj.confirm_password:
                 raise errors.RequestError(msg='密码输入不一致')
             count = await user_dao.reset_password(db, user.id, obj.new_password)
-            key_prefix = [
-                f'{settings.TOKEN_REDIS_PREFIX}:{user.id}',
-                f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user.id}',
-                f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}',
-            ]
-            for prefix in key_prefix:
-                await redis_client.delete_prefix(prefix)
-            return count
+        await revoke_user_tokens(user.id)
+        await invalidate_user_cache(user.id)
+        return count
 
     @staticmethod
     async def delete(*, pk: int) -> int:
@@ -310,13 +303,9 @@ class UserService:
             if not user:
                 raise errors.NotFoundError(msg='用户不存在')
             count = await user_dao.delete(db, user.id)
-            key_prefix = [
-                f'{settings.TOKEN_REDIS_PREFIX}:{user.id}',
-                f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user.id}',
-            ]
-            for key in key_prefix:
-                await redis_client.delete_prefix(key)
-            return count
+        await revoke_user_tokens(user.id)
+        await invalidate_user_cache(user.id)
+        return count
 
 
 user_service: UserService = UserService()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import base64
+import json
+
+from datetime import datetime
+
+import pytest
+
+from backend.app.admin.model import OperaLog
+from backend.common.exception import errors
+from backend.common.pagination import _decode_cursor, _encode_cursor
+from backend.utils.timezone import timezone
+
+KEYS = [OperaLog.created_time, OperaLog.id]
+
+
+def test_cursor_round_trip() -> None:
+    created_time = datetime(2025, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.tz_info)
+
+    cursor = _encode_cursor('next', [created_time, 42])
+
+    assert '=' not in cursor
+    assert _decode_cursor(cursor, KEYS) == ('next', [created_time, 42])
+
+
+def test_cursor_prev_direction() -> None:
+    created_time = timezone.now()
+
+    assert _decode_cursor(_encode_cursor('prev', [created_time, 1]), KEYS) == ('prev', [created_time, 1])
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        ['up', ['2025-01-01T00:00:00', 1]],
+        ['next', ['2025-01-01T00:00:00']],
+        ['next', ['not a time', 1]],
+        ['next', ['2025-01-01T00:00:00', 'x']],
+    ],
+)
+def test_cursor_invalid_values(data: list) -> None:
+    cursor = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    with pytest.raises(errors.RequestError):
+        _decode_cursor(cursor, KEYS)
+
+
+def test_cursor_not_base64() -> None:
+    with pytest.raises(errors.RequestError):
+        _decode_cursor('!!!', KEYS)
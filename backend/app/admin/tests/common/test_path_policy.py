@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re
+
+from backend.common.path_policy import PathMatcher
+
+
+def test_match_paths_and_patterns() -> None:
+    matcher = PathMatcher(['/api/v1/auth/login'], [r'^/api/v1/monitors/(redis|server)$', re.compile(r'^/static/')])
+
+    assert matcher.match('/api/v1/auth/login')
+    assert matcher.match('/api/v1/monitors/redis')
+    assert matcher.match('/static/a.png')
+    assert not matcher.match('/api/v1/auth/login/x')
+    assert not matcher.match('/api/v1/monitors/database')
+    assert not PathMatcher().match('/')
+
+
+def test_pattern_flags_scoped() -> None:
+    matcher = PathMatcher(patterns=[re.compile(r'^/docs$', re.IGNORECASE), r'^/api/v1/public$'])
+
+    # 忽略大小写仅对声明的规则生效，不会放宽其他规则
+    assert matcher.pattern is not None
+    assert matcher.match('/DOCS')
+    assert matcher.match('/api/v1/public')
+    assert not matcher.match('/API/V1/PUBLIC')
+
+
+def test_verbose_pattern_scoped() -> None:
+    matcher = PathMatcher(patterns=[re.compile(r'^/a \s? b$', re.VERBOSE), r'^/c d$'])
+
+    assert matcher.match('/ab')
+    assert matcher.match('/c d')
+    assert not matcher.match('/cd')
+
+
+def test_global_inline_flags_fallback() -> None:
+    matcher = PathMatcher(patterns=[r'(?i)^/docs$', r'^/api/v1/public$'])
+
+    # 包含全局内联标志的规则无法合并，逐个匹配
+    assert matcher.pattern is None
+    assert matcher.match('/Docs')
+    assert not matcher.match('/API/V1/PUBLIC')
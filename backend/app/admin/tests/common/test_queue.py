@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+
+from pathlib import Path
+
+from backend.common.queue import BatchWriter
+
+
+class Handler:
+    """记录写入结果的批量写入函数"""
+
+    def __init__(self, fail: bool = False, delay: float = 0) -> None:
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+        self.written: list[dict] = []
+
+    async def __call__(self, batch: list[dict]) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('write failed')
+        self.written.extend(batch)
+
+
+def create_writer(handler: Handler, spill_file: Path, **kwargs) -> BatchWriter[dict]:
+    options = {
+        'maxsize': 2,
+        'batch_size': 10,
+        'flush_interval': 0.05,
+        'full_policy': 'spill',
+        'max_retries': 0,
+        'retry_backoff': 0,
+        'max_replays': 2,
+        **kwargs,
+    }
+    return BatchWriter('test', handler, spill_file=spill_file, dumps=json.dumps, loads=json.loads, **options)
+
+
+def spill_files(spill_file: Path) -> list[str]:
+    return sorted(file.name for file in spill_file.parent.iterdir())
+
+
+def test_spill_and_replay(tmp_path: Path) -> None:
+    spill_file = tmp_path / 'spill.jsonl'
+    handler = Handler()
+    writer = create_writer(handler, spill_file)
+
+    async def run() -> None:
+        for i in range(5):
+            await writer.put({'id': i})
+        # 队列已满的项目写入当前进程的溢出文件
+        assert spill_files(spill_file) == [f'spill.{os.getpid()}.jsonl']
+        writer.start()
+        await writer.stop(5)
+
+    asyncio.run(run())
+
+    assert sorted(item['id'] for item in handler.written) == list(range(5))
+    assert writer.stats()['spilled'] == 3
+    assert writer.stats()['replayed'] == 3
+    assert spill_files(spill_file) == []
+
+
+def test_replay_legacy_and_orphan_files(tmp_path: Path) -> None:
+    spill_file = tmp_path / 'spill.jsonl'
+    spill_file.write_text('{"id": 0}\n')
+    # 不存在的进程遗留的未回放完成的文件
+    (tmp_path / 'spill.999999999.abc.replay.jsonl').write_text('1\t{"id": 1}\n')
+    handler = Handler()
+    writer = create_writer(handler, spill_file)
+
+    async def run() -> None:
+        writer.start()
+        await writer.stop(5)
+
+    asyncio.run(run())
+
+    assert sorted(item['id'] for item in handler.written) == [0, 1]
+    assert spill_files(spill_file) == []
+
+
+def test_dead_letter_after_max_replays(tmp_path: Path) -> None:
+    spill_file = tmp_path / 'spill.jsonl'
+    handler = Handler(fail=True)
+    writer = create_writer(handler, spill_file)
+
+    async def run() -> None:
+        await writer.put({'id': 0})
+        writer.start()
+        # 首次写入失败后溢出，空闲时回放，回放失败超过上限后转入死信文件
+        for _ in range(100):
+            if writer.stats()['dead_lettered']:
+                break
+            await asyncio.sleep(0.05)
+        await writer.stop(5)
+
+    asyncio.run(run())
+
+    dead_file = tmp_path / f'spill.{os.getpid()}.dead.jsonl'
+    assert writer.stats()['dead_lettered'] == 1
+    assert handler.calls == 1 + writer.max_replays
+    assert dead_file.read_text() == f'{1 + writer.max_replays}\t{{"id": 0}}\n'
+    assert spill_files(spill_file) == [dead_file.name]
+
+
+def test_stop_timeout_does_not_spill_written_batch(tmp_path: Path) -> None:
+    spill_file = tmp_path / 'spill.jsonl'
+    handler = Handler(delay=0.5)
+    writer = create_writer(handler, spill_file, flush_interval=0.01)
+
+    async def run() -> None:
+        writer.start()
+        await writer.put({'id': 0})
+        await asyncio.sleep(0.1)
+        # 停止超时时批次正在写入，等待写入完成后不再溢出
+        await writer.stop(0.1)
+
+    asyncio.run(run())
+
+    assert handler.written == [{'id': 0}]
+    assert writer.stats()['spilled'] == 0
+    assert spill_files(spill_file) == []
+
+
+def test_stop_timeout_spills_failed_batch(tmp_path: Path) -> None:
+    spill_file = tmp_path / 'spill.jsonl'
+    handler = Handler(fail=True, delay=0.5)
+    writer = create_writer(handler, spill_file, flush_interval=0.01)
+
+    async def run() -> None:
+        writer.start()
+        await writer.put({'id': 0})
+        await asyncio.sleep(0.1)
+        await writer.stop(0.1)
+
+    asyncio.run(run())
+
+    assert (tmp_path / f'spill.{os.getpid()}.jsonl').read_text() == '1\t{"id": 0}\n'
+
+
+def test_run_survives_batch_exception(tmp_path: Path) -> None:
+    spill_file = tmp_path / 'spill.jsonl'
+    handler = Handler(fail=True)
+    writer = create_writer(handler, spill_file, flush_interval=0.01)
+    overflow = writer._overflow
+
+    async def broken_overflow(*args, **kwargs) -> None:
+        writer._overflow = overflow
+        raise RuntimeError('spill failed')
+
+    writer._overflow = broken_overflow
+
+    async def run() -> None:
+        task = writer.start()
+        await writer.put({'id': 0})
+        await asyncio.sleep(0.1)
+        # 批次溢出异常后写入任务仍在运行
+        assert not task.done()
+        handler.fail = False
+        await writer.put({'id': 1})
+        await writer.stop(5)
+
+    asyncio.run(run())
+
+    assert handler.written == [{'id': 1}]
+
+
+def test_replay_cancelled_spills_remaining(tmp_path: Path) -> None:
+    spill_file = tmp_path / 'spill.jsonl'
+    spill_file.write_text('{"id": 0}\n{"id": 1}\n{"id": 2}\n')
+    handler = Handler(delay=0.3)
+    writer = create_writer(handler, spill_file, batch_size=1)
+
+    async def run() -> None:
+        writer.start()
+        await asyncio.sleep(0.1)
+        # 回放被取消时，正在写入的批次写入完成，未回放的记录写回溢出文件
+        await writer.stop(0.1)
+
+    asyncio.run(run())
+
+    assert handler.written == [{'id': 0}]
+    assert spill_files(spill_file) == [f'spill.{os.getpid()}.jsonl']
+    assert (tmp_path / f'spill.{os.getpid()}.jsonl').read_text() == '0\t{"id": 1}\n0\t{"id": 2}\n'
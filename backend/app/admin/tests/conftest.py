@@ -8,11 +8,12 @@ from starlette.testclient import TestClient
 
 from backend.app.admin.tests.utils.db import override_get_db
 from backend.core.conf import settings
-from backend.database.db import get_db
+from backend.database.db import get_db, get_read_db
 from backend.main import app
 
 # 重载数据库
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 
 # Test data
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from backend.app.admin.crud.crud_login_log import login_log_dao
+from backend.app.admin.crud.crud_opera_log import opera_log_dao
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.tests.utils.db import TEST_SQLALCHEMY_DATABASE_URL
+from backend.common.model import MappedBase
+from backend.core.conf import settings
+
+# 模糊搜索索引后缀，PostgreSQL 为 pg_trgm GIN 索引，MySQL 为 ngram 全文索引
+SEARCH_INDEX_SUFFIX = 'ngram' if settings.DATABASE_TYPE == 'mysql' else 'trgm'
+
+
+def explain(stmt: Select) -> str:
+    """
+    获取查询语句的执行计划
+
+    :param stmt: 查询语句
+    :return:
+    """
+
+    async def run() -> str:
+        engine = create_async_engine(TEST_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(MappedBase.metadata.create_all)
+                if conn.dialect.name == 'postgresql':
+                    # 测试数据量较小，禁用顺序扫描以确认索引可被使用
+                    await conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+                sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+                if conn.dialect.paramstyle in ('format', 'pyformat'):
+                    sql = sql.replace('%', '%%')
+                result = await conn.exec_driver_sql(f'EXPLAIN {sql}')
+                return str(result.all())
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.skipif(
+    settings.DATABASE_TYPE == 'mysql' and settings.LOG_TABLE_PARTITION_ENABLED,
+    reason='MySQL 分区表不支持全文索引',
+)
+@pytest.mark.parametrize(
+    ('dao', 'username', 'ip', 'index'),
+    [
+        (opera_log_dao, 'admin', None, 'ix_sys_opera_log_username'),
+        (opera_log_dao, None, '127.0', 'ix_sys_opera_log_ip'),
+        (login_log_dao, 'admin', None, 'ix_sys_login_log_username'),
+        (login_log_dao, None, '127.0', 'ix_sys_login_log_ip'),
+    ],
+    ids=['opera_log_username', 'opera_log_ip', 'login_log_username', 'login_log_ip'],
+)
+def test_log_search_uses_search_index(dao, username: str | None, ip: str | None, index: str) -> None:
+    stmt = asyncio.run(dao.get_list(username=username, status=None, ip=ip))
+    assert f'{index}_{SEARCH_INDEX_SUFFIX}' in explain(stmt)
+
+
+def test_user_phone_search_uses_search_index() -> None:
+    stmt = asyncio.run(user_dao.get_list(dept=None, username=None, phone='138', status=None))
+    assert f'ix_sys_user_phone_{SEARCH_INDEX_SUFFIX}' in explain(stmt)
+
+
+def test_log_status_filter_uses_index() -> None:
+    stmt = asyncio.run(opera_log_dao.get_list(username=None, status=1, ip=None))
+    assert 'ix_sys_opera_log_status' in explain(stmt)
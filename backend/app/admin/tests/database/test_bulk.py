@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from datetime import datetime
+from typing import Any, Callable
+
+from pydantic import BaseModel
+from sqlalchemy import Column, Connection, DateTime, Integer, MetaData, String, Table, create_engine
+
+from backend.database.bulk import build_rows, get_table_columns
+
+table = Table(
+    'bulk_test',
+    MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('name', String(20)),
+    Column('code', String(20), default='200'),
+    Column('count', Integer, default=lambda: 1),
+    Column('created_time', DateTime),
+)
+
+
+class SyncSession:
+    """以同步连接模拟数据库会话，仅用于字段反射，无需异步数据库驱动"""
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+
+    async def connection(self) -> 'SyncSession':
+        return self
+
+    async def run_sync(self, fn: Callable[[Connection], Any]) -> Any:
+        return fn(self.conn)
+
+
+class Param(BaseModel):
+    name: str
+    route: str | None = None
+    created_time: datetime
+
+
+def test_build_rows_fill_defaults() -> None:
+    created_time = datetime(2025, 1, 1)
+    objs = [Param(name='a', route='/a', created_time=created_time), Param(name='b', created_time=created_time)]
+
+    rows = build_rows(table, objs)
+
+    # 非表字段被忽略，缺少的列使用默认值填充，主键由数据库生成
+    assert rows == [
+        {'name': 'a', 'created_time': created_time, 'code': '200', 'count': 1},
+        {'name': 'b', 'created_time': created_time, 'code': '200', 'count': 1},
+    ]
+    assert all(list(row) == list(rows[0]) for row in rows)
+
+
+def test_build_rows_empty() -> None:
+    assert build_rows(table, []) == []
+
+
+def test_build_rows_skip_missing_columns() -> None:
+    created_time = datetime(2025, 1, 1)
+
+    rows = build_rows(table, [Param(name='a', created_time=created_time)], ['id', 'name', 'code', 'created_time'])
+
+    assert rows == [{'name': 'a', 'created_time': created_time, 'code': '200'}]
+
+
+def test_get_table_columns() -> None:
+    engine = create_engine('sqlite://')
+    with engine.connect() as conn:
+        # 模拟数据库尚未迁移，缺少 count 字段
+        conn.exec_driver_sql('CREATE TABLE bulk_test (id INTEGER PRIMARY KEY, name TEXT, code TEXT, created_time TEXT)')
+        before = asyncio.run(get_table_columns(SyncSession(conn), table))
+        # 迁移后无需重启即可获取新增字段
+        conn.exec_driver_sql('ALTER TABLE bulk_test ADD COLUMN count INTEGER')
+        after = asyncio.run(get_table_columns(SyncSession(conn), table))
+        conn.exec_driver_sql('ALTER TABLE bulk_test DROP COLUMN count')
+        cached = asyncio.run(get_table_columns(SyncSession(conn), table))
+
+    assert before == {'id', 'name', 'code', 'created_time'}
+    assert after == cached == {'id', 'name', 'code', 'count', 'created_time'}
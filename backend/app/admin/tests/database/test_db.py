@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+
+from typing import Any
+
+import pytest
+
+from backend.common.security.jwt import mark_recent_write
+from backend.core.conf import settings
+from backend.database import db as module
+from backend.database.db import async_read_db_session, set_read_from_primary
+from backend.database.redis import redis_client
+
+
+@pytest.fixture
+def sessions(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    sessions = {'primary': object(), 'replica': object()}
+    monkeypatch.setattr(module, 'async_db_session', lambda: sessions['primary'])
+    monkeypatch.setattr(module, 'async_read_db_session_maker', lambda: sessions['replica'])
+    return sessions
+
+
+def test_read_session_without_replica(monkeypatch: pytest.MonkeyPatch, sessions: dict[str, Any]) -> None:
+    monkeypatch.setattr(module, 'async_read_db_session_maker', None)
+
+    assert async_read_db_session() is sessions['primary']
+
+
+def test_read_session_use_replica(sessions: dict[str, Any]) -> None:
+    async def run() -> Any:
+        return async_read_db_session()
+
+    assert asyncio.run(run()) is sessions['replica']
+
+
+def test_read_session_after_write(sessions: dict[str, Any]) -> None:
+    async def run() -> tuple[Any, Any]:
+        set_read_from_primary(True)
+        return async_read_db_session(), await asyncio.create_task(other_request())
+
+    async def other_request() -> Any:
+        set_read_from_primary(False)
+        return async_read_db_session()
+
+    # 写后读标记仅作用于当前请求上下文
+    assert asyncio.run(run()) == (sessions['primary'], sessions['replica'])
+
+
+def test_mark_recent_write(monkeypatch: pytest.MonkeyPatch, sessions: dict[str, Any]) -> None:
+    monkeypatch.setattr(settings, 'DATABASE_REPLICA_HOST', '127.0.0.1')
+    user_id = random.randint(10**9, 10**10)
+    key = f'{settings.DATABASE_REPLICA_WRITE_REDIS_PREFIX}:{user_id}'
+
+    async def run() -> tuple[Any, int]:
+        try:
+            await mark_recent_write(user_id)
+            return async_read_db_session(), await redis_client.ttl(key)
+        finally:
+            await redis_client.delete(key)
+            await redis_client.connection_pool.disconnect()
+
+    session, ttl = asyncio.run(run())
+
+    # 写请求后当前请求及写后读窗口内的后续请求读取主库
+    assert session is sessions['primary']
+    assert 0 < ttl <= settings.DATABASE_REPLICA_READ_YOUR_WRITES_SECONDS
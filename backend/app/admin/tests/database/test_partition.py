@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import subprocess
+import sys
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.admin.model import LoginLog, OperaLog
+from backend.core.conf import settings
+from backend.core.path_conf import BASE_PATH
+from backend.database.partition import _next_period, _parse_suffix, drop_partitions, partition_table_args
+from backend.utils.timezone import timezone
+
+
+class FakeConnection:
+    """记录执行的 SQL 语句"""
+
+    def __init__(self, dialect: str) -> None:
+        self.dialect = SimpleNamespace(name=dialect)
+        self.statements: list[str] = []
+
+    async def exec_driver_sql(self, statement: str) -> None:
+        self.statements.append(statement)
+
+
+@pytest.mark.skipif(settings.LOG_TABLE_PARTITION_ENABLED, reason='日志表已启用分区')
+@pytest.mark.parametrize('model', [OperaLog, LoginLog])
+def test_log_table_primary_key_without_partition(model: type[OperaLog | LoginLog]) -> None:
+    table = model.__table__
+
+    # 未启用分区时主键与 id_key 定义一致
+    assert partition_table_args() == {}
+    assert table.primary_key.columns.keys() == ['id']
+    assert table.c.id.unique is True
+    assert table.c.id.index is True
+    assert 'partition_key' not in table.info
+
+
+def test_log_table_primary_key_with_partition() -> None:
+    code = (
+        'import backend.core.registrar\n'
+        'from backend.app.admin.model import LoginLog, OperaLog\n'
+        'for model in (OperaLog, LoginLog):\n'
+        '    table = model.__table__\n'
+        '    print(table.primary_key.columns.keys(), table.c.id.unique, table.info["partition_key"])\n'
+    )
+    env = {**os.environ, 'LOG_TABLE_PARTITION_ENABLED': 'true'}
+    # 分区配置在模型定义时生效，需在新进程中导入
+    result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, cwd=BASE_PATH.parent)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-2:] == ["['id', 'created_time'] False created_time"] * 2
+
+
+def test_next_period() -> None:
+    assert _next_period(datetime(2024, 12, 1), 'month') == datetime(2025, 1, 1)
+    assert _next_period(datetime(2025, 2, 1), 'month') == datetime(2025, 3, 1)
+    assert _next_period(datetime(2024, 2, 28), 'day') == datetime(2024, 2, 29)
+
+
+def test_parse_suffix() -> None:
+    tz = timezone.tz_info
+    assert _parse_suffix('202501') == (datetime(2025, 1, 1, tzinfo=tz), datetime(2025, 2, 1, tzinfo=tz))
+    assert _parse_suffix('20250131') == (datetime(2025, 1, 31, tzinfo=tz), datetime(2025, 2, 1, tzinfo=tz))
+    assert _parse_suffix('default') is None
+    assert _parse_suffix('202513') is None
+
+
+@pytest.mark.parametrize(
+    ('dialect', 'partitions', 'expected'),
+    [
+        (
+            'postgresql',
+            ['t_p202411', 't_p202412', 't_p202501', 't_default'],
+            ['DROP TABLE IF EXISTS t_p202411', 'DROP TABLE IF EXISTS t_p202412'],
+        ),
+        ('mysql', ['p202412', 'p202501', 'pmax'], ['ALTER TABLE t DROP PARTITION p202412']),
+    ],
+)
+def test_drop_partitions(dialect: str, partitions: list[str], expected: list[str]) -> None:
+    conn = FakeConnection(dialect)
+    table = SimpleNamespace(name='t')
+    before = datetime(2025, 1, 15, tzinfo=timezone.tz_info)
+
+    # 仅删除范围上限不晚于过期时间的分区，默认分区及兜底分区保留
+    dropped = asyncio.run(drop_partitions(conn, table, partitions, before))
+
+    assert conn.statements == expected
+    assert len(dropped) == len(expected)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+from typing import Any
+
+import pytest
+
+from starlette.requests import Request
+from starlette.types import Message
+
+from backend.app.admin.schema.opera_log import CreateOperaLogParam
+from backend.common.enums import StatusType
+from backend.middleware import opera_log_middleware
+from backend.middleware.opera_log_middleware import OperaLogMiddleware
+from backend.utils.body_capture import RequestBodyCapture
+from backend.utils.desensitize import Desensitizer
+from backend.utils.timezone import timezone
+
+
+@pytest.fixture(autouse=True)
+def desensitizer(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(opera_log_middleware, 'opera_log_desensitizer', Desensitizer(['password'], -1, '0' * 64))
+
+
+def get_request_args(body: Any, content_type: str = 'application/json') -> dict[str, Any] | None:
+    scope = {
+        'type': 'http',
+        'method': 'POST',
+        'path': '/',
+        'query_string': b'',
+        'headers': [(b'content-type', content_type.encode())],
+    }
+
+    async def receive() -> Message:
+        return {'type': 'http.request', 'body': json.dumps(body).encode(), 'more_body': False}
+
+    async def run() -> dict[str, Any] | None:
+        body_capture = RequestBodyCapture(receive, content_type, 1024)
+        request = Request(scope, body_capture)
+        await request.body()
+        return await OperaLogMiddleware(app=None).get_request_args(request, body_capture)
+
+    return asyncio.run(run())
+
+
+def test_get_request_args_json_dict() -> None:
+    args = get_request_args({'username': 'admin', 'password': '123456'})
+
+    assert args == {'json': {'username': 'admin', 'password': '******'}}
+
+
+def test_get_request_args_json_list() -> None:
+    args = get_request_args([{'username': 'admin', 'password': '123456'}, {'extra': {'password': '654321'}}])
+
+    assert args == {'json': [{'username': 'admin', 'password': '******'}, {'extra': {'password': '******'}}]}
+
+
+def test_get_request_args_json_scalar() -> None:
+    assert get_request_args('password') == {'json': 'password'}
+
+
+def test_spill_serialization_keeps_time() -> None:
+    writer = opera_log_middleware.opera_log_writer
+    obj = CreateOperaLogParam(
+        trace_id='0' * 32,
+        username=None,
+        method='POST',
+        title='test',
+        path='/api/v1/users/1',
+        ip='127.0.0.1',
+        user_agent='test',
+        status=StatusType.enable,
+        code='200',
+        cost_time=1.5,
+        opera_time=timezone.now(),
+        route='/api/v1/users/{pk}',
+    )
+
+    # 回放时保留时区、微秒及路由路径
+    assert writer.loads(writer.dumps(obj)) == obj
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+
+from typing import Any, Awaitable
+
+import pytest
+
+from backend.common.security.jwt import (
+    create_access_token,
+    get_session_generation_key,
+    jwt_decode,
+    revoke_user_tokens,
+    verify_token_generation,
+)
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+
+
+@pytest.fixture
+def user_id() -> int:
+    return random.randint(10**9, 10**10)
+
+
+def run(user_id: int, coro: Awaitable[Any]) -> Any:
+    """在独立事件循环中执行，结束后清理测试用户的 token 并断开连接"""
+
+    async def main() -> Any:
+        try:
+            return await coro
+        finally:
+            try:
+                for prefix in (settings.TOKEN_REDIS_PREFIX, settings.TOKEN_GENERATION_REDIS_PREFIX):
+                    keys = [key async for key in redis_client.scan_iter(match=f'{prefix}:{user_id}*')]
+                    if keys:
+                        await redis_client.delete(*keys)
+            finally:
+                await redis_client.connection_pool.disconnect()
+
+    return asyncio.run(main())
+
+
+async def is_valid(token: str) -> bool:
+    payload = jwt_decode(token)
+    generation = await redis_client.get(f'{settings.TOKEN_GENERATION_REDIS_PREFIX}:{payload.id}')
+    return await verify_token_generation(payload, int(generation or 0))
+
+
+def test_revoke_user_tokens(user_id: int) -> None:
+    async def main() -> list[bool]:
+        first = await create_access_token(user_id, True)
+        second = await create_access_token(user_id, True)
+        before = [await is_valid(first.access_token), await is_valid(second.access_token)]
+        await revoke_user_tokens(user_id)
+        return before + [await is_valid(first.access_token), await is_valid(second.access_token)]
+
+    assert run(user_id, main()) == [True, True, False, False]
+
+
+def test_single_login_revokes_previous_tokens(user_id: int) -> None:
+    async def main() -> list[bool]:
+        first = await create_access_token(user_id, True)
+        second = await create_access_token(user_id, False)
+        return [await is_valid(first.access_token), await is_valid(second.access_token)]
+
+    assert run(user_id, main()) == [False, True]
+
+
+def test_revoke_user_tokens_keep_session(user_id: int) -> None:
+    async def main() -> list[bool]:
+        current = await create_access_token(user_id, True)
+        other = await create_access_token(user_id, True)
+        generation = await revoke_user_tokens(user_id, current.session_uuid)
+        kept = await redis_client.get(get_session_generation_key(user_id, current.session_uuid))
+        assert int(kept) == generation
+        result = [await is_valid(current.access_token), await is_valid(other.access_token)]
+        # 再次撤销后，此前保留的会话同样失效
+        await revoke_user_tokens(user_id)
+        return result + [await is_valid(current.access_token)]
+
+    assert run(user_id, main()) == [True, False, False]
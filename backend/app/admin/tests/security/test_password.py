@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+
+import pytest
+
+from backend.common.exception import errors
+from backend.common.security.password import PasswordHashService
+
+
+def test_broken_pool_shutdown() -> None:
+    service = PasswordHashService(pool_size=1, queue_limit=1, timeout=30)
+
+    async def run() -> None:
+        executor = service.executor
+        # 子进程异常退出导致进程池不可用
+        with pytest.raises(errors.ServerError):
+            await service._submit(os._exit, 1)
+        assert service._executor is None
+        assert executor._shutdown_thread
+
+        # 已丢弃的进程池再次异常时不影响重建后的进程池
+        rebuilt = service.executor
+        service._discard_executor(executor)
+        assert service._executor is rebuilt
+        service.shutdown()
+        assert service._executor is None
+        assert rebuilt._shutdown_thread
+
+    asyncio.run(run())
+
+    assert service.stats()['failed'] == 1
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from backend.app.admin.schema.opera_log import CreateOperaLogParam
+from backend.app.admin.service import opera_log_rollup_service as module
+from backend.app.admin.service.opera_log_rollup_service import opera_log_rollup_service
+from backend.common.enums import StatusType
+from backend.common.exception import errors
+from backend.utils.sketch import QuantileSketch
+from backend.utils.timezone import timezone
+
+START_TIME = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.tz_info)
+
+
+class FakeSession:
+    """记录新增对象的数据库会话"""
+
+    def __init__(self) -> None:
+        self.added: list[Any] = []
+
+    async def __aenter__(self) -> 'FakeSession':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        return None
+
+    def add(self, obj: Any) -> None:
+        self.added.append(obj)
+
+    async def flush(self) -> None:
+        return None
+
+
+def sketch(*values: float) -> dict[str, Any]:
+    result = QuantileSketch()
+    for value in values:
+        result.add(value)
+    return result.to_dict()
+
+
+def rollup_row(values: list[float], errors: int = 0, **keys: Any) -> SimpleNamespace:
+    return SimpleNamespace(
+        **keys,
+        count=len(values),
+        error_count=errors,
+        cost_time_sum=sum(values),
+        cost_time_max=max(values),
+        cost_time_sketch=sketch(*values),
+    )
+
+
+def create_log(path: str, route: str | None, cost_time: float, minute: int, status: StatusType) -> CreateOperaLogParam:
+    return CreateOperaLogParam(
+        trace_id='0' * 32,
+        username=None,
+        method='GET',
+        title='test',
+        path=path,
+        ip='127.0.0.1',
+        user_agent='test',
+        status=status,
+        code='200' if status == StatusType.enable else '500',
+        cost_time=cost_time,
+        opera_time=START_TIME + timedelta(minutes=minute, seconds=30),
+        route=route,
+    )
+
+
+@pytest.fixture
+def stats_rows(monkeypatch: pytest.MonkeyPatch) -> list[SimpleNamespace]:
+    rows: list[SimpleNamespace] = []
+
+    async def get_stats(db, keys, start_time, end_time, path, method) -> list[SimpleNamespace]:
+        return rows
+
+    monkeypatch.setattr(module, 'async_read_db_session', FakeSession)
+    monkeypatch.setattr(module.opera_log_rollup_dao, 'get_stats', get_stats)
+    return rows
+
+
+def test_get_series_fold_interval(stats_rows: list[SimpleNamespace]) -> None:
+    stats_rows.extend([
+        rollup_row([10, 20], bucket=START_TIME),
+        rollup_row([30], errors=1, bucket=START_TIME + timedelta(minutes=4)),
+        rollup_row([40], bucket=START_TIME + timedelta(minutes=5)),
+    ])
+
+    series = asyncio.run(
+        opera_log_rollup_service.get_series(
+            start_time=START_TIME, end_time=START_TIME + timedelta(minutes=10), interval=5, path=None, method=None
+        )
+    )
+
+    # 同一间隔内各分钟的汇总合并，包括分位数草图
+    assert [item['time'] for item in series] == [START_TIME, START_TIME + timedelta(minutes=5)]
+    assert series[0]['count'] == 3
+    assert series[0]['error_count'] == 1
+    assert series[0]['avg_cost_time'] == 20.0
+    assert series[0]['max_cost_time'] == 30.0
+    assert series[0]['p50_cost_time'] == pytest.approx(20, rel=0.01)
+    assert series[1]['count'] == 1
+
+
+def test_get_endpoints_sorted_by_count(stats_rows: list[SimpleNamespace]) -> None:
+    stats_rows.extend([
+        rollup_row([10], path='/a', method='GET'),
+        rollup_row([10, 20], path='/b', method='GET'),
+        rollup_row([30, 40], path='/a', method='GET'),
+        rollup_row([5], path='/a', method='POST'),
+    ])
+
+    endpoints = asyncio.run(
+        opera_log_rollup_service.get_endpoints(
+            start_time=START_TIME, end_time=START_TIME + timedelta(hours=1), method=None
+        )
+    )
+
+    assert [(item['path'], item['method'], item['count']) for item in endpoints] == [
+        ('/a', 'GET', 3),
+        ('/b', 'GET', 2),
+        ('/a', 'POST', 1),
+    ]
+    assert next(item for item in endpoints if item['path'] == '/a' and item['method'] == 'GET')['max_cost_time'] == 40.0
+
+
+@pytest.mark.parametrize(
+    ('start_time', 'end_time'),
+    [
+        (START_TIME, START_TIME),
+        (START_TIME, START_TIME - timedelta(minutes=1)),
+        (START_TIME, START_TIME + timedelta(days=30)),
+    ],
+)
+def test_get_range_invalid(start_time: datetime, end_time: datetime) -> None:
+    with pytest.raises(errors.RequestError):
+        opera_log_rollup_service._get_range(start_time, end_time)
+
+
+def test_record_merge_existing_rollup(monkeypatch: pytest.MonkeyPatch) -> None:
+    db = FakeSession()
+    existing = SimpleNamespace(
+        bucket=START_TIME.replace(tzinfo=None),
+        path='/users/{pk}',
+        method='GET',
+        code='200',
+        **vars(rollup_row([100])),
+    )
+
+    async def get_by_node(db, node, buckets) -> list[SimpleNamespace]:
+        return [existing]
+
+    monkeypatch.setattr(module.opera_log_rollup_dao, 'get_by_node', get_by_node)
+    logs = [
+        create_log('/users/1', '/users/{pk}', 10, 0, StatusType.enable),
+        create_log('/users/2', '/users/{pk}', 20, 0, StatusType.enable),
+        create_log('/users/2', '/users/{pk}', 30, 1, StatusType.disable),
+        create_log('/static/a', None, 5, 0, StatusType.enable),
+    ]
+
+    asyncio.run(opera_log_rollup_service.record(db, logs=logs))
+
+    # 路由相同的请求合并到已有的汇总行，数据库读取的不带时区时间视为当前时区时间
+    assert existing.count == 3
+    assert existing.cost_time_sum == 130
+    assert existing.cost_time_max == 100
+    assert QuantileSketch.from_dict(existing.cost_time_sketch).count == 3
+    added = {(row.bucket, row.path, row.code): row for row in db.added}
+    assert set(added) == {
+        (START_TIME + timedelta(minutes=1), '/users/{pk}', '500'),
+        (START_TIME, '/static/a', '200'),
+    }
+    assert added[(START_TIME + timedelta(minutes=1), '/users/{pk}', '500')].error_count == 1
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from backend.app.admin.service import user_service as module
+from backend.app.admin.service.user_service import user_service
+from backend.common.enums import UserPermissionType
+from backend.common.security.jwt import jwt_encode
+from backend.utils.timezone import timezone
+
+USER_ID = 1
+SESSION_UUID = 'current-session'
+
+
+class FakeTransaction:
+    """模拟事务，可指定提交失败"""
+
+    def __init__(self, fail: bool) -> None:
+        self.fail = fail
+
+    async def __aenter__(self) -> SimpleNamespace:
+        return SimpleNamespace()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and self.fail:
+            raise RuntimeError('commit failed')
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.calls: list[tuple[Any, ...]] = []
+
+    async def __call__(self, *args: Any) -> None:
+        self.calls.append(args)
+
+
+@pytest.fixture
+def revoke(monkeypatch: pytest.MonkeyPatch) -> Recorder:
+    recorder = Recorder()
+    user = SimpleNamespace(id=USER_ID, is_multi_login=True, password='hashed')
+
+    async def get(db, pk) -> SimpleNamespace:
+        return user
+
+    async def update(*args) -> int:
+        return 1
+
+    monkeypatch.setattr(module, 'revoke_user_tokens', recorder)
+    monkeypatch.setattr(module, 'invalidate_user_cache', Recorder())
+    monkeypatch.setattr(module.user_dao, 'get', get)
+    for name in ('reset_password', 'delete', 'set_multi_login'):
+        monkeypatch.setattr(module.user_dao, name, update)
+    return recorder
+
+
+def set_commit(monkeypatch: pytest.MonkeyPatch, fail: bool) -> None:
+    monkeypatch.setattr(module, 'async_db_session', SimpleNamespace(begin=lambda: FakeTransaction(fail)))
+
+
+def create_request(user_id: int = USER_ID) -> SimpleNamespace:
+    token = jwt_encode({
+        'session_uuid': SESSION_UUID,
+        'exp': timezone.to_utc(timezone.now() + timedelta(minutes=5)).timestamp(),
+        'sub': str(user_id),
+        'gen': 0,
+    })
+    return SimpleNamespace(
+        headers={'Authorization': f'Bearer {token}'},
+        user=SimpleNamespace(id=user_id, is_superuser=True, is_staff=True, is_multi_login=True),
+    )
+
+
+def test_revoke_after_commit(monkeypatch: pytest.MonkeyPatch, revoke: Recorder) -> None:
+    set_commit(monkeypatch, fail=False)
+
+    asyncio.run(user_service.reset_password(request=create_request(), pk=USER_ID, password='123456'))
+    asyncio.run(user_service.delete(pk=USER_ID))
+
+    assert revoke.calls == [(USER_ID,), (USER_ID,)]
+
+
+def test_no_revoke_when_commit_fails(monkeypatch: pytest.MonkeyPatch, revoke: Recorder) -> None:
+    set_commit(monkeypatch, fail=True)
+
+    # 事务提交失败时密码未修改，token 不应被撤销
+    with pytest.raises(RuntimeError):
+        asyncio.run(user_service.reset_password(request=create_request(), pk=USER_ID, password='123456'))
+    with pytest.raises(RuntimeError):
+        asyncio.run(user_service.delete(pk=USER_ID))
+
+    assert revoke.calls == []
+
+
+def test_disable_own_multi_login_keeps_current_session(monkeypatch: pytest.MonkeyPatch, revoke: Recorder) -> None:
+    set_commit(monkeypatch, fail=False)
+    monkeypatch.setattr(module.redis_client, 'delete_prefix', None)
+
+    asyncio.run(
+        user_service.update_permission(request=create_request(), pk=USER_ID, type=UserPermissionType.multi_login)
+    )
+
+    assert revoke.calls == [(USER_ID, SESSION_UUID)]
+
+
+def test_disable_other_multi_login_revokes_all(monkeypatch: pytest.MonkeyPatch, revoke: Recorder) -> None:
+    set_commit(monkeypatch, fail=False)
+
+    asyncio.run(
+        user_service.update_permission(request=create_request(2), pk=USER_ID, type=UserPermissionType.multi_login)
+    )
+
+    assert revoke.calls == [(USER_ID, None)]
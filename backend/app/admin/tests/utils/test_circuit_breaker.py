@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from backend.utils.circuit_breaker import CircuitBreaker
+
+
+def open_breaker(recovery_timeout: float = 0) -> CircuitBreaker:
+    breaker = CircuitBreaker(2, recovery_timeout)
+    breaker.record_failure(breaker.allow())
+    breaker.record_failure(breaker.allow())
+    assert breaker.state == CircuitBreaker.open
+    return breaker
+
+
+def test_open_after_threshold() -> None:
+    breaker = open_breaker(60)
+
+    assert breaker.allow() is None
+    assert breaker.rejected == 1
+
+
+def test_success_resets_failures() -> None:
+    breaker = CircuitBreaker(2, 0)
+    breaker.record_failure(breaker.allow())
+    breaker.record_success(breaker.allow())
+    breaker.record_failure(breaker.allow())
+
+    assert breaker.state == CircuitBreaker.closed
+    assert breaker.failures == 1
+
+
+def test_single_probe() -> None:
+    breaker = open_breaker()
+
+    probe = breaker.allow()
+    assert probe
+    assert breaker.state == CircuitBreaker.half_open
+    # 试探期间拒绝其余调用
+    assert breaker.allow() is None
+
+
+def test_probe_success_closes() -> None:
+    breaker = open_breaker()
+    probe = breaker.allow()
+    breaker.record_success(probe)
+    breaker.release(probe)
+
+    assert breaker.state == CircuitBreaker.closed
+    assert breaker.failures == 0
+
+
+def test_probe_failure_reopens() -> None:
+    breaker = open_breaker()
+    probe = breaker.allow()
+    breaker.record_failure(probe)
+    breaker.release(probe)
+
+    assert breaker.state == CircuitBreaker.open
+
+
+def test_probe_release_reopens() -> None:
+    breaker = open_breaker()
+    probe = breaker.allow()
+    breaker.release(probe)
+
+    assert breaker.state == CircuitBreaker.open
+    assert breaker.allow() != probe
+
+
+def test_non_probe_cannot_change_half_open() -> None:
+    breaker = CircuitBreaker(2, 0)
+    # 熔断前放行的普通调用
+    token = breaker.allow()
+    breaker.record_failure(breaker.allow())
+    breaker.record_failure(breaker.allow())
+    probe = breaker.allow()
+
+    breaker.record_success(token)
+    breaker.release(token)
+    assert breaker.state == CircuitBreaker.half_open
+    breaker.record_failure(token)
+    assert breaker.state == CircuitBreaker.half_open
+
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.closed
+
+
+def test_stale_probe_ignored() -> None:
+    breaker = open_breaker()
+    stale = breaker.allow()
+    breaker.release(stale)
+    probe = breaker.allow()
+
+    breaker.record_success(stale)
+    breaker.release(stale)
+    assert breaker.state == CircuitBreaker.half_open
+
+    breaker.record_failure(probe)
+    assert breaker.state == CircuitBreaker.open
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend.common.enums import OperaLogCipherType
+from backend.utils.desensitize import Desensitizer
+from backend.utils.encrypt import Md5Cipher
+
+SECRET_KEY = '0' * 64
+
+
+@pytest.fixture
+def desensitizer() -> Desensitizer:
+    return Desensitizer(['password'], -1, SECRET_KEY)
+
+
+def test_desensitize_nested_dict(desensitizer: Desensitizer) -> None:
+    data = {'username': 'admin', 'profile': {'password': '123456', 'tags': [{'password': 'abc'}]}}
+
+    assert desensitizer(data) == {
+        'username': 'admin',
+        'profile': {'password': '******', 'tags': [{'password': '******'}]},
+    }
+    # 不修改原始参数
+    assert data['profile']['password'] == '123456'
+
+
+def test_desensitize_top_level_list(desensitizer: Desensitizer) -> None:
+    data = [{'username': 'a', 'password': '1'}, [{'password': '2'}], 'password']
+
+    assert desensitizer(data) == [{'username': 'a', 'password': '******'}, [{'password': '******'}], 'password']
+
+
+def test_desensitize_md5() -> None:
+    desensitizer = Desensitizer(['password'], OperaLogCipherType.md5, SECRET_KEY)
+
+    assert desensitizer([{'password': '123456'}]) == [{'password': Md5Cipher.encrypt('123456')}]
+
+
+def test_desensitize_plan() -> None:
+    desensitizer = Desensitizer(['password'], OperaLogCipherType.plan, SECRET_KEY)
+    data = [{'password': '123456'}]
+
+    assert desensitizer(data) is data
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+import time
+
+from contextlib import suppress
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Generator
+
+import pytest
+
+from backend.common.cache import LocalCache
+from backend.core.conf import settings
+from backend.utils import request_parse
+from backend.utils.circuit_breaker import CircuitBreaker
+from backend.utils.singleflight import SingleFlight
+
+
+class StubServer(ThreadingHTTPServer):
+    """模拟在线 IP 属地接口"""
+
+    daemon_threads = True
+    status = 200
+    delay = 0.0
+    requests = 0
+
+    def handle_error(self, request, client_address) -> None:
+        # 调用方取消请求后写入响应失败，忽略
+        pass
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        body = json.dumps({'status': 'success', 'country': '中国', 'regionName': '上海', 'city': '上海'}).encode()
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch: pytest.MonkeyPatch) -> Generator[StubServer, None, None]:
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, 'IP_LOCATION_ONLINE_URL', f'http://127.0.0.1:{server.server_port}/json/{{ip}}')
+    monkeypatch.setattr(request_parse, 'ip_location_circuit_breaker', CircuitBreaker(2, 0))
+    monkeypatch.setattr(request_parse, 'ip_location_negative_cache', LocalCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(request_parse, 'ip_location_flight', SingleFlight())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(coro) -> object:
+    async def wrapper() -> object:
+        try:
+            return await coro
+        finally:
+            await request_parse.close_ip_location_client()
+
+    return asyncio.run(wrapper())
+
+
+def test_get_location_online(stub_server: StubServer) -> None:
+    location_info = run(request_parse.get_location_online('1.1.1.1', 'pytest'))
+
+    assert location_info['country'] == '中国'
+    assert stub_server.requests == 1
+    assert request_parse.ip_location_circuit_breaker.state == CircuitBreaker.closed
+
+
+def test_get_location_online_circuit_open(stub_server: StubServer) -> None:
+    stub_server.status = 500
+    breaker = request_parse.ip_location_circuit_breaker
+    breaker.recovery_timeout = 60
+
+    async def lookup() -> list[dict | None]:
+        return [await request_parse.get_location_online(f'1.1.1.{i}', 'pytest') for i in range(3)]
+
+    assert run(lookup()) == [None, None, None]
+    # 达到失败阈值后熔断，第三次调用不再请求接口
+    assert stub_server.requests == 2
+    assert breaker.state == CircuitBreaker.open
+    assert breaker.rejected == 1
+
+
+def test_get_location_online_half_open_recovered(stub_server: StubServer) -> None:
+    breaker = request_parse.ip_location_circuit_breaker
+    breaker.record_failure(0)
+    breaker.record_failure(0)
+
+    location_info = run(request_parse.get_location_online('1.1.1.1', 'pytest'))
+
+    assert location_info is not None
+    assert breaker.state == CircuitBreaker.closed
+
+
+def test_get_location_online_half_open_cancelled(stub_server: StubServer) -> None:
+    stub_server.delay = 1
+    breaker = request_parse.ip_location_circuit_breaker
+    breaker.record_failure(0)
+    breaker.record_failure(0)
+
+    async def probe() -> None:
+        task = asyncio.create_task(request_parse.get_location_online('1.1.1.1', 'pytest'))
+        await asyncio.sleep(0.2)
+        assert breaker.state == CircuitBreaker.half_open
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    run(probe())
+
+    # 被取消的试探调用不会使熔断器停留在半开状态
+    assert breaker.state == CircuitBreaker.open
+    assert breaker.allow()
+
+
+def test_get_location_online_stale_call_keeps_probe(stub_server: StubServer) -> None:
+    stub_server.delay = 0.5
+    breaker = request_parse.ip_location_circuit_breaker
+
+    async def lookup() -> None:
+        # 熔断前放行的普通调用
+        task = asyncio.create_task(request_parse.get_location_online('1.1.1.1', 'pytest'))
+        await asyncio.sleep(0.1)
+        breaker.record_failure(0)
+        breaker.record_failure(0)
+        probe = breaker.allow()
+        assert probe
+        await task
+        # 普通调用结束不会释放试探或恢复熔断器
+        assert breaker.state == CircuitBreaker.half_open
+        assert breaker.allow() is None
+        breaker.record_success(probe)
+
+    run(lookup())
+
+    assert breaker.state == CircuitBreaker.closed
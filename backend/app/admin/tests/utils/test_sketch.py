@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+
+from backend.utils.sketch import SKETCH_RELATIVE_ACCURACY, QuantileSketch
+
+
+def exact_quantile(values: list[float], q: float) -> float:
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def test_quantile_relative_error() -> None:
+    rng = random.Random(0)
+    values = [rng.lognormvariate(3, 1) for _ in range(10000)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == len(values)
+    for q in (0.5, 0.95, 0.99):
+        expected = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - expected) <= expected * SKETCH_RELATIVE_ACCURACY
+
+
+def test_merge_equals_single_sketch() -> None:
+    rng = random.Random(1)
+    values = [rng.uniform(0, 500) for _ in range(1000)] + [0.0] * 10
+    whole = QuantileSketch()
+    parts = [QuantileSketch(), QuantileSketch()]
+    for i, value in enumerate(values):
+        whole.add(value)
+        parts[i % 2].add(value)
+
+    merged = QuantileSketch()
+    for part in parts:
+        merged.merge(part)
+
+    assert merged.count == whole.count
+    assert merged.to_dict() == whole.to_dict()
+
+
+def test_serialize_round_trip() -> None:
+    sketch = QuantileSketch()
+    for value in (0, 1, 2.5, 100, 100):
+        sketch.add(value)
+
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+
+    assert restored.count == sketch.count
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+    assert restored.quantile(0) == 0.0
+
+
+def test_empty_sketch() -> None:
+    assert QuantileSketch().quantile(0.5) is None
+    assert QuantileSketch.from_dict(None).count == 0
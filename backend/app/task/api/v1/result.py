@@ -6,16 +6,43 @@ from fastapi import APIRouter, Depends, Path, Query
 
 from backend.app.task.schema.result import DeleteTaskResultParam, GetTaskResultDetail
 from backend.app.task.service.result_service import task_result_service
-from backend.common.pagination import DependsPagination, PageData, paging_data
+from backend.common.pagination import (
+    CursorPageData,
+    DependsCursorPagination,
+    DependsPagination,
+    PageData,
+    cursor_paging_data,
+    paging_data,
+)
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.core.conf import settings
+from backend.database.db import CurrentReadSession
 
 router = APIRouter()
 
 
+@router.get(
+    '/cursor',
+    summary='游标分页获取所有任务结果',
+    description='基于游标分页，不统计总数，适用于数据量较大时的顺序翻页',
+    dependencies=[
+        DependsJwtAuth,
+        DependsCursorPagination,
+    ],
+)
+async def get_task_results_cursor(
+    db: CurrentReadSession,
+    name: Annotated[str | None, Query(description='任务名称')] = None,
+    task_id: Annotated[str | None, Query(description='任务 ID')] = None,
+) -> ResponseSchemaModel[CursorPageData[GetTaskResultDetail]]:
+    result_select = await task_result_service.get_select(name=name, task_id=task_id)
+    page_data = await cursor_paging_data(db, result_select, 'id')
+    return response_base.success(data=page_data)
+
+
 @router.get('/{pk}', summary='获取任务结果详情', dependencies=[DependsJwtAuth])
 async def get_task_result(
     pk: Annotated[int, Path(description='任务结果 ID')],
@@ -33,12 +60,12 @@ async def get_task_result(
     ],
 )
 async def get_task_results_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     name: Annotated[str | None, Query(description='任务名称')] = None,
     task_id: Annotated[str | None, Query(description='任务 ID')] = None,
 ) -> ResponseSchemaModel[PageData[GetTaskResultDetail]]:
     result_select = await task_result_service.get_select(name=name, task_id=task_id)
-    page_data = await paging_data(db, result_select)
+    page_data = await paging_data(db, result_select, settings.PAGINATION_LOG_TOTAL_MODE)
     return response_base.success(data=page_data)
 
 
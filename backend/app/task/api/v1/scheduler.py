@@ -11,7 +11,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 
 router = APIRouter()
 
@@ -39,7 +39,7 @@ async def get_task_scheduler(
     ],
 )
 async def get_task_scheduler_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     name: Annotated[int, Path(description='任务调度名称')] = None,
     type: Annotated[int | None, Query(description='任务调度类型')] = None,
 ) -> ResponseSchemaModel[PageData[GetTaskSchedulerDetail]]:
@@ -14,7 +14,7 @@ from backend.app.task.model import TaskScheduler
 from backend.app.task.schema.scheduler import CreateTaskSchedulerParam, UpdateTaskSchedulerParam
 from backend.app.task.utils.tzcrontab import crontab_verify
 from backend.common.exception import errors
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, async_read_db_session
 
 
 class TaskSchedulerService:
@@ -37,7 +37,7 @@ class TaskSchedulerService:
     @staticmethod
     async def get_all() -> Sequence[TaskScheduler]:
         """获取所有任务调度"""
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             task_schedulers = await task_scheduler_dao.get_all(db)
             return task_schedulers
 
@@ -22,10 +22,10 @@ LOCAL_BEAT_SCHEDULE = {
     },
     '清理操作日志': {
         'task': 'backend.app.task.tasks.db_log.tasks.delete_db_opera_log',
-        'schedule': TzAwareCrontab('0', '0', day_of_week='6'),
+        'schedule': TzAwareCrontab('0', '0'),
     },
     '清理登录日志': {
         'task': 'backend.app.task.tasks.db_log.tasks.delete_db_login_log',
-        'schedule': TzAwareCrontab('0', '0', day_of_month='15'),
+        'schedule': TzAwareCrontab('0', '0'),
     },
 }
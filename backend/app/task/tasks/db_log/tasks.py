@@ -3,18 +3,20 @@
 from celery import shared_task
 
 from backend.app.admin.service.login_log_service import login_log_service
+from backend.app.admin.service.opera_log_rollup_service import opera_log_rollup_service
 from backend.app.admin.service.opera_log_service import opera_log_service
 
 
 @shared_task
 async def delete_db_opera_log() -> str:
-    """自动删除数据库操作日志"""
-    await opera_log_service.delete_all()
-    return 'Success'
+    """自动清理数据库过期操作日志及汇总"""
+    result = await opera_log_service.clean()
+    rollup_deleted = await opera_log_rollup_service.clean()
+    return f'{result}, rollup_deleted={rollup_deleted}'
 
 
 @shared_task
 async def delete_db_login_log() -> str:
-    """自动删除数据库登录日志"""
-    await login_log_service.delete_all()
-    return 'Success'
+    """自动清理数据库过期登录日志"""
+    result = await login_log_service.clean()
+    return str(result)
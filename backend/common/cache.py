@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+_MISSING = object()
+
+
+class LocalCache(Generic[K, V]):
+    """
+    进程内 LRU 缓存，支持 TTL 过期和命中统计
+
+    仅在当前进程内有效，多进程部署时需自行处理跨进程失效
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        """
+        初始化进程内缓存
+
+        :param maxsize: 最大缓存条目数，超出时淘汰最久未使用的条目
+        :param ttl: 过期时间（秒），为 None 时永不过期
+        :return:
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        """
+        获取缓存
+
+        :param key: 缓存键
+        :param default: 缓存不存在或已过期时的默认值
+        :return:
+        """
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expire, value = item
+            if expire is not None and expire <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """
+        设置缓存
+
+        :param key: 缓存键
+        :param value: 缓存值
+        :param ttl: 过期时间（秒），默认使用实例配置
+        :return:
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        expire = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expire, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: K) -> None:
+        """
+        删除缓存
+
+        :param keys: 缓存键
+        :return:
+        """
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """获取缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
@@ -39,6 +39,7 @@ class AccessToken:
     access_token: str
     access_token_expire_time: datetime
     session_uuid: str
+    generation: int
 
 
 @dataclasses.dataclass
@@ -61,6 +62,7 @@ class TokenPayload:
     id: int
     session_uuid: str
     expire_time: datetime
+    generation: int = 0
 
 
 @dataclasses.dataclass
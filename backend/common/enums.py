@@ -146,6 +146,14 @@ class DataBaseType(StrEnum):
     postgresql = 'postgresql'
 
 
+class PaginationTotalMode(StrEnum):
+    """分页总数统计方式"""
+
+    exact = 'exact'
+    cached = 'cached'
+    estimated = 'estimated'
+
+
 class PrimaryKeyType(StrEnum):
     """主键类型"""
 
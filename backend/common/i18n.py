@@ -4,6 +4,7 @@ import glob
 import json
 import os
 
+from contextvars import ContextVar
 from pathlib import Path
 from typing import Any
 
@@ -12,13 +13,25 @@ import yaml
 from backend.core.conf import settings
 from backend.core.path_conf import LOCALE_DIR
 
+# 当前请求的语言，每个请求在独立的上下文中设置，避免并发请求互相覆盖
+_current_language: ContextVar[str] = ContextVar('current_language', default=settings.I18N_DEFAULT_LANGUAGE)
+
 
 class I18n:
     """国际化管理器"""
 
     def __init__(self):
         self.locales: dict[str, dict[str, Any]] = {}
-        self.current_language: str = settings.I18N_DEFAULT_LANGUAGE
+        self.translations: dict[str, dict[str, Any]] = {}
+
+    @property
+    def current_language(self) -> str:
+        """当前请求的语言"""
+        return _current_language.get()
+
+    @current_language.setter
+    def current_language(self, language: str) -> None:
+        _current_language.set(language)
 
     def load_locales(self):
         """加载语言文本"""
@@ -42,6 +55,24 @@ class I18n:
                         self.locales[lang] = json.loads(f.read())
                     case 'yaml' | 'yml':
                         self.locales[lang] = yaml.full_load(f.read())
+                self.translations[lang] = self.flatten(self.locales[lang])
+
+    @staticmethod
+    def flatten(translation: dict[str, Any], prefix: str = '') -> dict[str, Any]:
+        """
+        将嵌套的语言文本展开为点分隔键
+
+        :param translation: 语言文本
+        :param prefix: 键前缀
+        :return:
+        """
+        flat = {}
+        for key, value in translation.items():
+            if isinstance(value, dict):
+                flat.update(I18n.flatten(value, f'{prefix}{key}.'))
+            else:
+                flat[f'{prefix}{key}'] = value
+        return flat
 
     def t(self, key: str, default: Any | None = None, **kwargs) -> str:
         """
@@ -52,23 +83,14 @@ class I18n:
         :param kwargs: 目标文本中的变量参数
         :return:
         """
-        keys = key.split('.')
-
         try:
-            translation = self.locales[self.current_language]
+            translations = self.translations[self.current_language]
         except KeyError:
-            keys = 'error.language_not_found'
-            translation = self.locales[settings.I18N_DEFAULT_LANGUAGE]
+            translations = self.translations[settings.I18N_DEFAULT_LANGUAGE]
+            key = 'error.language_not_found'
 
-        for k in keys:
-            if isinstance(translation, dict) and k in list(translation.keys()):
-                translation = translation[k]
-            else:
-                # Pydantic 兼容
-                if keys[0] == 'pydantic':
-                    translation = None
-                else:
-                    translation = key
+        # Pydantic 兼容
+        translation = translations.get(key, None if key.startswith('pydantic.') else key)
 
         if translation and kwargs:
             translation = translation.format(**kwargs)
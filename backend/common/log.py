@@ -5,6 +5,13 @@ import logging
 import os
 import re
 import sys
+import threading
+import traceback
+
+from queue import Empty, SimpleQueue
+from typing import Any, TextIO
+
+import msgspec
 
 from asgi_correlation_id import correlation_id
 from loguru import logger
@@ -21,12 +28,35 @@ class InterceptHandler(logging.Handler):
     参考：https://loguru.readthedocs.io/en/stable/overview.html#entirely-compatible-with-standard-logging
     """
 
+    def __init__(self, level: int | str = logging.NOTSET) -> None:
+        super().__init__(level)
+        # 日志格式中包含调用者信息时才需要遍历调用栈
+        self.caller_required = not settings.LOG_JSON_FORMAT and bool(
+            re.search(r'{(module|function|line|file)\b', settings.LOG_FORMAT)
+        )
+        self.levels: dict[str, str | int] = {}
+        self.loggers: dict[str, Any] = {}
+
     def emit(self, record: logging.LogRecord):
         # 获取对应的 Loguru 级别（如果存在）
-        try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
+        level = self.levels.get(record.levelname)
+        if level is None:
+            try:
+                level = logger.level(record.levelname).name
+            except ValueError:
+                level = record.levelno
+            self.levels[record.levelname] = level
+
+        if not self.caller_required:
+            # 跳过调用栈遍历，按标准库日志记录器名称缓存 loguru 日志记录器，并将其名称作为日志名称
+            std_logger = self.loggers.get(record.name)
+            if std_logger is None:
+                std_logger = logger.patch(lambda r, name=record.name: r.update(name=name))
+                self.loggers[record.name] = std_logger
+            if record.exc_info:
+                std_logger = std_logger.opt(exception=record.exc_info)
+            std_logger.log(level, record.getMessage())
+            return
 
         # 查找记录日志消息的调用者
         frame, depth = inspect.currentframe(), 0
@@ -37,6 +67,89 @@ class InterceptHandler(logging.Handler):
         logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
 
 
+class BatchStreamSink:
+    """
+    批量写入日志流
+
+    日志先进入内存队列，由后台线程合并后批量写入，避免每条日志在事件循环中同步写入及刷新输出流
+    """
+
+    def __init__(self, stream: TextIO, batch_size: int) -> None:
+        """
+        初始化批量写入日志流
+
+        :param stream: 输出流
+        :param batch_size: 单次写入的最大日志条数
+        :return:
+        """
+        self.stream = stream
+        self.batch_size = batch_size
+        self.queue: SimpleQueue[str | None] = SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name='log-writer', daemon=True)
+        self.thread.start()
+
+    def write(self, message: str) -> None:
+        self.queue.put(message)
+
+    def stop(self) -> None:
+        """停止后台线程，并写入剩余日志"""
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+    def run(self) -> None:
+        """后台写入线程"""
+        while True:
+            message = self.queue.get()
+            if message is None:
+                return
+            batch = [message]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    message = self.queue.get_nowait()
+                except Empty:
+                    break
+                if message is None:
+                    stopping = True
+                    break
+                batch.append(message)
+            try:
+                self.stream.write(''.join(batch))
+                self.stream.flush()
+            except Exception:
+                # 输出流不可用时丢弃本批次，不影响后续日志
+                pass
+            if stopping:
+                return
+
+
+_json_encoder = msgspec.json.Encoder(enc_hook=str)
+
+
+def json_formatter(record: dict[str, Any]) -> str:
+    """
+    JSON 日志格式化程序
+
+    每条日志仅编码一次，编码结果缓存于 extra 中供所有处理器复用
+    """
+    extra = record['extra']
+    if 'json' not in extra:
+        data = {
+            'time': record['time'].isoformat(),
+            'level': record['level'].name,
+            'trace_id': record.get('correlation_id')
+            or correlation_id.get(settings.TRACE_ID_LOG_DEFAULT_VALUE)[: settings.TRACE_ID_LOG_LENGTH],
+            'name': record['name'],
+            'message': record['message'],
+        }
+        # extra 中的字段（如访问日志的请求方法、状态码等）作为结构化字段输出
+        data.update(extra)
+        if record['exception']:
+            data['exception'] = ''.join(traceback.format_exception(*record['exception']))
+        extra['json'] = _json_encoder.encode(data).decode()
+    return '{extra[json]}\n'
+
+
 def default_formatter(record):
     """默认日志格式化程序"""
 
@@ -88,9 +201,11 @@ def setup_logging() -> None:
     logger.configure(
         handlers=[
             {
-                'sink': sys.stdout,
+                'sink': BatchStreamSink(sys.stdout, settings.LOG_JSON_BATCH_SIZE)
+                if settings.LOG_JSON_FORMAT
+                else sys.stdout,
                 'level': settings.LOG_STD_LEVEL,
-                'format': default_formatter,
+                'format': json_formatter if settings.LOG_JSON_FORMAT else default_formatter,
                 'filter': lambda record: correlation_id_filter(record),
             }
         ]
@@ -117,7 +232,7 @@ def set_custom_logfile() -> None:
     # 日志文件通用配置
     # https://loguru.readthedocs.io/en/stable/api/logger.html#loguru._logger.Logger.add
     log_config = {
-        'format': default_formatter,
+        'format': json_formatter if settings.LOG_JSON_FORMAT else default_formatter,
         'enqueue': True,
         'rotation': '00:00',
         'retention': '7 days',
@@ -2,19 +2,37 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
+
+from datetime import datetime
 from math import ceil
-from typing import TYPE_CHECKING, Any, Generic, Sequence, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, Literal, Sequence, TypeVar
 
 from fastapi import Depends, Query
-from fastapi_pagination import pagination_ctx
-from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
-from fastapi_pagination.ext.sqlalchemy import apaginate
+from fastapi_pagination import pagination_ctx, resolve_params
+from fastapi_pagination.api import request
+from fastapi_pagination.bases import AbstractPage, AbstractParams, CursorRawParams, RawParams
+from fastapi_pagination.ext.sqlalchemy import apaginate, create_count_query
 from fastapi_pagination.links.bases import create_links
 from pydantic import BaseModel, Field
+from sqlalchemy import Table, and_, or_, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from backend.common.enums import DataBaseType, PaginationTotalMode
+from backend.common.exception import errors
+from backend.core.conf import settings
+from backend.database.redis import redis_client
 
 if TYPE_CHECKING:
     from sqlalchemy import Select
     from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import InstrumentedAttribute
+    from sqlalchemy.sql.compiler import SQLCompiler
+    from starlette.datastructures import URL
 
 T = TypeVar('T')
 SchemaT = TypeVar('SchemaT')
@@ -48,6 +66,7 @@ class _PageDetails(BaseModel):
 
     items: list = Field([], description='当前页数据列表')
     total: int = Field(description='数据总条数')
+    total_exact: bool = Field(True, description='数据总条数是否精确，为否时为缓存值或估算值')
     page: int = Field(description='当前页码')
     size: int = Field(description='每页数量')
     total_pages: int = Field(description='总页数')
@@ -64,8 +83,13 @@ class _CustomPage(_PageDetails, AbstractPage[T], Generic[T]):
         cls,
         items: list,
         params: _CustomPageParams,
-        total: int = 0,
+        total: int | None = None,
+        *,
+        known_total: int = 0,
+        total_exact: bool = True,
     ) -> _CustomPage[T]:
+        # 未由分页库统计总数时，使用预先获取的总数
+        total = known_total if total is None else total
         page = params.page
         size = params.size
         total_pages = ceil(total / size)
@@ -79,6 +103,7 @@ class _CustomPage(_PageDetails, AbstractPage[T], Generic[T]):
         return cls(
             items=items,
             total=total,
+            total_exact=total_exact,
             page=page,
             size=size,
             total_pages=total_pages,
@@ -111,18 +136,317 @@ class PageData(_PageDetails, Generic[SchemaT]):
     items: Sequence[SchemaT]
 
 
-async def paging_data(db: AsyncSession, select: Select) -> dict[str, Any]:
+class _CustomPageParamsWithoutTotal(_CustomPageParams):
+    """不统计总数的自定义分页参数"""
+
+    def to_raw_params(self) -> RawParams:
+        raw_params = super().to_raw_params()
+        raw_params.include_total = False
+        return raw_params
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN 语句"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, 'postgresql')
+def _compile_postgresql_explain(element: _Explain, compiler: SQLCompiler, **kwargs) -> str:
+    return f'EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kwargs)}'
+
+
+@compiles(_Explain, 'mysql')
+def _compile_mysql_explain(element: _Explain, compiler: SQLCompiler, **kwargs) -> str:
+    return f'EXPLAIN {compiler.process(element.statement, **kwargs)}'
+
+
+async def _count_total(db: AsyncSession, select: Select) -> int:
+    """
+    精确统计总数
+
+    :param db: 数据库会话
+    :param select: SQL 查询语句
+    :return:
+    """
+    return await db.scalar(create_count_query(select)) or 0
+
+
+async def _cached_total(db: AsyncSession, select: Select) -> tuple[int, bool]:
+    """
+    获取缓存的总数，缓存键为规范化后的统计语句及其参数的哈希，相同筛选条件共享缓存
+
+    :param db: 数据库会话
+    :param select: SQL 查询语句
+    :return:
+    """
+    count_query = create_count_query(select)
+    compiled = count_query.compile(dialect=db.bind.dialect)
+    digest = hashlib.sha1(f'{compiled.string}|{sorted(compiled.params.items(), key=str)}'.encode()).hexdigest()
+    key = f'{settings.PAGINATION_TOTAL_CACHE_REDIS_PREFIX}:{digest}'
+    cached = await redis_client.get(key)
+    if cached is not None:
+        return int(cached), False
+    total = await db.scalar(count_query) or 0
+    await redis_client.setex(key, settings.PAGINATION_TOTAL_CACHE_EXPIRE_SECONDS, total)
+    return total, True
+
+
+async def _estimate_total(db: AsyncSession, select: Select) -> int | None:
+    """
+    获取执行计划估算的总数
+
+    PostgreSQL 使用 EXPLAIN 估算的结果行数；MySQL 无筛选条件时使用 information_schema 中的表行数统计，
+    否则使用 EXPLAIN 估算的扫描行数与过滤比例
+
+    :param db: 数据库会话
+    :param select: SQL 查询语句
+    :return: 无法估算时返回 None
+    """
+    select = select.order_by(None)
+    match db.bind.dialect.name:
+        case DataBaseType.postgresql:
+            plan = await db.scalar(_Explain(select))
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        case DataBaseType.mysql:
+            froms = select.get_final_froms()
+            if select.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+                return await db.scalar(
+                    text(
+                        'SELECT table_rows FROM information_schema.tables '
+                        'WHERE table_schema = DATABASE() AND table_name = :table_name'
+                    ),
+                    {'table_name': froms[0].name},
+                )
+            row = (await db.execute(_Explain(select))).mappings().first()
+            if row is None or row['rows'] is None:
+                return None
+            return int(row['rows'] * (row['filtered'] or 100) / 100)
+        case _:
+            return None
+
+
+async def _resolve_total(db: AsyncSession, select: Select, total_mode: PaginationTotalMode) -> tuple[int, bool]:
+    """
+    按统计方式获取总数
+
+    :param db: 数据库会话
+    :param select: SQL 查询语句
+    :param total_mode: 总数统计方式
+    :return: 总数及其是否精确
+    """
+    if total_mode == PaginationTotalMode.cached:
+        return await _cached_total(db, select)
+    estimated = await _estimate_total(db, select)
+    if estimated is not None and estimated >= settings.PAGINATION_TOTAL_ESTIMATE_THRESHOLD:
+        return estimated, False
+    # 估算值较小时精确统计的代价可以接受
+    return await _count_total(db, select), True
+
+
+async def paging_data(
+    db: AsyncSession,
+    select: Select,
+    total_mode: PaginationTotalMode | str = PaginationTotalMode.exact,
+) -> dict[str, Any]:
     """
     基于 SQLAlchemy 创建分页数据
 
     :param db: 数据库会话
     :param select: SQL 查询语句
+    :param total_mode: 总数统计方式，exact：精确统计；cached：缓存精确统计结果；estimated：数据量较大时使用执行计划估算
     :return:
     """
-    paginated_data: _CustomPage = await apaginate(db, select)
+    if total_mode == PaginationTotalMode.exact:
+        paginated_data: _CustomPage = await apaginate(db, select)
+    else:
+        params: _CustomPageParams = resolve_params()
+        total, total_exact = await _resolve_total(db, select, PaginationTotalMode(total_mode))
+        paginated_data = await apaginate(
+            db,
+            select,
+            params=_CustomPageParamsWithoutTotal(page=params.page, size=params.size),
+            additional_data={'known_total': total, 'total_exact': total_exact},
+        )
     page_data = paginated_data.model_dump()
     return page_data
 
 
+class _CursorPageParams(BaseModel, AbstractParams):
+    """游标分页参数"""
+
+    cursor: str | None = Query(None, description='分页游标，为空时获取首页')
+    size: int = Query(20, gt=0, le=200, description='每页数量')
+
+    def to_raw_params(self) -> CursorRawParams:
+        return CursorRawParams(cursor=self.cursor, size=self.size)
+
+
+class _CursorLinks(BaseModel):
+    """游标分页链接"""
+
+    first: str = Field(description='首页链接')
+    self: str = Field(description='当前页链接')
+    next: str | None = Field(None, description='下一页链接')
+    prev: str | None = Field(None, description='上一页链接')
+
+
+class _CursorPageDetails(BaseModel):
+    """游标分页详情"""
+
+    items: list = Field([], description='当前页数据列表')
+    size: int = Field(description='每页数量')
+    next_cursor: str | None = Field(None, description='下一页游标')
+    prev_cursor: str | None = Field(None, description='上一页游标')
+    links: _CursorLinks = Field(description='分页链接')
+
+
+class _CursorPage(_CursorPageDetails, AbstractPage[T], Generic[T]):
+    """游标分页类"""
+
+    __params_type__ = _CursorPageParams
+
+    @classmethod
+    def create(
+        cls,
+        items: list,
+        params: _CursorPageParams,
+        next_cursor: str | None = None,
+        prev_cursor: str | None = None,
+    ) -> _CursorPage[T]:
+        url = request().url
+
+        def link(cursor: str | None) -> str:
+            target = url.remove_query_params('cursor')
+            if cursor is not None:
+                target = target.include_query_params(cursor=cursor)
+            return _url_path(target)
+
+        links = _CursorLinks(
+            first=link(None),
+            self=_url_path(url),
+            next=link(next_cursor) if next_cursor else None,
+            prev=link(prev_cursor) if prev_cursor else None,
+        )
+        return cls(
+            items=items,
+            size=params.size,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            links=links,
+        )
+
+
+class CursorPageData(_CursorPageDetails, Generic[SchemaT]):
+    """包含返回数据 schema 的统一返回模型，仅适用于游标分页接口，用法同 PageData"""
+
+    items: Sequence[SchemaT]
+
+
+def _url_path(url: URL) -> str:
+    return f'{url.path}?{url.query}' if url.query else url.path
+
+
+def _encode_cursor(direction: Literal['next', 'prev'], values: list[Any]) -> str:
+    """
+    编码分页游标
+
+    :param direction: 翻页方向
+    :param values: 排序键的值
+    :return:
+    """
+    data = [direction, [value.isoformat() if isinstance(value, datetime) else value for value in values]]
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> tuple[str, list[Any]]:
+    """
+    解码分页游标
+
+    :param cursor: 分页游标
+    :param keys: 排序键
+    :return:
+    """
+    try:
+        direction, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if direction not in ('next', 'prev') or len(values) != len(keys):
+            raise ValueError
+        return direction, [
+            datetime.fromisoformat(value) if key.type.python_type is datetime else key.type.python_type(value)
+            for key, value in zip(keys, values)
+        ]
+    except Exception:
+        raise errors.RequestError(msg='分页游标无效')
+
+
+def _keyset_filter(keys: Sequence[InstrumentedAttribute], values: list[Any], after: bool) -> Any:
+    """
+    构建键集分页条件，例如 (a, b) 之后：a < :a OR (a = :a AND b < :b)
+
+    :param keys: 排序键（降序）
+    :param values: 游标中排序键的值
+    :param after: 是否获取游标之后的数据
+    :return:
+    """
+    conditions = []
+    for i, key in enumerate(keys):
+        boundary = key < values[i] if after else key > values[i]
+        conditions.append(and_(*[keys[j] == values[j] for j in range(i)], boundary))
+    return or_(*conditions)
+
+
+async def cursor_paging_data(db: AsyncSession, select: Select, *keys: str) -> dict[str, Any]:
+    """
+    基于 SQLAlchemy 创建游标分页数据
+
+    按排序键降序分页，不统计总数，翻页耗时与页码深度无关；排序键组合必须唯一，通常以主键结尾，
+    并应存在对应的联合索引
+
+    :param db: 数据库会话
+    :param select: SQL 查询语句，原有排序将被替换
+    :param keys: 排序键（查询实体的字段名），例如 'created_time', 'id'
+    :return:
+    """
+    model = select.column_descriptions[0]['entity']
+    columns = [getattr(model, key) for key in keys]
+    params: _CursorPageParams = resolve_params()
+    size = params.size
+    direction = 'next'
+    if params.cursor:
+        direction, values = _decode_cursor(params.cursor, columns)
+        select = select.where(_keyset_filter(columns, values, after=direction == 'next'))
+
+    order_by = [column.desc() if direction == 'next' else column.asc() for column in columns]
+    rows = list((await db.scalars(select.order_by(None).order_by(*order_by).limit(size + 1))).all())
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if direction == 'prev':
+        rows.reverse()
+
+    def cursor_of(row: Any, to: Literal['next', 'prev']) -> str:
+        return _encode_cursor(to, [getattr(row, key) for key in keys])
+
+    next_cursor = prev_cursor = None
+    if rows:
+        # 向后翻页时，存在上一页的前提是请求携带了游标；向前翻页时同理
+        if direction == 'next':
+            next_cursor = cursor_of(rows[-1], 'next') if has_more else None
+            prev_cursor = cursor_of(rows[0], 'prev') if params.cursor else None
+        else:
+            next_cursor = cursor_of(rows[-1], 'next')
+            prev_cursor = cursor_of(rows[0], 'prev') if has_more else None
+
+    page = _CursorPage.create(rows, params, next_cursor=next_cursor, prev_cursor=prev_cursor)
+    return page.model_dump()
+
+
 # 分页依赖注入
 DependsPagination = Depends(pagination_ctx(_CustomPage))
+
+# 游标分页依赖注入
+DependsCursorPagination = Depends(pagination_ctx(_CursorPage))
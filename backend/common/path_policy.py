@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re
+
+from functools import lru_cache
+from typing import Iterable, Pattern
+
+from backend.core.conf import settings
+
+# 可用作作用域内联标志的正则标志
+_INLINE_FLAGS = {re.ASCII: 'a', re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's', re.VERBOSE: 'x'}
+
+
+class PathMatcher:
+    """
+    路径匹配器
+
+    精确路径编译为哈希集合，正则表达式合并为单个交替表达式，匹配结果按路径缓存
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str] = (),
+        patterns: Iterable[Pattern[str] | str] = (),
+        maxsize: int = 4096,
+    ) -> None:
+        """
+        初始化路径匹配器
+
+        :param paths: 精确匹配路径
+        :param patterns: 正则匹配规则
+        :param maxsize: 匹配结果缓存最大条目数
+        :return:
+        """
+        self.paths = frozenset(paths)
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+        self.pattern = self.compile_patterns(self.patterns)
+        self.match = lru_cache(maxsize=maxsize)(self._match)
+
+    @staticmethod
+    def compile_patterns(patterns: Iterable[Pattern[str]]) -> Pattern[str] | None:
+        """
+        将多个正则表达式合并为单个交替表达式
+
+        各规则的标志转换为作用域内联标志，仅对该规则生效；无法合并时（例如规则中包含全局内联标志）返回 None
+
+        :param patterns: 正则匹配规则
+        :return:
+        """
+        sources = []
+        for pattern in patterns:
+            flags = ''.join(letter for flag, letter in _INLINE_FLAGS.items() if pattern.flags & flag)
+            sources.append(f'(?{flags}:{pattern.pattern})')
+        if not sources:
+            return None
+        try:
+            return re.compile('|'.join(sources))
+        except re.error:
+            return None
+
+    def _match(self, path: str) -> bool:
+        """
+        匹配路径
+
+        :param path: 请求路径
+        :return:
+        """
+        if path in self.paths:
+            return True
+        if self.pattern is not None:
+            return self.pattern.match(path) is not None
+        return any(pattern.match(path) is not None for pattern in self.patterns)
+
+
+class PathPolicy:
+    """请求路径策略，统一判断认证、鉴权和操作日志的路由白名单"""
+
+    def __init__(self) -> None:
+        self.auth_exclude = PathMatcher(
+            settings.TOKEN_REQUEST_PATH_EXCLUDE, settings.TOKEN_REQUEST_PATH_EXCLUDE_PATTERN
+        )
+        self.opera_log_exclude = PathMatcher(
+            settings.OPERA_LOG_PATH_EXCLUDE,
+            # 非 API 路由不记录操作日志
+            [rf'^(?!{re.escape(settings.FASTAPI_API_V1_PATH)})'],
+        )
+
+    def is_auth_exempt(self, path: str) -> bool:
+        """
+        是否免 JWT 认证
+
+        :param path: 请求路径
+        :return:
+        """
+        return self.auth_exclude.match(path)
+
+    def is_rbac_exempt(self, path: str) -> bool:
+        """
+        是否免 RBAC 鉴权
+
+        :param path: 请求路径
+        :return:
+        """
+        return self.auth_exclude.match(path)
+
+    def is_opera_log_exempt(self, path: str) -> bool:
+        """
+        是否免记录操作日志
+
+        :param path: 请求路径
+        :return:
+        """
+        return self.opera_log_exclude.match(path)
+
+
+# 创建请求路径策略单例
+path_policy: PathPolicy = PathPolicy()
@@ -1,29 +1,468 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import asyncio
+import os
+import threading
+import time
 
-from asyncio import Queue
+from asyncio import Queue, QueueEmpty, QueueFull
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable, Generic, Literal, TypeVar
+from uuid import uuid4
 
+import psutil
 
-async def batch_dequeue(queue: Queue, max_items: int, timeout: float) -> list:
+from backend.common.log import log
+
+T = TypeVar('T')
+
+
+class BatchWriter(Generic[T]):
     """
-    从异步队列中获取多个项目
+    批量写入器
 
-    :param queue: 用于获取项目的 `asyncio.Queue` 队列
-    :param max_items: 从队列中获取的最大项目数量
-    :param timeout: 总的等待超时时间（秒）
-    :return:
+    项目先进入内存队列，由后台任务按数量或时间批量写入；写入失败时按指数退避重试，
+    队列已满时按策略丢弃、阻塞或溢出写入磁盘文件，溢出文件在下次启动或队列空闲时回放；
+    停止时尽量将队列中的项目全部写入
+
+    溢出文件按进程区分，文件读写在线程中执行；每条记录附带已失败的写入轮数，
+    回放失败超过上限的记录转入死信文件，不再自动回放
     """
-    items = []
 
-    async def collector():
-        while len(items) < max_items:
-            item = await queue.get()
-            items.append(item)
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[list[T]], Awaitable[Any]],
+        *,
+        maxsize: int,
+        batch_size: int,
+        flush_interval: float,
+        full_policy: Literal['drop', 'block', 'spill'] = 'block',
+        spill_file: Path | None = None,
+        dumps: Callable[[T], str] | None = None,
+        loads: Callable[[str], T] | None = None,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_replays: int = 3,
+    ) -> None:
+        """
+        初始化批量写入器
+
+        :param name: 写入器名称，用于日志
+        :param handler: 批量写入函数
+        :param maxsize: 队列最大长度
+        :param batch_size: 单批次最大数量
+        :param flush_interval: 批次最长等待时间（秒），从批次中首个项目入队开始计算
+        :param full_policy: 队列已满时的处理策略，drop: 丢弃；block: 阻塞等待；spill: 溢出写入磁盘文件
+        :param spill_file: 溢出文件路径，各进程在同一目录下使用带进程 ID 的独立文件，spill 策略必填
+        :param dumps: 项目序列化函数，spill 策略必填
+        :param loads: 项目反序列化函数，spill 策略必填
+        :param max_retries: 写入失败最大重试次数
+        :param retry_backoff: 重试退避基数（秒），第 n 次重试前等待 retry_backoff * 2 ** (n - 1) 秒
+        :param max_replays: 溢出文件回放失败的最大次数，超出后转入死信文件
+        :return:
+        """
+        if full_policy == 'spill' and (spill_file is None or dumps is None or loads is None):
+            raise ValueError('spill 策略必须指定 spill_file、dumps 和 loads')
+        self.name = name
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.full_policy = full_policy
+        self.spill_file = spill_file
+        self.dumps = dumps
+        self.loads = loads
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_replays = max_replays
+        self.queue: Queue[T] = Queue(maxsize=maxsize)
+        self._batch: list[T] = []
+        self._closing = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._spill_lock = threading.Lock()
+        self._written = 0
+        self._batches = 0
+        self._dropped = 0
+        self._drop_logged_at = float('-inf')
+        self._spilled = 0
+        self._replayed = 0
+        self._dead_lettered = 0
+        self._retries = 0
+        self._failed = 0
+        self._last_batch_size = 0
+        self._max_batch_size = 0
+        self._total_cost = 0.0
+        self._last_cost = 0.0
+        self._max_cost = 0.0
+
+    async def put(self, item: T) -> None:
+        """
+        添加项目
+
+        :param item: 待写入项目
+        :return:
+        """
+        if self.full_policy == 'block' and not self._closing.is_set():
+            await self.queue.put(item)
+            return
+        try:
+            self.queue.put_nowait(item)
+        except QueueFull:
+            if self.full_policy == 'drop':
+                self._drop(1)
+            else:
+                await self._overflow([item])
+
+    def start(self) -> asyncio.Task:
+        """启动后台写入任务"""
+        if self._task is None or self._task.done():
+            self._closing.clear()
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self, timeout: float) -> None:
+        """
+        停止后台写入任务，并写入队列中剩余的项目
+
+        超时取消时，正在写入的批次会等待本次写入结束，成功则不再溢出，避免同一批次被重复写入
+
+        :param timeout: 最长等待时间（秒），超时后剩余项目按队列已满策略处理
+        :return:
+        """
+        self._closing.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        except Exception as e:
+            log.error(f'{self.name}写入任务异常退出: {e}')
+
+        remaining = self._batch
+        self._batch = []
+        while True:
+            try:
+                remaining.append(self.queue.get_nowait())
+                self.queue.task_done()
+            except QueueEmpty:
+                break
+        if remaining:
+            log.warning(f'{self.name}停止时仍有 {len(remaining)} 条未写入')
+            await self._overflow(remaining)
+
+    async def run(self) -> None:
+        """后台写入任务，单个批次写入或回放出现异常时记录日志并继续运行，仅取消时退出"""
+        try:
+            await self._replay_spill(claim_orphans=True)
+        except Exception as e:
+            log.error(f'{self.name}回放溢出文件异常: {e}')
+        while not (self._closing.is_set() and self.queue.empty()):
+            try:
+                await self._collect()
+                if self._batch:
+                    # 写入中的批次移出待写入批次，停止时仅溢出尚未开始写入的项目
+                    batch, self._batch = self._batch, []
+                    await self._write(batch)
+                elif self.queue.empty() and not self._closing.is_set():
+                    await self._replay_spill()
+            except Exception as e:
+                log.error(f'{self.name}写入任务异常: {e}')
+
+    async def _collect(self) -> None:
+        """收集单个批次，达到批次数量、等待超时或停止时返回"""
+        loop = asyncio.get_running_loop()
+        deadline = None
+        while len(self._batch) < self.batch_size:
+            try:
+                self._batch.append(self.queue.get_nowait())
+            except QueueEmpty:
+                if self._closing.is_set():
+                    return
+                if deadline is None:
+                    # 空闲时等待首个项目，最长等待一个批次周期，以便定期回放溢出文件
+                    timeout = self.flush_interval
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        return
+                if not await self._wait(timeout) and deadline is None:
+                    return
+            if deadline is None and self._batch:
+                deadline = loop.time() + self.flush_interval
+
+    async def _wait(self, timeout: float) -> bool:
+        """
+        等待队列项目或停止信号
+
+        :param timeout: 最长等待时间（秒）
+        :return: 是否获取到项目
+        """
+        getter = asyncio.ensure_future(self.queue.get())
+        closing = asyncio.ensure_future(self._closing.wait())
+        try:
+            await asyncio.wait((getter, closing), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            closing.cancel()
+            # 取消失败说明已取出项目，必须放入批次，避免项目丢失
+            got = not getter.cancel()
+            if got:
+                self._batch.append(getter.result())
+        return got
+
+    async def _write(self, batch: list[T], *, from_queue: bool = True, failures: list[int] | None = None) -> bool:
+        """
+        写入批次，最终失败的项目失败轮数加一后溢出
+
+        :param batch: 批次项目
+        :param from_queue: 项目是否来自队列
+        :param failures: 各项目此前已失败的写入轮数，来自溢出文件回放
+        :return: 是否写入成功
+        """
+        failures = [failure + 1 for failure in failures] if failures else [1] * len(batch)
+        start_time = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                handler = asyncio.ensure_future(self.handler(batch))
+                try:
+                    await asyncio.shield(handler)
+                    break
+                except asyncio.CancelledError:
+                    # 停止超时被取消时，等待进行中的写入结束，写入结果确定后再决定是否溢出
+                    try:
+                        await handler
+                    except Exception:
+                        await self._overflow(batch, failures)
+                    else:
+                        self._record(batch, start_time)
+                    raise
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        self._failed += len(batch)
+                        log.error(f'{self.name}批量写入失败，已重试 {attempt} 次: {e}')
+                        await self._overflow(batch, failures)
+                        return False
+                    self._retries += 1
+                    delay = self.retry_backoff * 2**attempt
+                    log.warning(f'{self.name}批量写入失败，{delay:.1f} 秒后重试: {e}')
+                    try:
+                        await asyncio.sleep(delay)
+                    except asyncio.CancelledError:
+                        await self._overflow(batch, failures)
+                        raise
+            self._record(batch, start_time)
+            return True
+        finally:
+            if from_queue:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _record(self, batch: list[T], start_time: float) -> None:
+        """
+        记录写入成功的批次
+
+        :param batch: 批次项目
+        :param start_time: 写入开始时间
+        :return:
+        """
+        cost = (time.perf_counter() - start_time) * 1000
+        self._written += len(batch)
+        self._batches += 1
+        self._last_batch_size = len(batch)
+        self._max_batch_size = max(self._max_batch_size, len(batch))
+        self._last_cost = cost
+        self._total_cost += cost
+        self._max_cost = max(self._max_cost, cost)
+
+    async def _overflow(self, items: list[T], failures: list[int] | None = None) -> None:
+        """
+        处理无法写入的项目，写入溢出文件，失败轮数超过回放上限的项目写入死信文件
+
+        :param items: 项目列表
+        :param failures: 各项目已失败的写入轮数，队列已满溢出时为 0
+        :return:
+        """
+        if self.spill_file is None:
+            self._drop(len(items))
+            return
+        records = list(zip(failures or [0] * len(items), items))
+        spill = [record for record in records if record[0] <= self.max_replays]
+        dead = [record for record in records if record[0] > self.max_replays]
+        if spill:
+            try:
+                await asyncio.to_thread(self._append_records, self._spill_path(os.getpid()), spill)
+                self._spilled += len(spill)
+            except Exception as e:
+                log.error(f'{self.name}溢出文件写入失败: {e}')
+                self._drop(len(spill))
+        if dead:
+            try:
+                await asyncio.to_thread(self._append_records, self._spill_path(os.getpid(), 'dead'), dead)
+                self._dead_lettered += len(dead)
+                log.error(f'{self.name}回放失败超过 {self.max_replays} 次，{len(dead)} 条已转入死信文件')
+            except Exception as e:
+                log.error(f'{self.name}死信文件写入失败: {e}')
+                self._drop(len(dead))
+
+    def _drop(self, count: int) -> None:
+        """
+        丢弃项目，丢弃日志限频输出
+
+        :param count: 丢弃数量
+        :return:
+        """
+        self._dropped += count
+        now = time.monotonic()
+        if now - self._drop_logged_at >= 10:
+            self._drop_logged_at = now
+            log.warning(f'{self.name}队列已满或写入失败，累计丢弃 {self._dropped} 条')
+
+    def _spill_path(self, *parts: Any) -> Path:
+        """
+        获取溢出相关文件路径，例如 opera_log_spill.{pid}.jsonl、opera_log_spill.{pid}.dead.jsonl
+
+        :param parts: 文件名附加部分
+        :return:
+        """
+        return self.spill_file.with_name('.'.join([self.spill_file.stem, *map(str, parts)]) + self.spill_file.suffix)
+
+    def _append_records(self, file: Path, records: list[tuple[int, T]]) -> None:
+        """
+        追加写入记录，在线程中执行
+
+        :param file: 文件路径
+        :param records: 失败轮数及项目列表
+        :return:
+        """
+        lines = [f'{failure}\t{self.dumps(item)}\n' for failure, item in records]
+        with self._spill_lock:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            with open(file, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+
+    def _read_records(self, f: IO[str], limit: int | None) -> list[tuple[int, T]]:
+        """
+        读取记录，在线程中执行
+
+        :param f: 文件对象
+        :param limit: 最大读取条数，为 None 时读取全部
+        :return: 失败轮数及项目列表
+        """
+        records = []
+        while limit is None or len(records) < limit:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            failure, sep, payload = line.partition('\t')
+            # 兼容不带失败轮数的记录
+            if not sep or not failure.isdigit():
+                failure, payload = '0', line
+            try:
+                records.append((int(failure), self.loads(payload)))
+            except Exception as e:
+                log.error(f'{self.name}溢出文件解析失败，已跳过: {e}')
+        return records
+
+    def _claim_spill_files(self, claim_orphans: bool) -> list[Path]:
+        """
+        认领溢出文件，通过原子重命名避免多进程重复回放，在线程中执行
+
+        :param claim_orphans: 是否认领已退出进程遗留的溢出文件及未回放完成的文件
+        :return:
+        """
+        pid = os.getpid()
+        files = [self._spill_path(pid)]
+        if claim_orphans:
+            # 不带进程 ID 的旧版溢出文件
+            files.append(self.spill_file)
+            for file in self.spill_file.parent.glob(f'{self.spill_file.stem}.*{self.spill_file.suffix}'):
+                parts = file.name[len(self.spill_file.stem) + 1 : -len(self.spill_file.suffix) or None].split('.')
+                if not parts[0].isdigit() or parts[-1] == 'dead':
+                    continue
+                owner = int(parts[0])
+                if owner != pid and psutil.pid_exists(owner):
+                    continue
+                if file not in files:
+                    files.append(file)
+        claimed = []
+        # 与追加写入互斥，避免认领时当前进程仍在写入溢出文件
+        with self._spill_lock:
+            for file in files:
+                target = self._spill_path(pid, uuid4().hex, 'replay')
+                try:
+                    os.rename(file, target)
+                except OSError:
+                    continue
+                claimed.append(target)
+        return claimed
+
+    async def _replay_spill(self, claim_orphans: bool = False) -> None:
+        """
+        回放溢出文件
+
+        :param claim_orphans: 是否认领已退出进程遗留的溢出文件及未回放完成的文件
+        :return:
+        """
+        if self.spill_file is None:
+            return
+        for file in await asyncio.to_thread(self._claim_spill_files, claim_orphans):
+            log.info(f'{self.name}回放溢出文件: {file.name}')
+            await self._replay_file(file)
+
+    async def _replay_file(self, file: Path) -> None:
+        """
+        回放单个溢出文件，回放被取消时未回放的记录写回溢出文件，已写入的批次不会再次回放
 
-    try:
-        await asyncio.wait_for(collector(), timeout=timeout)
-    except asyncio.TimeoutError:
-        pass
+        :param file: 已认领的溢出文件
+        :return:
+        """
+        f = await asyncio.to_thread(open, file, encoding='utf-8')
+        reader: asyncio.Future | None = None
+        cancelled: asyncio.CancelledError | None = None
+        with f:
+            try:
+                while True:
+                    reader = asyncio.ensure_future(asyncio.to_thread(self._read_records, f, self.batch_size))
+                    records = await asyncio.shield(reader)
+                    reader = None
+                    if not records:
+                        break
+                    failures, batch = map(list, zip(*records))
+                    if await self._write(batch, from_queue=False, failures=failures):
+                        self._replayed += len(batch)
+            except asyncio.CancelledError as e:
+                records = await reader if reader is not None else []
+                records += await asyncio.to_thread(self._read_records, f, None)
+                if records:
+                    failures, batch = map(list, zip(*records))
+                    await self._overflow(batch, failures)
+                cancelled = e
+        # 出现其他异常时保留文件，下次启动时重新认领
+        await asyncio.to_thread(file.unlink, missing_ok=True)
+        if cancelled is not None:
+            raise cancelled
 
-    return items
+    def stats(self) -> dict[str, Any]:
+        """获取批量写入统计信息"""
+        return {
+            'queue_size': self.queue.qsize(),
+            'queue_maxsize': self.queue.maxsize,
+            'full_policy': self.full_policy,
+            'written': self._written,
+            'batches': self._batches,
+            'dropped': self._dropped,
+            'spilled': self._spilled,
+            'replayed': self._replayed,
+            'dead_lettered': self._dead_lettered,
+            'retries': self._retries,
+            'failed': self._failed,
+            'last_batch_size': self._last_batch_size,
+            'max_batch_size': self._max_batch_size,
+            'avg_batch_size': round(self._written / self._batches, 2) if self._batches else 0.0,
+            'last_cost_ms': round(self._last_cost, 3),
+            'avg_cost_ms': round(self._total_cost / self._batches, 3) if self._batches else 0.0,
+            'max_cost_ms': round(self._max_cost, 3),
+        }
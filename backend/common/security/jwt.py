@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
 import json
 
 from datetime import timedelta
@@ -11,20 +12,21 @@ from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from fastapi.security.utils import get_authorization_scheme_param
 from jose import ExpiredSignatureError, JWTError, jwt
-from pwdlib import PasswordHash
-from pwdlib.hashers.bcrypt import BcryptHasher
 from pydantic_core import from_json
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.admin.model import User
 from backend.app.admin.schema.user import GetUserInfoWithRelationDetail
+from backend.common.cache import LocalCache
 from backend.common.dataclasses import AccessToken, NewToken, RefreshToken, TokenPayload
 from backend.common.exception import errors
 from backend.common.exception.errors import TokenError
+from backend.common.log import log
 from backend.core.conf import settings
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, set_read_from_primary
 from backend.database.redis import redis_client
 from backend.utils.serializers import select_as_dict
+from backend.utils.singleflight import SingleFlight
 from backend.utils.timezone import timezone
 
 
@@ -47,29 +49,16 @@ class CustomHTTPBearer(HTTPBearer):
 # JWT authorizes dependency injection
 DependsJwtAuth = Depends(CustomHTTPBearer())
 
-password_hash = PasswordHash((BcryptHasher(),))
+# 用户信息进程内缓存（L1），缓存键为 (用户 ID, 全局纪元, 用户版本)，Redis 缓存作为 L2
+user_local_cache: LocalCache[tuple[int, int, int], GetUserInfoWithRelationDetail] = LocalCache(
+    maxsize=settings.JWT_USER_LOCAL_CACHE_MAXSIZE,
+    ttl=settings.JWT_USER_LOCAL_CACHE_EXPIRE_SECONDS,
+)
+_user_cache_epoch = 0
+_user_cache_versions: dict[int, int] = {}
 
-
-def get_hash_password(password: str, salt: bytes | None) -> str:
-    """
-    使用哈希算法加密密码
-
-    :param password: 密码
-    :param salt: 盐值
-    :return:
-    """
-    return password_hash.hash(password, salt=salt)
-
-
-def password_verify(plain_password: str, hashed_password: str) -> bool:
-    """
-    密码验证
-
-    :param plain_password: 待验证的密码
-    :param hashed_password: 哈希密码
-    :return:
-    """
-    return password_hash.verify(plain_password, hashed_password)
+# 用户信息加载合并，同一用户的并发缓存未命中只查询一次数据库
+user_load_flight = SingleFlight()
 
 
 def jwt_encode(payload: dict[str, Any]) -> str:
@@ -99,6 +88,7 @@ def jwt_decode(token: str) -> TokenPayload:
         session_uuid = payload.get('session_uuid')
         user_id = payload.get('sub')
         expire = payload.get('exp')
+        generation = int(payload.get('gen', 0))
         if not session_uuid or not user_id or not expire:
             raise errors.TokenError(msg='Token 无效')
     except ExpiredSignatureError:
@@ -106,10 +96,78 @@ def jwt_decode(token: str) -> TokenPayload:
     except (JWTError, Exception):
         raise errors.TokenError(msg='Token 无效')
     return TokenPayload(
-        id=int(user_id), session_uuid=session_uuid, expire_time=timezone.from_datetime(timezone.to_utc(expire))
+        id=int(user_id),
+        session_uuid=session_uuid,
+        expire_time=timezone.from_datetime(timezone.to_utc(expire)),
+        generation=generation,
+    )
+
+
+async def get_token_generation(user_id: int) -> int:
+    """
+    获取用户当前 token 代数
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    generation = await redis_client.get(f'{settings.TOKEN_GENERATION_REDIS_PREFIX}:{user_id}')
+    return int(generation or 0)
+
+
+# 递增 token 代数并记录保留会话所在的代数，保证两者原子生效
+_REVOKE_KEEP_SESSION_SCRIPT = """
+local generation = redis.call('INCR', KEYS[1])
+redis.call('SET', KEYS[2], generation, 'EX', ARGV[1])
+return generation
+"""
+
+
+def get_session_generation_key(user_id: int, session_uuid: str) -> str:
+    """
+    获取保留会话的 token 代数缓存键
+
+    :param user_id: 用户 ID
+    :param session_uuid: 会话 UUID
+    :return:
+    """
+    return f'{settings.TOKEN_GENERATION_REDIS_PREFIX}:{user_id}:{session_uuid}'
+
+
+async def revoke_user_tokens(user_id: int, keep_session_uuid: str | None = None) -> int:
+    """
+    撤销用户所有 token（包括刷新 token），递增用户 token 代数后，此前签发的 token 均校验失败
+
+    :param user_id: 用户 ID
+    :param keep_session_uuid: 保留的会话 UUID，该会话已签发的 token 在新的代数内继续有效
+    :return:
+    """
+    generation_key = f'{settings.TOKEN_GENERATION_REDIS_PREFIX}:{user_id}'
+    if keep_session_uuid is None:
+        return await redis_client.incr(generation_key)
+    return await redis_client.eval(
+        _REVOKE_KEEP_SESSION_SCRIPT,
+        2,
+        generation_key,
+        get_session_generation_key(user_id, keep_session_uuid),
+        settings.TOKEN_REFRESH_EXPIRE_SECONDS,
     )
 
 
+async def verify_token_generation(token_payload: TokenPayload, generation: int) -> bool:
+    """
+    校验 token 代数是否有效
+
+    :param token_payload: token 载荷
+    :param generation: 用户当前 token 代数
+    :return:
+    """
+    if token_payload.generation == generation:
+        return True
+    # 代数不一致时，仅撤销时保留且此后未再次撤销的会话有效
+    kept = await redis_client.get(get_session_generation_key(token_payload.id, token_payload.session_uuid))
+    return kept is not None and int(kept) == generation
+
+
 async def create_access_token(user_id: int, multi_login: bool, **kwargs) -> AccessToken:
     """
     生成加密 token
@@ -119,17 +177,21 @@ async def create_access_token(user_id: int, multi_login: bool, **kwargs) -> Acce
     :param kwargs: token 额外信息
     :return:
     """
+    # 不允许多端登录时，撤销该用户此前签发的所有 token
+    if not multi_login:
+        generation = await revoke_user_tokens(user_id)
+    else:
+        generation = await get_token_generation(user_id)
+
     expire = timezone.now() + timedelta(seconds=settings.TOKEN_EXPIRE_SECONDS)
     session_uuid = str(uuid4())
     access_token = jwt_encode({
         'session_uuid': session_uuid,
         'exp': timezone.to_utc(expire).timestamp(),
         'sub': str(user_id),
+        'gen': generation,
     })
 
-    if not multi_login:
-        await redis_client.delete_prefix(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}')
-
     await redis_client.setex(
         f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}',
         settings.TOKEN_EXPIRE_SECONDS,
@@ -144,16 +206,21 @@ async def create_access_token(user_id: int, multi_login: bool, **kwargs) -> Acce
             json.dumps(kwargs, ensure_ascii=False),
         )
 
-    return AccessToken(access_token=access_token, access_token_expire_time=expire, session_uuid=session_uuid)
+    return AccessToken(
+        access_token=access_token,
+        access_token_expire_time=expire,
+        session_uuid=session_uuid,
+        generation=generation,
+    )
 
 
-async def create_refresh_token(session_uuid: str, user_id: int, multi_login: bool) -> RefreshToken:
+async def create_refresh_token(session_uuid: str, user_id: int, generation: int) -> RefreshToken:
     """
     生成加密刷新 token，仅用于创建新的 token
 
     :param session_uuid: 会话 UUID
     :param user_id: 用户 ID
-    :param multi_login: 是否允许多端登录
+    :param generation: token 代数，与同一会话的访问 token 一致
     :return:
     """
     expire = timezone.now() + timedelta(seconds=settings.TOKEN_REFRESH_EXPIRE_SECONDS)
@@ -161,11 +228,9 @@ async def create_refresh_token(session_uuid: str, user_id: int, multi_login: boo
         'session_uuid': session_uuid,
         'exp': timezone.to_utc(expire).timestamp(),
         'sub': str(user_id),
+        'gen': generation,
     })
 
-    if not multi_login:
-        await redis_client.delete_prefix(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}')
-
     await redis_client.setex(
         f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}',
         settings.TOKEN_REFRESH_EXPIRE_SECONDS,
@@ -187,15 +252,23 @@ async def create_new_token(
     :param kwargs: token 附加信息
     :return:
     """
-    redis_refresh_token = await redis_client.get(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}')
+    redis_refresh_token, generation = await redis_client.mget([
+        f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}',
+        f'{settings.TOKEN_GENERATION_REDIS_PREFIX}:{user_id}',
+    ])
     if not redis_refresh_token or redis_refresh_token != refresh_token:
         raise errors.TokenError(msg='Refresh Token 已过期，请重新登录')
 
+    if not await verify_token_generation(jwt_decode(refresh_token), int(generation or 0)):
+        if not multi_login:
+            raise errors.ForbiddenError(msg='此用户已在异地登录，请重新登录并及时修改密码')
+        raise errors.TokenError(msg='Refresh Token 已失效，请重新登录')
+
     await redis_client.delete(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}')
     await redis_client.delete(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}')
 
     new_access_token = await create_access_token(user_id, multi_login, **kwargs)
-    new_refresh_token = await create_refresh_token(new_access_token.session_uuid, user_id, multi_login)
+    new_refresh_token = await create_refresh_token(new_access_token.session_uuid, user_id, new_access_token.generation)
     return NewToken(
         new_access_token=new_access_token.access_token,
         new_access_token_expire_time=new_access_token.access_token_expire_time,
@@ -271,6 +344,111 @@ def superuser_verify(request: Request) -> bool:
     return superuser
 
 
+def get_user_cache_key(user_id: int) -> tuple[int, int, int]:
+    """
+    获取用户信息进程内缓存键
+
+    版本戳在缓存失效时递增，保证失效前已开始加载的用户信息不会写入新的缓存键
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    return user_id, _user_cache_epoch, _user_cache_versions.get(user_id, 0)
+
+
+def evict_user_local_cache(*user_ids: int) -> None:
+    """
+    淘汰当前进程的用户信息缓存
+
+    :param user_ids: 用户 ID，为空时淘汰全部
+    :return:
+    """
+    global _user_cache_epoch
+
+    if not user_ids:
+        _user_cache_epoch += 1
+        _user_cache_versions.clear()
+        user_local_cache.clear()
+        return
+
+    for user_id in user_ids:
+        user_local_cache.delete(get_user_cache_key(user_id))
+        _user_cache_versions[user_id] = _user_cache_versions.get(user_id, 0) + 1
+
+
+async def invalidate_user_cache(*user_ids: int) -> None:
+    """
+    使用户信息缓存失效，包括 Redis 缓存和所有工作进程的进程内缓存
+
+    :param user_ids: 用户 ID
+    :return:
+    """
+    user_ids = tuple(set(user_ids))
+    if not user_ids:
+        return
+    await redis_client.delete(*[f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}' for user_id in user_ids])
+    evict_user_local_cache(*user_ids)
+    await redis_client.publish(settings.JWT_USER_INVALIDATE_CHANNEL, ','.join(str(user_id) for user_id in user_ids))
+
+
+async def user_cache_invalidation_listener() -> None:
+    """订阅用户信息缓存失效广播，淘汰当前进程的用户信息缓存"""
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(settings.JWT_USER_INVALIDATE_CHANNEL)
+            # 订阅中断期间可能错过失效广播，重新订阅后全部淘汰
+            evict_user_local_cache()
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message:
+                    continue
+                data = message['data']
+                evict_user_local_cache(*[int(user_id) for user_id in data.split(',') if user_id])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error(f'用户信息缓存失效订阅异常: {e}')
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+async def load_user(user_id: int) -> GetUserInfoWithRelationDetail:
+    """
+    从数据库加载用户信息并写入 Redis 缓存
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    async with async_db_session() as db:
+        current_user = await get_current_user(db, user_id)
+        user = GetUserInfoWithRelationDetail(**select_as_dict(current_user))
+    await redis_client.setex(
+        f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}',
+        settings.TOKEN_EXPIRE_SECONDS,
+        user.model_dump_json(),
+    )
+    return user
+
+
+async def mark_recent_write(user_id: int) -> None:
+    """
+    标记用户近期有写操作，写后读窗口（自写请求开始计算）内该用户的读操作使用主库
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    if not settings.DATABASE_REPLICA_HOST:
+        return
+    set_read_from_primary(True)
+    await redis_client.set(
+        f'{settings.DATABASE_REPLICA_WRITE_REDIS_PREFIX}:{user_id}',
+        1,
+        ex=settings.DATABASE_REPLICA_READ_YOUR_WRITES_SECONDS,
+    )
+
+
 async def jwt_authentication(token: str) -> GetUserInfoWithRelationDetail:
     """
     JWT 认证
@@ -280,25 +458,52 @@ async def jwt_authentication(token: str) -> GetUserInfoWithRelationDetail:
     """
     token_payload = jwt_decode(token)
     user_id = token_payload.id
-    redis_token = await redis_client.get(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{token_payload.session_uuid}')
+    token_key = f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{token_payload.session_uuid}'
+    generation_key = f'{settings.TOKEN_GENERATION_REDIS_PREFIX}:{user_id}'
+    user_key = f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}'
+    recent_write_key = f'{settings.DATABASE_REPLICA_WRITE_REDIS_PREFIX}:{user_id}'
+
+    # 在读取 L2 缓存前获取缓存键，期间发生的失效会使本次结果无法写入 L1
+    cache_key = get_user_cache_key(user_id)
+    user = user_local_cache.get(cache_key)
+
+    # 单次往返获取 token、token 代数、近期写操作标记和用户信息缓存
+    keys = [token_key, generation_key]
+    if settings.DATABASE_REPLICA_HOST:
+        keys.append(recent_write_key)
+    if user is None:
+        keys.append(user_key)
+    if settings.JWT_USER_REDIS_EXPIRE_REFRESH:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.mget(keys)
+            pipe.expire(user_key, settings.TOKEN_EXPIRE_SECONDS)
+            values, _ = await pipe.execute()
+    else:
+        values = await redis_client.mget(keys)
+
+    redis_token = values[0]
     if not redis_token:
         raise errors.TokenError(msg='Token 已过期')
 
     if token != redis_token:
         raise errors.TokenError(msg='Token 已失效')
 
-    cache_user = await redis_client.get(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+    if not await verify_token_generation(token_payload, int(values[1] or 0)):
+        raise errors.TokenError(msg='Token 已失效')
+
+    if settings.DATABASE_REPLICA_HOST:
+        # 用户处于写后读窗口内时，本次请求的读操作使用主库
+        set_read_from_primary(values[2] is not None)
+
+    if user is not None:
+        return user
+
+    cache_user = values[-1]
     if not cache_user:
-        async with async_db_session() as db:
-            current_user = await get_current_user(db, user_id)
-            user = GetUserInfoWithRelationDetail(**select_as_dict(current_user))
-            await redis_client.setex(
-                f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}',
-                settings.TOKEN_EXPIRE_SECONDS,
-                user.model_dump_json(),
-            )
+        user = await user_load_flight.do(user_id, lambda: load_user(user_id))
     else:
         # TODO: 在恰当的时机，应替换为使用 model_validate_json
         # https://docs.pydantic.dev/latest/concepts/json/#partial-json-parsing
         user = GetUserInfoWithRelationDetail.model_validate(from_json(cache_user, allow_partial=True))
+    user_local_cache.set(cache_key, user)
     return user
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import multiprocessing
+import time
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from typing import Any, Callable
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from backend.common.exception import errors
+from backend.common.log import log
+from backend.common.response.response_code import StandardResponseCode
+from backend.core.conf import settings
+
+password_hash = PasswordHash((BcryptHasher(),))
+
+
+def get_hash_password(password: str, salt: bytes | None) -> str:
+    """
+    使用哈希算法加密密码
+
+    :param password: 密码
+    :param salt: 盐值
+    :return:
+    """
+    return password_hash.hash(password, salt=salt)
+
+
+def password_verify(plain_password: str, hashed_password: str) -> bool:
+    """
+    密码验证
+
+    :param plain_password: 待验证的密码
+    :param hashed_password: 哈希密码
+    :return:
+    """
+    return password_hash.verify(plain_password, hashed_password)
+
+
+class PasswordHashService:
+    """
+    密码哈希服务
+
+    bcrypt 为 CPU 密集型计算，单次耗时可达数百毫秒，在进程池中执行以避免阻塞事件循环；
+    并通过信号量限制同时提交的任务数，超出排队上限或等待超时的请求将被快速拒绝
+    """
+
+    def __init__(self, pool_size: int, queue_limit: int, timeout: float) -> None:
+        """
+        初始化密码哈希服务
+
+        :param pool_size: 进程池大小
+        :param queue_limit: 允许排队等待的最大任务数
+        :param timeout: 单次任务的最大等待时间（秒），包括排队和执行
+        :return:
+        """
+        self.pool_size = pool_size
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._failed = 0
+        self._total_cost = 0.0
+        self._max_cost = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """进程池，首次使用时创建"""
+        if self._executor is None:
+            # 使用 spawn 启动子进程，避免 fork 继承事件循环及日志线程状态
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """准入信号量，限制执行中与排队中的任务总数"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size + self.queue_limit)
+        return self._semaphore
+
+    def _release(self) -> None:
+        """任务在进程池中结束（完成、异常或取消）后释放准入名额"""
+        self._in_flight -= 1
+        self.semaphore.release()
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        提交任务到进程池
+
+        等待超时后进程池中的任务仍会继续执行，准入名额在任务真正结束后才释放，避免超时请求的任务继续占用进程池时
+        仍有新任务被放行
+
+        :param func: 任务函数
+        :param args: 任务参数
+        :return:
+        """
+        if self.semaphore.locked():
+            self._rejected += 1
+            log.warning('密码哈希任务排队已满，拒绝请求')
+            raise errors.RequestError(code=StandardResponseCode.HTTP_503, msg='服务繁忙，请稍后重试')
+
+        loop = asyncio.get_running_loop()
+
+        def done(_: Future) -> None:
+            # 进程池结果由管理线程回调，需切换回事件循环释放名额；事件循环已关闭时无需释放
+            with suppress(RuntimeError):
+                loop.call_soon_threadsafe(self._release)
+
+        start_time = time.perf_counter()
+        await self.semaphore.acquire()
+        submitted = False
+        executor = self.executor
+        try:
+            future = executor.submit(func, *args)
+            submitted = True
+            self._in_flight += 1
+            future.add_done_callback(done)
+            # 超时取消时，尚未开始执行的任务会被一并取消，执行中的任务将继续运行至结束
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            log.warning('密码哈希任务执行超时')
+            raise errors.RequestError(code=StandardResponseCode.HTTP_503, msg='服务繁忙，请稍后重试')
+        except BrokenProcessPool:
+            self._failed += 1
+            log.error('密码哈希进程池异常，将在下次使用时重建')
+            self._discard_executor(executor)
+            raise errors.ServerError()
+        finally:
+            if not submitted:
+                self.semaphore.release()
+
+        cost = (time.perf_counter() - start_time) * 1000
+        self._completed += 1
+        self._total_cost += cost
+        self._max_cost = max(self._max_cost, cost)
+        return result
+
+    async def hash(self, password: str, salt: bytes | None) -> str:
+        """
+        异步加密密码
+
+        :param password: 密码
+        :param salt: 盐值
+        :return:
+        """
+        return await self._submit(get_hash_password, password, salt)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        异步验证密码
+
+        :param plain_password: 待验证的密码
+        :param hashed_password: 哈希密码
+        :return:
+        """
+        return await self._submit(password_verify, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, Any]:
+        """获取密码哈希服务统计信息"""
+        return {
+            'pool_size': self.pool_size,
+            'queue_limit': self.queue_limit,
+            'timeout': self.timeout,
+            'in_flight': self._in_flight,
+            'completed': self._completed,
+            'rejected': self._rejected,
+            'timeouts': self._timeouts,
+            'failed': self._failed,
+            'avg_cost_ms': round(self._total_cost / self._completed, 3) if self._completed else 0.0,
+            'max_cost_ms': round(self._max_cost, 3),
+        }
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """
+        关闭并丢弃进程池，取消排队中的任务并回收子进程；进程池已被重建时不影响新的进程池
+
+        :param executor: 进程池
+        :return:
+        """
+        executor.shutdown(wait=False, cancel_futures=True)
+        if self._executor is executor:
+            self._executor = None
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        if self._executor is not None:
+            self._discard_executor(self._executor)
+
+
+# 创建密码哈希服务单例
+password_hash_service: PasswordHashService = PasswordHashService(
+    pool_size=settings.PASSWORD_HASH_POOL_SIZE,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    timeout=settings.PASSWORD_HASH_TIMEOUT,
+)
@@ -2,9 +2,10 @@
 # -*- coding: utf-8 -*-
 from fastapi import Depends, Request
 
-from backend.common.enums import MethodType, StatusType
+from backend.common.enums import MethodType
 from backend.common.exception import errors
 from backend.common.log import log
+from backend.common.path_policy import path_policy
 from backend.common.security.jwt import DependsJwtAuth
 from backend.core.conf import settings
 from backend.utils.import_parse import import_module_cached
@@ -18,14 +19,9 @@ async def rbac_verify(request: Request, _token: str = DependsJwtAuth) -> None:
     :param _token: JWT 令牌
     :return:
     """
-    path = request.url.path
-
     # API 鉴权白名单
-    if path in settings.TOKEN_REQUEST_PATH_EXCLUDE:
+    if path_policy.is_rbac_exempt(request.url.path):
         return
-    for pattern in settings.TOKEN_REQUEST_PATH_EXCLUDE_PATTERN:
-        if pattern.match(path):
-            return
 
     # JWT 授权状态强制校验
     if not request.auth.scopes:
@@ -36,12 +32,11 @@ async def rbac_verify(request: Request, _token: str = DependsJwtAuth) -> None:
         return
 
     # 检测用户角色
-    user_roles = request.user.roles
-    if not user_roles or all(status == 0 for status in user_roles):
+    if not request.user.has_enabled_role:
         raise errors.AuthorizationError(msg='用户未分配角色，请联系系统管理员')
 
     # 检测用户所属角色菜单
-    if not any(len(role.menus) > 0 for role in user_roles):
+    if not request.user.has_menus:
         raise errors.AuthorizationError(msg='用户未分配菜单，请联系系统管理员')
 
     # 检测后台管理操作权限
@@ -62,18 +57,8 @@ async def rbac_verify(request: Request, _token: str = DependsJwtAuth) -> None:
         if path_auth_perm in settings.RBAC_ROLE_MENU_EXCLUDE:
             return
 
-        # 菜单去重
-        unique_menus = {}
-        for role in user_roles:
-            for menu in role.menus:
-                unique_menus[menu.id] = menu
-
         # 已分配菜单权限校验
-        allow_perms = []
-        for menu in list(unique_menus.values()):
-            if menu.perms and menu.status == StatusType.enable:
-                allow_perms.extend(menu.perms.split(','))
-        if path_auth_perm not in allow_perms:
+        if path_auth_perm not in request.user.perms:
             raise errors.AuthorizationError
     else:
         try:
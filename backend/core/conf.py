@@ -39,11 +39,38 @@ class Settings(BaseSettings):
     DATABASE_USER: str
     DATABASE_PASSWORD: str
 
+    # .env 数据库只读副本（可选，未配置 HOST 时读写均使用主库）
+    DATABASE_REPLICA_HOST: str | None = None
+    DATABASE_REPLICA_PORT: int | None = None
+    DATABASE_REPLICA_USER: str | None = None
+    DATABASE_REPLICA_PASSWORD: str | None = None
+
     # 数据库
     DATABASE_ECHO: bool | Literal['debug'] = False
     DATABASE_POOL_ECHO: bool | Literal['debug'] = False
     DATABASE_SCHEMA: str = 'fba'
     DATABASE_CHARSET: str = 'utf8mb4'
+    DATABASE_BULK_INSERT_COPY_THRESHOLD: int = 50  # PostgreSQL 批量插入行数达到此值时使用 COPY
+    DATABASE_QUERY_REPEAT_WARN_THRESHOLD: int = 10  # 单次请求中同一语句执行次数超出后告警（疑似 N+1 查询）
+    DATABASE_NGRAM_TOKEN_SIZE: int = 2  # 需与 MySQL ngram_token_size 一致，搜索值短于此长度时不使用全文索引
+
+    # 数据库连接池（每个工作进程独立），可在 .env 中按环境覆盖
+    DATABASE_POOL_SIZE: int = 10  # 低：- 高：+
+    DATABASE_POOL_MAX_OVERFLOW: int = 20  # 低：- 高：+
+    DATABASE_POOL_TIMEOUT: int = 30  # 低：+ 高：-
+    DATABASE_POOL_RECYCLE: int = 3600  # 低：+ 高：-
+    DATABASE_POOL_PRE_PING: bool = True  # 低：False 高：True
+    DATABASE_POOL_USE_LIFO: bool = False  # 低：False 高：True
+
+    # 数据库只读副本
+    DATABASE_REPLICA_READ_YOUR_WRITES_SECONDS: int = 5  # 用户写操作后，该时间内的读操作仍使用主库
+    DATABASE_REPLICA_WRITE_REDIS_PREFIX: str = 'fba:db_recent_write'
+
+    # 分页
+    PAGINATION_TOTAL_CACHE_REDIS_PREFIX: str = 'fba:pagination:total'
+    PAGINATION_TOTAL_CACHE_EXPIRE_SECONDS: int = 60  # 1 分钟
+    PAGINATION_TOTAL_ESTIMATE_THRESHOLD: int = 100000  # 执行计划估算行数超出后不再精确统计
+    PAGINATION_LOG_TOTAL_MODE: Literal['exact', 'cached', 'estimated'] = 'exact'  # 日志类列表的总数统计方式
 
     # .env Redis
     REDIS_HOST: str
@@ -65,6 +92,7 @@ class Settings(BaseSettings):
     TOKEN_EXTRA_INFO_REDIS_PREFIX: str = 'fba:token_extra_info'
     TOKEN_ONLINE_REDIS_PREFIX: str = 'fba:token_online'
     TOKEN_REFRESH_REDIS_PREFIX: str = 'fba:refresh_token'
+    TOKEN_GENERATION_REDIS_PREFIX: str = 'fba:token_generation'  # 用户 token 代数，递增即撤销该用户所有会话
     TOKEN_REQUEST_PATH_EXCLUDE: list[str] = [  # JWT / RBAC 路由白名单
         f'{FASTAPI_API_V1_PATH}/auth/login',
     ]
@@ -74,6 +102,15 @@ class Settings(BaseSettings):
 
     # JWT
     JWT_USER_REDIS_PREFIX: str = 'fba:user'
+    JWT_USER_INVALIDATE_CHANNEL: str = 'fba:user:invalidate'  # 用户信息缓存失效广播频道
+    JWT_USER_LOCAL_CACHE_MAXSIZE: int = 10000  # 进程内用户信息缓存最大条目数
+    JWT_USER_LOCAL_CACHE_EXPIRE_SECONDS: int = 60  # 1 分钟
+    JWT_USER_REDIS_EXPIRE_REFRESH: bool = False  # 认证时顺带刷新用户信息缓存过期时间
+
+    # 密码哈希
+    PASSWORD_HASH_POOL_SIZE: int = 2  # 进程池大小
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64  # 最大排队任务数
+    PASSWORD_HASH_TIMEOUT: float = 10  # 单次任务超时时间（秒）
 
     # RBAC
     RBAC_ROLE_MENU_MODE: bool = True
@@ -112,10 +149,12 @@ class Settings(BaseSettings):
     ]
     CORS_EXPOSE_HEADERS: list[str] = [
         'X-Request-ID',
+        'Server-Timing',
     ]
 
     # 中间件配置
     MIDDLEWARE_CORS: bool = True
+    MIDDLEWARE_SERVER_TIMING: bool = True  # 响应头 Server-Timing 输出 SQL 执行次数及耗时
 
     # 请求限制配置
     REQUEST_LIMITER_REDIS_PREFIX: str = 'fba:limiter'
@@ -143,6 +182,17 @@ class Settings(BaseSettings):
     IP_LOCATION_PARSE: Literal['online', 'offline', 'false'] = 'offline'
     IP_LOCATION_REDIS_PREFIX: str = 'fba:ip:location'
     IP_LOCATION_EXPIRE_SECONDS: int = 60 * 60 * 24  # 1 天
+    IP_LOCATION_LOCAL_CACHE_MAXSIZE: int = 10000  # 进程内缓存最大条目数
+    IP_LOCATION_LOCAL_CACHE_EXPIRE_SECONDS: int = 60 * 60  # 1 小时
+    IP_LOCATION_ONLINE_URL: str = 'http://ip-api.com/json/{ip}?lang=zh-CN'
+    IP_LOCATION_ONLINE_TIMEOUT: float = 3
+    IP_LOCATION_ONLINE_MAX_CONNECTIONS: int = 20
+    IP_LOCATION_ONLINE_NEGATIVE_EXPIRE_SECONDS: int = 60 * 5  # 获取失败后 5 分钟内不再重试
+    IP_LOCATION_ONLINE_FAILURE_THRESHOLD: int = 5  # 连续失败次数达到阈值后熔断
+    IP_LOCATION_ONLINE_RECOVERY_SECONDS: int = 30  # 熔断恢复时间
+
+    # 用户代理解析配置
+    USER_AGENT_LOCAL_CACHE_MAXSIZE: int = 1000  # 进程内缓存最大条目数
 
     # Trace ID
     TRACE_ID_REQUEST_HEADER_KEY: str = 'X-Request-ID'
@@ -154,6 +204,13 @@ class Settings(BaseSettings):
         '<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</> | <lvl>{level: <8}</> | <cyan>{correlation_id}</> | <lvl>{message}</>'
     )
 
+    LOG_JSON_FORMAT: bool = False  # 结构化日志，使用 msgspec 编码为 JSON 行，控制台输出由后台线程批量写入
+    LOG_JSON_BATCH_SIZE: int = 1000  # 控制台单次批量写入的最大日志条数
+
+    # 日志（访问）
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0  # 访问日志采样率，响应状态码 >= 400 时始终记录
+    LOG_ACCESS_SAMPLE_RATES: dict[str, float] = {}  # 按路由单独设置采样率，例如 {'/api/v1/monitors/server': 0.01}
+
     # 日志（控制台）
     LOG_STD_LEVEL: str = 'INFO'
 
@@ -183,8 +240,29 @@ class Settings(BaseSettings):
         'new_password',
         'confirm_password',
     ]
+    OPERA_LOG_DESENSITIZE_THREAD_THRESHOLD: int = 16 * 1024  # 16 KB，请求体超出后在线程池中脱敏
+    OPERA_LOG_BODY_CAPTURE_MAX_BYTES: int = 64 * 1024  # 64 KB，请求体超出后仅记录大小
+    OPERA_LOG_QUEUE_MAXSIZE: int = 100000
     OPERA_LOG_QUEUE_BATCH_CONSUME_SIZE: int = 100
-    OPERA_LOG_QUEUE_TIMEOUT: int = 60  # 1 分钟
+    OPERA_LOG_QUEUE_TIMEOUT: int = 60  # 1 分钟，批次最长等待时间
+    OPERA_LOG_QUEUE_FULL_POLICY: Literal['drop', 'block', 'spill'] = 'spill'  # 队列满时：丢弃/阻塞/溢出到磁盘
+    OPERA_LOG_WRITE_MAX_RETRIES: int = 3
+    OPERA_LOG_WRITE_RETRY_BACKOFF: float = 0.5  # 重试退避基数（秒）
+    OPERA_LOG_SPILL_MAX_REPLAYS: int = 3  # 溢出文件回放失败的最大次数，超出后转入死信文件
+    OPERA_LOG_SHUTDOWN_FLUSH_TIMEOUT: int = 10  # 服务关闭时等待写入的最长时间（秒）
+    OPERA_LOG_RETENTION_DAYS: int = 7  # 定时清理时保留的天数
+    OPERA_LOG_ROLLUP_ENABLED: bool = True  # 批量写入时同步维护分钟汇总，用于接口请求量及耗时统计
+    OPERA_LOG_ROLLUP_RETENTION_DAYS: int = 30  # 定时清理时汇总数据保留的天数
+    OPERA_LOG_ROLLUP_QUERY_MAX_HOURS: int = 24  # 单次统计查询的最大时间范围
+
+    # 登录日志
+    LOGIN_LOG_RETENTION_DAYS: int = 30  # 定时清理时保留的天数
+
+    # 日志表（操作日志、登录日志）
+    LOG_TABLE_PARTITION_ENABLED: bool = False  # 按 created_time 范围分区，仅在建表时生效
+    LOG_TABLE_PARTITION_INTERVAL: Literal['month', 'day'] = 'month'
+    LOG_TABLE_PARTITION_PRECREATE: int = 3  # 预创建的未来分区数量
+    LOG_TABLE_DELETE_CHUNK_SIZE: int = 5000  # 非分区表分批删除过期数据时每批的行数
 
     # Plugin 配置
     PLUGIN_PIP_CHINA: bool = True
@@ -252,6 +330,12 @@ class Settings(BaseSettings):
             values['FASTAPI_OPENAPI_URL'] = None
             values['FASTAPI_STATIC_FILES'] = False
 
+            # 数据库连接池，优先复用最近使用的连接，空闲连接可按 pool_recycle 及时回收
+            values.setdefault('DATABASE_POOL_USE_LIFO', True)
+
+            # 中间件
+            values.setdefault('MIDDLEWARE_SERVER_TIMING', False)
+
             # task
             values['CELERY_BROKER'] = 'rabbitmq'
 
@@ -11,6 +11,9 @@ ALEMBIC_VERSION_DIR = BASE_PATH / 'alembic' / 'versions'
 # 日志文件路径
 LOG_DIR = BASE_PATH / 'log'
 
+# 操作日志溢出文件路径
+OPERA_LOG_SPILL_FILE = LOG_DIR / 'opera_log_spill.jsonl'
+
 # 静态资源目录
 STATIC_DIR = BASE_PATH / 'static'
 
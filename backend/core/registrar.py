@@ -2,8 +2,8 @@
 # -*- coding: utf-8 -*-
 import os
 
-from asyncio import create_task
-from contextlib import asynccontextmanager
+from asyncio import CancelledError, create_task
+from contextlib import asynccontextmanager, suppress
 from typing import AsyncGenerator
 
 import socketio
@@ -17,6 +17,7 @@ from starlette.staticfiles import StaticFiles
 
 from backend.common.exception.exception_handler import register_exception
 from backend.common.log import set_custom_logfile, setup_logging
+from backend.common.security.password import password_hash_service
 from backend.core.conf import settings
 from backend.core.path_conf import STATIC_DIR, UPLOAD_DIR
 from backend.database.db import create_tables
@@ -24,12 +25,13 @@ from backend.database.redis import redis_client
 from backend.middleware.access_middleware import AccessMiddleware
 from backend.middleware.i18n_middleware import I18nMiddleware
 from backend.middleware.jwt_auth_middleware import JwtAuthMiddleware
-from backend.middleware.opera_log_middleware import OperaLogMiddleware
+from backend.middleware.opera_log_middleware import OperaLogMiddleware, opera_log_writer
 from backend.middleware.state_middleware import StateMiddleware
 from backend.plugin.tools import build_final_router
 from backend.utils.demo_site import demo_site
 from backend.utils.health_check import ensure_unique_route_names, http_limit_callback
 from backend.utils.openapi import simplify_operation_ids
+from backend.utils.request_parse import close_ip_location_client
 from backend.utils.serializers import MsgSpecJSONResponse
 
 
@@ -54,14 +56,33 @@ async def register_init(app: FastAPI) -> AsyncGenerator[None, None]:
         http_callback=http_limit_callback,
     )
 
-    # 创建操作日志任务
-    create_task(OperaLogMiddleware.consumer())
+    # 启动操作日志批量写入任务
+    opera_log_writer.start()
+
+    # 创建用户信息缓存失效订阅任务
+    from backend.common.security.jwt import user_cache_invalidation_listener
+
+    user_cache_invalidation_task = create_task(user_cache_invalidation_listener())
 
     yield
 
+    # 停止用户信息缓存失效订阅任务，须在关闭 redis 连接前完成
+    user_cache_invalidation_task.cancel()
+    with suppress(CancelledError):
+        await user_cache_invalidation_task
+
+    # 写入剩余操作日志
+    await opera_log_writer.stop(settings.OPERA_LOG_SHUTDOWN_FLUSH_TIMEOUT)
+
     # 关闭 redis 连接
     await redis_client.aclose()
 
+    # 关闭在线 IP 属地查询客户端
+    await close_ip_location_client()
+
+    # 关闭密码哈希进程池
+    password_hash_service.shutdown()
+
 
 def register_app() -> FastAPI:
     """注册 FastAPI 应用"""
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+
+from typing import Any, Callable, Collection, Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Connection, Table, insert, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.common.log import log
+from backend.core.conf import settings
+
+# 数据表实际存在的字段，仅缓存与模型定义一致的表
+_table_columns: dict[str, set[str]] = {}
+
+
+async def get_table_columns(db: AsyncSession, table: Table) -> set[str]:
+    """
+    获取数据表实际存在的字段
+
+    模型新增字段而数据库尚未迁移时，批量写入跳过缺少的字段，避免整批写入失败；缺少字段时不缓存，
+    每次写入重新获取，迁移完成后无需重启即可写入新增字段
+
+    :param db: 数据库会话
+    :param table: 数据表
+    :return:
+    """
+    columns = _table_columns.get(table.fullname)
+    if columns is not None:
+        return columns
+
+    def get_columns(conn: Connection) -> set[str]:
+        return {column['name'] for column in inspect(conn).get_columns(table.name, schema=table.schema)}
+
+    connection = await db.connection()
+    columns = await connection.run_sync(get_columns)
+    missing = set(table.columns.keys()) - columns
+    if missing:
+        log.warning(f'数据表 {table.fullname} 缺少字段 {sorted(missing)}，本次写入将跳过，请执行数据库迁移')
+    else:
+        _table_columns[table.fullname] = columns
+    return columns
+
+
+def build_rows(
+    table: Table,
+    objs: Sequence[BaseModel],
+    columns: Collection[str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    将创建参数转换为行数据
+
+    仅保留数据表中存在的字段，并为参数中缺少的列填充 ORM 层默认值（insert_default），保证所有行的键及其顺序一致；
+    COPY 不会应用 ORM 层默认值，缺少的列会写入 NULL
+
+    :param table: 数据表
+    :param objs: 创建参数列表
+    :param columns: 数据表实际存在的字段，默认为模型定义的所有字段
+    :return:
+    """
+    keys = set(table.columns.keys()) if columns is None else set(table.columns.keys()) & set(columns)
+    rows = [obj.model_dump(include=keys) for obj in objs]
+    if not rows:
+        return rows
+    defaults = [
+        (column.key, column.default)
+        for column in table.columns
+        if column.key in keys
+        and column.key not in rows[0]
+        and column.default is not None
+        and (column.default.is_scalar or column.default.is_callable)
+    ]
+    for row in rows:
+        for key, default in defaults:
+            row[key] = default.arg if default.is_scalar else default.arg(None)
+    return rows
+
+
+async def bulk_insert(db: AsyncSession, table: Table, rows: Sequence[dict[str, Any]]) -> None:
+    """
+    批量插入，适用于仅追加写入的日志类数据
+
+    跳过 ORM 对象实例化及工作单元，PostgreSQL 下行数达到阈值时使用 COPY，其余情况使用 Core executemany；
+    所有行的键及其顺序必须一致，且已包含 ORM 层默认值，可通过 build_rows 构建
+
+    :param db: 数据库会话
+    :param table: 数据表
+    :param rows: 行数据列表
+    :return:
+    """
+    if not rows:
+        return
+    if db.bind.dialect.name == 'postgresql' and len(rows) >= settings.DATABASE_BULK_INSERT_COPY_THRESHOLD:
+        await copy_records(db, table, rows)
+    else:
+        await db.execute(insert(table), rows)
+
+
+async def copy_records(db: AsyncSession, table: Table, rows: Sequence[dict[str, Any]]) -> None:
+    """
+    通过 asyncpg COPY 协议批量写入，与会话共享同一连接及事务
+
+    :param db: 数据库会话
+    :param table: 数据表
+    :param rows: 行数据列表
+    :return:
+    """
+    columns = list(rows[0])
+    # COPY 不经过 SQLAlchemy 类型处理，JSON 列需预先序列化
+    converters: list[Callable[[Any], Any] | None] = [
+        json.dumps if isinstance(table.c[column].type, JSON) else None for column in columns
+    ]
+    records = [
+        tuple(
+            value if converter is None or value is None else converter(value)
+            for value, converter in zip(row.values(), converters)
+        )
+        for row in rows
+    ]
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name,
+        records=records,
+        columns=columns,
+        schema_name=table.schema,
+    )
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 import sys
 
+from contextvars import ContextVar
 from typing import Annotated, AsyncGenerator
 from uuid import uuid4
 
@@ -12,21 +13,27 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from backend.common.log import log
 from backend.common.model import MappedBase
 from backend.core.conf import settings
+from backend.database.pool_metrics import MonitoredAsyncAdaptedQueuePool, PoolMetrics
+from backend.database.query_stats import register_query_stats
 
+# 当前请求的读操作是否使用主库（用户近期有写操作时，保证读到自己的写入）
+_read_from_primary: ContextVar[bool] = ContextVar('read_from_primary', default=False)
 
-def create_database_url(unittest: bool = False) -> URL:
+
+def create_database_url(unittest: bool = False, replica: bool = False) -> URL:
     """
     创建数据库链接
 
     :param unittest: 是否用于单元测试
+    :param replica: 是否为只读副本，未单独配置的连接信息与主库一致
     :return:
     """
     url = URL.create(
         drivername='mysql+asyncmy' if settings.DATABASE_TYPE == 'mysql' else 'postgresql+asyncpg',
-        username=settings.DATABASE_USER,
-        password=settings.DATABASE_PASSWORD,
-        host=settings.DATABASE_HOST,
-        port=settings.DATABASE_PORT,
+        username=(replica and settings.DATABASE_REPLICA_USER) or settings.DATABASE_USER,
+        password=(replica and settings.DATABASE_REPLICA_PASSWORD) or settings.DATABASE_PASSWORD,
+        host=(replica and settings.DATABASE_REPLICA_HOST) or settings.DATABASE_HOST,
+        port=(replica and settings.DATABASE_REPLICA_PORT) or settings.DATABASE_PORT,
         database=settings.DATABASE_SCHEMA if not unittest else f'{settings.DATABASE_SCHEMA}_test',
     )
     if settings.DATABASE_TYPE == 'mysql':
@@ -48,18 +55,19 @@ def create_async_engine_and_session(url: str | URL) -> tuple[AsyncEngine, async_
             echo=settings.DATABASE_ECHO,
             echo_pool=settings.DATABASE_POOL_ECHO,
             future=True,
-            # 中等并发
-            pool_size=10,  # 低：- 高：+
-            max_overflow=20,  # 低：- 高：+
-            pool_timeout=30,  # 低：+ 高：-
-            pool_recycle=3600,  # 低：+ 高：-
-            pool_pre_ping=True,  # 低：False 高：True
-            pool_use_lifo=False,  # 低：False 高：True
+            poolclass=MonitoredAsyncAdaptedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            pool_use_lifo=settings.DATABASE_POOL_USE_LIFO,
         )
     except Exception as e:
         log.error('❌ 数据库链接失败 {}', e)
         sys.exit()
     else:
+        register_query_stats(engine)
         db_session = async_sessionmaker(
             bind=engine,
             class_=AsyncSession,
@@ -75,6 +83,35 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def async_read_db_session() -> AsyncSession:
+    """
+    获取只读数据库会话
+
+    配置只读副本时使用副本，当前用户处于写后读窗口内或未配置副本时使用主库；仅用于不写入数据的查询
+
+    :return:
+    """
+    if async_read_db_session_maker is None or _read_from_primary.get():
+        return async_db_session()
+    return async_read_db_session_maker()
+
+
+def set_read_from_primary(value: bool) -> None:
+    """
+    设置当前请求的读操作是否使用主库
+
+    :param value: 是否使用主库
+    :return:
+    """
+    _read_from_primary.set(value)
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """获取只读数据库会话"""
+    async with async_read_db_session() as session:
+        yield session
+
+
 async def create_tables() -> None:
     """创建数据库表"""
     async with async_engine.begin() as coon:
@@ -92,5 +129,17 @@ SQLALCHEMY_DATABASE_URL = create_database_url()
 # SALA 异步引擎和会话
 async_engine, async_db_session = create_async_engine_and_session(SQLALCHEMY_DATABASE_URL)
 
+# 数据库连接池指标
+async_engine_pool_metrics = PoolMetrics(async_engine)
+
+# SQLA 只读副本异步引擎和会话（可选）
+async_read_engine: AsyncEngine | None = None
+async_read_db_session_maker: async_sessionmaker[AsyncSession] | None = None
+async_read_engine_pool_metrics: PoolMetrics | None = None
+if settings.DATABASE_REPLICA_HOST:
+    async_read_engine, async_read_db_session_maker = create_async_engine_and_session(create_database_url(replica=True))
+    async_read_engine_pool_metrics = PoolMetrics(async_read_engine)
+
 # Session Annotated
 CurrentSession = Annotated[AsyncSession, Depends(get_db)]
+CurrentReadSession = Annotated[AsyncSession, Depends(get_read_db)]
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Literal
+
+from sqlalchemy import Connection, Table, delete, event, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from backend.common.enums import DataBaseType
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.utils.timezone import timezone
+
+# MySQL 兜底分区，存放超出已创建分区范围的数据
+MYSQL_MAX_PARTITION = 'pmax'
+
+
+def partition_table_args(column: str = 'created_time') -> dict[str, Any]:
+    """
+    获取按时间范围分区的表参数，未启用日志表分区时返回空字典
+
+    分区仅在建表时生效，已存在的表需自行迁移；分区表的主键及唯一约束必须包含分区键
+
+    :param column: 分区键
+    :return:
+    """
+    if not settings.LOG_TABLE_PARTITION_ENABLED:
+        return {}
+    return {'postgresql_partition_by': f'RANGE ({column})', 'info': {'partition_key': column}}
+
+
+def _period_start(t: datetime, interval: Literal['month', 'day']) -> datetime:
+    """
+    获取时间所在分区周期的起始时间
+
+    :param t: 时间
+    :param interval: 分区周期
+    :return:
+    """
+    t = t.replace(hour=0, minute=0, second=0, microsecond=0)
+    return t.replace(day=1) if interval == 'month' else t
+
+
+def _next_period(start: datetime, interval: Literal['month', 'day']) -> datetime:
+    """
+    获取下一个分区周期的起始时间
+
+    :param start: 当前分区周期的起始时间
+    :param interval: 分区周期
+    :return:
+    """
+    if interval == 'day':
+        return start + timedelta(days=1)
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def _suffix(start: datetime, interval: Literal['month', 'day']) -> str:
+    return start.strftime('%Y%m' if interval == 'month' else '%Y%m%d')
+
+
+def _parse_suffix(suffix: str) -> tuple[datetime, datetime] | None:
+    """
+    解析分区名后缀，兼容按月和按天两种分区周期
+
+    :param suffix: 分区名后缀，例如 202501、20250101
+    :return: 分区范围，无法解析时返回 None
+    """
+    formats: dict[int, tuple[str, Literal['month', 'day']]] = {6: ('%Y%m', 'month'), 8: ('%Y%m%d', 'day')}
+    if len(suffix) not in formats:
+        return None
+    fmt, interval = formats[len(suffix)]
+    try:
+        start = datetime.strptime(suffix, fmt).replace(tzinfo=timezone.tz_info)
+    except ValueError:
+        return None
+    return start, _next_period(start, interval)
+
+
+def _upcoming_periods() -> list[datetime]:
+    """获取当前及需预创建的分区周期起始时间"""
+    interval = settings.LOG_TABLE_PARTITION_INTERVAL
+    start = _period_start(timezone.now(), interval)
+    periods = [start]
+    for _ in range(settings.LOG_TABLE_PARTITION_PRECREATE):
+        periods.append(_next_period(periods[-1], interval))
+    return periods
+
+
+def _partition_name(dialect: str, table_name: str, start: datetime) -> str:
+    suffix = _suffix(start, settings.LOG_TABLE_PARTITION_INTERVAL)
+    # PostgreSQL 分区为独立的表，MySQL 分区名仅在表内唯一
+    return f'{table_name}_p{suffix}' if dialect == DataBaseType.postgresql else f'p{suffix}'
+
+
+def _postgresql_create_partition_sql(table_name: str, start: datetime) -> str:
+    end = _next_period(start, settings.LOG_TABLE_PARTITION_INTERVAL)
+    name = _partition_name(DataBaseType.postgresql, table_name, start)
+    return (
+        f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table_name} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def _mysql_partition_definition(start: datetime) -> str:
+    end = _next_period(start, settings.LOG_TABLE_PARTITION_INTERVAL)
+    name = _partition_name(DataBaseType.mysql, '', start)
+    return f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{end:%Y-%m-%d}'))"
+
+
+@event.listens_for(Table, 'after_create')
+def _create_initial_partitions(table: Table, connection: Connection, **kwargs) -> None:
+    """
+    建表后创建初始分区
+
+    PostgreSQL 创建默认分区及当前和未来的分区；MySQL 不支持在建表语句中通过 SQLAlchemy 声明范围分区，
+    建表后将其转换为分区表
+
+    :param table: 表
+    :param connection: 数据库连接
+    :return:
+    """
+    column = table.info.get('partition_key')
+    if column is None:
+        return
+    periods = _upcoming_periods()
+    match connection.dialect.name:
+        case DataBaseType.postgresql:
+            connection.exec_driver_sql(
+                f'CREATE TABLE IF NOT EXISTS {table.name}_default PARTITION OF {table.name} DEFAULT'
+            )
+            for start in periods:
+                connection.exec_driver_sql(_postgresql_create_partition_sql(table.name, start))
+        case DataBaseType.mysql:
+            definitions = ', '.join(_mysql_partition_definition(start) for start in periods)
+            connection.exec_driver_sql(
+                f'ALTER TABLE {table.name} PARTITION BY RANGE (TO_DAYS({column})) '
+                f'({definitions}, PARTITION {MYSQL_MAX_PARTITION} VALUES LESS THAN MAXVALUE)'
+            )
+
+
+async def get_partitions(conn: AsyncConnection, table: Table) -> list[str]:
+    """
+    获取表的分区名称，非分区表返回空列表
+
+    :param conn: 数据库连接
+    :param table: 表
+    :return:
+    """
+    match conn.dialect.name:
+        case DataBaseType.postgresql:
+            stmt = text(
+                'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+                'WHERE i.inhparent = to_regclass(:table_name)'
+            )
+        case DataBaseType.mysql:
+            stmt = text(
+                'SELECT partition_name FROM information_schema.partitions '
+                'WHERE table_schema = DATABASE() AND table_name = :table_name AND partition_name IS NOT NULL'
+            )
+        case _:
+            return []
+    result = await conn.execute(stmt, {'table_name': table.name})
+    return list(result.scalars().all())
+
+
+async def create_partitions(conn: AsyncConnection, table: Table, partitions: list[str]) -> list[str]:
+    """
+    预创建当前及未来的分区
+
+    :param conn: 数据库连接
+    :param table: 分区表
+    :param partitions: 已存在的分区名称
+    :return: 新创建的分区名称
+    """
+    created = []
+    for start in _upcoming_periods():
+        name = _partition_name(conn.dialect.name, table.name, start)
+        if name in partitions:
+            continue
+        if conn.dialect.name == DataBaseType.postgresql:
+            await conn.exec_driver_sql(_postgresql_create_partition_sql(table.name, start))
+        elif MYSQL_MAX_PARTITION in partitions:
+            # 兜底分区中没有该范围的数据时，拆分仅修改元数据
+            await conn.exec_driver_sql(
+                f'ALTER TABLE {table.name} REORGANIZE PARTITION {MYSQL_MAX_PARTITION} INTO '
+                f'({_mysql_partition_definition(start)}, PARTITION {MYSQL_MAX_PARTITION} VALUES LESS THAN MAXVALUE)'
+            )
+        else:
+            await conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD PARTITION ({_mysql_partition_definition(start)})')
+        created.append(name)
+    return created
+
+
+async def drop_partitions(conn: AsyncConnection, table: Table, partitions: list[str], before: datetime) -> list[str]:
+    """
+    删除范围上限不晚于指定时间的分区
+
+    :param conn: 数据库连接
+    :param table: 分区表
+    :param partitions: 已存在的分区名称
+    :param before: 过期时间
+    :return: 已删除的分区名称
+    """
+    prefix = f'{table.name}_p' if conn.dialect.name == DataBaseType.postgresql else 'p'
+    dropped = []
+    for name in sorted(partitions):
+        if not name.startswith(prefix):
+            continue
+        period = _parse_suffix(name.removeprefix(prefix))
+        if period is None or period[1] > before:
+            continue
+        if conn.dialect.name == DataBaseType.postgresql:
+            await conn.exec_driver_sql(f'DROP TABLE IF EXISTS {name}')
+        else:
+            await conn.exec_driver_sql(f'ALTER TABLE {table.name} DROP PARTITION {name}')
+        dropped.append(name)
+    return dropped
+
+
+async def delete_in_chunks(
+    engine: AsyncEngine,
+    table: Table,
+    before: datetime,
+    column: str = 'created_time',
+    chunk_size: int | None = None,
+) -> int:
+    """
+    分批删除指定时间之前的数据，每批使用独立事务，避免长时间锁表和产生大事务
+
+    :param engine: 数据库引擎
+    :param table: 表
+    :param before: 过期时间
+    :param column: 时间字段
+    :param chunk_size: 每批删除的行数
+    :return: 删除的总行数
+    """
+    chunk_size = chunk_size or settings.LOG_TABLE_DELETE_CHUNK_SIZE
+    condition = table.c[column] < before
+    if engine.dialect.name == DataBaseType.mysql:
+        stmt = delete(table).where(condition).with_dialect_options(mysql_limit=chunk_size)
+    else:
+        # PostgreSQL 不支持 DELETE ... LIMIT
+        pk = table.primary_key.columns.values()[0]
+        stmt = delete(table).where(pk.in_(select(pk).where(condition).limit(chunk_size)))
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            count = (await conn.execute(stmt)).rowcount
+        total += count
+        if count < chunk_size:
+            return total
+
+
+@dataclass
+class RetentionResult:
+    """日志保留策略执行结果"""
+
+    partitioned: bool
+    created: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    deleted: int = 0
+
+
+async def apply_retention(engine: AsyncEngine, table: Table, retention_days: int) -> RetentionResult:
+    """
+    执行日志表保留策略
+
+    分区表预创建未来的分区并删除过期分区；非分区表分批删除过期数据
+
+    :param engine: 数据库引擎
+    :param table: 表
+    :param retention_days: 保留天数
+    :return:
+    """
+    before = timezone.now() - timedelta(days=retention_days)
+    async with engine.begin() as conn:
+        partitions = await get_partitions(conn, table)
+        if partitions:
+            created = await create_partitions(conn, table, partitions)
+            dropped = await drop_partitions(conn, table, partitions, before)
+            result = RetentionResult(partitioned=True, created=created, dropped=dropped)
+    if not partitions:
+        result = RetentionResult(partitioned=False, deleted=await delete_in_chunks(engine, table, before))
+    log.info('日志表 {} 保留策略执行完成: {}', table.name, result)
+    return result
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import bisect
+import time
+
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, PoolProxiedConnection, QueuePool
+
+# 连接检出等待时间分桶上限（毫秒）
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+# 连接存活时间分桶上限（秒）
+CONNECTION_AGE_BUCKETS_SECONDS = (60, 300, 900, 1800, 3600, 7200)
+
+
+def _histogram(buckets: tuple[int, ...], counts: list[int]) -> dict[str, int]:
+    """
+    格式化分桶统计
+
+    :param buckets: 分桶上限
+    :param counts: 各分桶数量，比分桶上限多一个溢出桶
+    :return:
+    """
+    data = {f'<={bucket}': count for bucket, count in zip(buckets, counts)}
+    data[f'>{buckets[-1]}'] = counts[-1]
+    return data
+
+
+class MonitoredAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """记录连接检出耗时的异步连接池"""
+
+    metrics: 'PoolMetrics | None' = None
+
+    def connect(self) -> PoolProxiedConnection:
+        if self.metrics is None:
+            return super().connect()
+        start_time = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            self.metrics.record_checkout_wait((time.perf_counter() - start_time) * 1000)
+
+    def recreate(self) -> QueuePool:
+        # 引擎 dispose 时会重建连接池，需保留指标对象
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    """
+    数据库连接池指标
+
+    通过连接池事件统计连接的创建、关闭、检出及存活时间，连接检出耗时（等待空闲连接、新建连接及 pre ping）
+    由 MonitoredAsyncAdaptedQueuePool 记录
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        """
+        初始化连接池指标并注册连接池事件
+
+        :param engine: 异步数据库引擎
+        :return:
+        """
+        self.engine = engine.sync_engine
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_wait_counts = [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+        self._connected_at: dict[int, float] = {}
+
+        if isinstance(self.engine.pool, MonitoredAsyncAdaptedQueuePool):
+            self.engine.pool.metrics = self
+        # 监听引擎而非连接池实例，连接池重建后事件仍然有效
+        event.listen(self.engine, 'connect', self._on_connect)
+        event.listen(self.engine, 'close', self._on_close)
+        event.listen(self.engine, 'close_detached', self._on_close_detached)
+        event.listen(self.engine, 'invalidate', self._on_invalidate)
+        event.listen(self.engine, 'checkout', self._on_checkout)
+        event.listen(self.engine, 'checkin', self._on_checkin)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        self.connects += 1
+        self._connected_at[id(dbapi_connection)] = time.monotonic()
+
+    def _on_close(self, dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        self.closes += 1
+        self._connected_at.pop(id(dbapi_connection), None)
+
+    def _on_close_detached(self, dbapi_connection: Any) -> None:
+        self.closes += 1
+        self._connected_at.pop(id(dbapi_connection), None)
+
+    def _on_invalidate(self, dbapi_connection: Any, connection_record: ConnectionPoolEntry, exception: Any) -> None:
+        self.invalidations += 1
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: ConnectionPoolEntry, proxy: Any) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        self.checkins += 1
+
+    def record_checkout_wait(self, cost: float) -> None:
+        """
+        记录连接检出耗时
+
+        :param cost: 耗时（毫秒）
+        :return:
+        """
+        self.checkout_wait_total += cost
+        self.checkout_wait_max = max(self.checkout_wait_max, cost)
+        self.checkout_wait_counts[bisect.bisect_left(CHECKOUT_WAIT_BUCKETS_MS, cost)] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """获取连接池指标"""
+        pool = self.engine.pool
+        data: dict[str, Any] = {'pool_class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update(
+                pool_size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                # 连接池未填满时 overflow 为负数
+                overflow=max(pool.overflow(), 0),
+                timeout=pool.timeout(),
+            )
+
+        now = time.monotonic()
+        ages = [now - connected_at for connected_at in self._connected_at.values()]
+        age_counts = [0] * (len(CONNECTION_AGE_BUCKETS_SECONDS) + 1)
+        for age in ages:
+            age_counts[bisect.bisect_left(CONNECTION_AGE_BUCKETS_SECONDS, age)] += 1
+
+        waits = sum(self.checkout_wait_counts)
+        data.update(
+            connections={
+                'live': len(ages),
+                'opened': self.connects,
+                'closed': self.closes,
+                'invalidated': self.invalidations,
+            },
+            checkouts=self.checkouts,
+            checkins=self.checkins,
+            checkout_timeouts=self.checkout_timeouts,
+            checkout_wait_ms={
+                'avg': round(self.checkout_wait_total / waits, 3) if waits else 0.0,
+                'max': round(self.checkout_wait_max, 3),
+                'histogram': _histogram(CHECKOUT_WAIT_BUCKETS_MS, self.checkout_wait_counts),
+            },
+            connection_age_seconds={
+                'max': round(max(ages), 3) if ages else 0.0,
+                'histogram': _histogram(CONNECTION_AGE_BUCKETS_SECONDS, age_counts),
+            },
+        )
+        return data
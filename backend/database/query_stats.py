@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from contextvars import ContextVar
+from typing import Any
+
+from asgi_correlation_id import correlation_id
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.common.log import log
+from backend.core.conf import settings
+
+
+class QueryStats:
+    """单次请求的 SQL 执行统计"""
+
+    __slots__ = ('trace_id', 'path', 'count', 'cost', 'statements', 'repeated')
+
+    def __init__(self, path: str) -> None:
+        """
+        初始化 SQL 执行统计
+
+        :param path: 请求路径
+        :return:
+        """
+        self.trace_id = correlation_id.get(settings.TRACE_ID_LOG_DEFAULT_VALUE)
+        self.path = path
+        self.count = 0
+        self.cost = 0.0
+        self.statements: dict[str, int] = {}
+        self.repeated: set[str] = set()
+
+    def record(self, statement: str, cost: float) -> None:
+        """
+        记录 SQL 执行
+
+        :param statement: SQL 语句（参数占位），相同语句视为同一查询形态
+        :param cost: 耗时（毫秒）
+        :return:
+        """
+        self.count += 1
+        self.cost += cost
+        times = self.statements.get(statement, 0) + 1
+        self.statements[statement] = times
+        if times > settings.DATABASE_QUERY_REPEAT_WARN_THRESHOLD and statement not in self.repeated:
+            # 每个请求中同一语句仅告警一次
+            self.repeated.add(statement)
+            log.warning(
+                '疑似 N+1 查询: [{}] 同一语句已执行 {} 次 | trace_id: {} | {}',
+                self.path,
+                times,
+                self.trace_id,
+                ' '.join(statement.split())[:500],
+            )
+
+
+# 当前请求的 SQL 执行统计
+_query_stats: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+
+
+def start_query_stats(path: str) -> QueryStats:
+    """
+    开始统计当前请求的 SQL 执行
+
+    :param path: 请求路径
+    :return:
+    """
+    stats = QueryStats(path)
+    _query_stats.set(stats)
+    return stats
+
+
+def get_query_stats() -> QueryStats | None:
+    """获取当前请求的 SQL 执行统计"""
+    return _query_stats.get()
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    if _query_stats.get() is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    stats = _query_stats.get()
+    start_time = getattr(context, '_query_start_time', None)
+    if stats is not None and start_time is not None:
+        stats.record(statement, (time.perf_counter() - start_time) * 1000)
+
+
+def register_query_stats(engine: AsyncEngine) -> None:
+    """
+    注册 SQL 执行统计事件
+
+    :param engine: 异步数据库引擎
+    :return:
+    """
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
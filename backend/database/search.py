@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from sqlalchemy import DDL, ColumnElement, Index, and_, event
+from sqlalchemy.orm import InstrumentedAttribute
+
+from backend.common.enums import DataBaseType
+from backend.common.model import MappedBase
+from backend.core.conf import settings
+
+# PostgreSQL 三元组索引依赖 pg_trgm 扩展
+event.listen(
+    MappedBase.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect=DataBaseType.postgresql.value),
+)
+
+
+def search_indexes(table_name: str, *columns: str, fulltext: bool = True) -> tuple[Index, ...]:
+    """
+    创建模糊搜索索引，仅在对应的数据库中创建
+
+    PostgreSQL 为每个字段创建 pg_trgm GIN 索引，LIKE '%x%' 可直接使用；MySQL 为每个字段创建 ngram 全文索引，
+    需使用 contains 构建查询条件
+
+    :param table_name: 表名
+    :param columns: 字段名
+    :param fulltext: 是否创建 MySQL 全文索引，MySQL 分区表不支持全文索引
+    :return:
+    """
+    indexes = []
+    for column in columns:
+        indexes.append(
+            Index(
+                f'ix_{table_name}_{column}_trgm',
+                column,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+            ).ddl_if(dialect=DataBaseType.postgresql.value)
+        )
+        if fulltext:
+            indexes.append(
+                Index(
+                    f'ix_{table_name}_{column}_ngram',
+                    column,
+                    mysql_prefix='FULLTEXT',
+                    mysql_with_parser='ngram',
+                ).ddl_if(dialect=DataBaseType.mysql.value)
+            )
+    return tuple(indexes)
+
+
+def _has_fulltext_index(column: InstrumentedAttribute) -> bool:
+    """
+    字段是否存在单列 MySQL 全文索引
+
+    :param column: 字段
+    :return:
+    """
+    for index in column.table.indexes:
+        if index.dialect_options['mysql']['prefix'] == 'FULLTEXT' and list(index.columns.keys()) == [column.key]:
+            return True
+    return False
+
+
+def contains(column: InstrumentedAttribute, value: str) -> ColumnElement[bool]:
+    """
+    构建模糊搜索条件
+
+    MySQL 字段存在 ngram 全文索引且搜索值不短于分词长度时，先通过全文索引短语匹配缩小范围，
+    再使用 LIKE 保证与子串匹配的结果一致；其他情况使用 LIKE '%x%'，PostgreSQL 由三元组索引加速
+
+    :param column: 字段
+    :param value: 搜索值
+    :return:
+    """
+    condition = column.like(f'%{value}%')
+    if (
+        settings.DATABASE_TYPE == DataBaseType.mysql
+        and len(value) >= settings.DATABASE_NGRAM_TOKEN_SIZE
+        and _has_fulltext_index(column)
+    ):
+        phrase = value.replace('"', ' ')
+        return and_(column.match(f'"{phrase}"'), condition)
+    return condition
@@ -1,29 +1,45 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import random
 import time
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.query_stats import start_query_stats
 from backend.utils.timezone import timezone
 
 
-class AccessMiddleware(BaseHTTPMiddleware):
+class AccessMiddleware:
     """访问日志中间件"""
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         处理请求并记录访问日志
 
-        :param request: FastAPI 请求对象
-        :param call_next: 下一个中间件或路由处理函数
+        :param scope: ASGI 请求范围
+        :param receive: ASGI 接收通道
+        :param send: ASGI 发送通道
         :return:
         """
-        path = request.url.path if not request.url.query else request.url.path + '/' + request.url.query
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        method = scope['method']
+        path = scope['path']
+        if scope['query_string']:
+            path = f'{path}/{scope["query_string"].decode("latin-1")}'
 
-        if request.method != 'OPTIONS':
-            log.debug(f'--> 请求开始[{path}]')
+        if method != 'OPTIONS':
+            log.debug('--> 请求开始[{}]', path)
 
         perf_time = time.perf_counter()
         request.state.perf_time = perf_time
@@ -31,16 +47,48 @@ class AccessMiddleware(BaseHTTPMiddleware):
         start_time = timezone.now()
         request.state.start_time = start_time
 
-        response = await call_next(request)
+        status_code = 500
+        query_stats = start_query_stats(scope['path'])
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if settings.MIDDLEWARE_SERVER_TIMING:
+                    app_cost = (time.perf_counter() - perf_time) * 1000
+                    MutableHeaders(scope=message).append(
+                        'Server-Timing',
+                        f'db;dur={query_stats.cost:.3f};desc="{query_stats.count} queries", app;dur={app_cost:.3f}',
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
         elapsed = (time.perf_counter() - perf_time) * 1000
 
-        if request.method != 'OPTIONS':
+        if method != 'OPTIONS':
             log.debug('<-- 请求结束')
 
-            log.info(
-                f'{request.client.host: <15} | {request.method: <8} | {response.status_code: <6} | '
-                f'{path} | {elapsed:.3f}ms'
-            )
+            if status_code >= 400 or self.is_sampled(scope):
+                log.info(
+                    '{client: <15} | {method: <8} | {status_code: <6} | {path} | {elapsed:.3f}ms',
+                    client=request.client.host,
+                    method=method,
+                    status_code=status_code,
+                    path=path,
+                    elapsed=round(elapsed, 3),
+                )
 
-        return response
+    @staticmethod
+    def is_sampled(scope: Scope) -> bool:
+        """
+        判断访问日志是否采样记录
+
+        :param scope: ASGI 请求范围
+        :return:
+        """
+        route = scope.get('route')
+        rate = settings.LOG_ACCESS_SAMPLE_RATE
+        if route is not None and settings.LOG_ACCESS_SAMPLE_RATES:
+            rate = settings.LOG_ACCESS_SAMPLE_RATES.get(getattr(route, 'path', ''), rate)
+        return rate >= 1 or random.random() < rate
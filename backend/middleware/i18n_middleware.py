@@ -1,57 +1,62 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from functools import lru_cache
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from backend.common.i18n import i18n
+from backend.core.conf import settings
 
 
-class I18nMiddleware(BaseHTTPMiddleware):
+class I18nMiddleware:
     """国际化中间件"""
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         处理请求并设置国际化语言
 
-        :param request: FastAPI 请求对象
-        :param call_next: 下一个中间件或路由处理函数
+        :param scope: ASGI 请求范围
+        :param receive: ASGI 接收通道
+        :param send: ASGI 发送通道
         :return:
         """
-        language = self.get_current_language(request)
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
-        # 设置国际化语言
-        if language and i18n.current_language != language:
-            i18n.current_language = language
+        language = get_current_language(Headers(scope=scope).get('Accept-Language', ''))
 
-        response = await call_next(request)
+        # 设置当前请求的国际化语言，未指定时使用默认语言
+        i18n.current_language = language or settings.I18N_DEFAULT_LANGUAGE
 
-        return response
+        await self.app(scope, receive, send)
 
-    @lru_cache(maxsize=128)
-    def get_current_language(self, request: Request) -> str | None:
-        """
-        获取当前请求的语言偏好
 
-        :param request: FastAPI 请求对象
-        :return:
-        """
-        accept_language = request.headers.get('Accept-Language', '')
-        if not accept_language:
-            return None
-
-        languages = [lang.split(';')[0] for lang in accept_language.split(',')]
-        lang = languages[0].lower().strip()
-
-        # 语言映射
-        lang_mapping = {
-            'zh': 'zh-CN',
-            'zh-cn': 'zh-CN',
-            'zh-hans': 'zh-CN',
-            'en': 'en-US',
-            'en-us': 'en-US',
-        }
-
-        return lang_mapping.get(lang, lang)
+@lru_cache(maxsize=256)
+def get_current_language(accept_language: str) -> str | None:
+    """
+    获取当前请求的语言偏好，按请求头原始值缓存解析结果
+
+    :param accept_language: 请求头 Accept-Language
+    :return:
+    """
+    if not accept_language:
+        return None
+
+    languages = [lang.split(';')[0] for lang in accept_language.split(',')]
+    lang = languages[0].lower().strip()
+
+    # 语言映射
+    lang_mapping = {
+        'zh': 'zh-CN',
+        'zh-cn': 'zh-CN',
+        'zh-hans': 'zh-CN',
+        'en': 'en-US',
+        'en-us': 'en-US',
+    }
+
+    return lang_mapping.get(lang, lang)
@@ -10,8 +10,8 @@ from starlette.requests import HTTPConnection
 from backend.app.admin.schema.user import GetUserInfoWithRelationDetail
 from backend.common.exception.errors import TokenError
 from backend.common.log import log
-from backend.common.security.jwt import jwt_authentication
-from backend.core.conf import settings
+from backend.common.path_policy import path_policy
+from backend.common.security.jwt import jwt_authentication, mark_recent_write
 from backend.utils.serializers import MsgSpecJSONResponse
 
 
@@ -59,12 +59,8 @@ class JwtAuthMiddleware(AuthenticationBackend):
         if not token:
             return None
 
-        path = request.url.path
-        if path in settings.TOKEN_REQUEST_PATH_EXCLUDE:
+        if path_policy.is_auth_exempt(request.url.path):
             return None
-        for pattern in settings.TOKEN_REQUEST_PATH_EXCLUDE_PATTERN:
-            if pattern.match(path):
-                return None
 
         scheme, token = get_authorization_scheme_param(token)
         if scheme.lower() != 'bearer':
@@ -72,6 +68,8 @@ class JwtAuthMiddleware(AuthenticationBackend):
 
         try:
             user = await jwt_authentication(token)
+            if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+                await mark_recent_write(user.id)
         except TokenError as exc:
             raise _AuthenticationError(code=exc.code, msg=exc.detail, headers=exc.headers)
         except Exception as e:
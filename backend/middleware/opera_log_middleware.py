@@ -2,127 +2,190 @@
 # -*- coding: utf-8 -*-
 import time
 
-from asyncio import Queue
 from typing import Any
 
-from asgiref.sync import sync_to_async
-from fastapi import Response
-from starlette.datastructures import UploadFile
-from starlette.middleware.base import BaseHTTPMiddleware
+import msgspec
+
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from backend.app.admin.schema.opera_log import CreateOperaLogParam
 from backend.app.admin.service.opera_log_service import opera_log_service
-from backend.common.enums import OperaLogCipherType, StatusType
+from backend.common.enums import StatusType
 from backend.common.log import log
-from backend.common.queue import batch_dequeue
+from backend.common.path_policy import path_policy
+from backend.common.queue import BatchWriter
 from backend.core.conf import settings
-from backend.utils.encrypt import AESCipher, ItsDCipher, Md5Cipher
+from backend.core.path_conf import OPERA_LOG_SPILL_FILE
+from backend.database.query_stats import get_query_stats
+from backend.utils.body_capture import RequestBodyCapture
+from backend.utils.desensitize import Desensitizer
+from backend.utils.request_parse import parse_ip_info
 from backend.utils.trace_id import get_request_trace_id
 
 
-class OperaLogMiddleware(BaseHTTPMiddleware):
+async def write_opera_logs(logs: list[CreateOperaLogParam]) -> None:
+    """
+    批量写入操作日志
+
+    :param logs: 操作日志列表
+    :return:
+    """
+    if settings.DATABASE_ECHO:
+        log.info('自动执行【操作日志批量创建】任务...')
+    await opera_log_service.bulk_create(objs=logs)
+
+
+# 溢出文件序列化器，SchemaBase 的 json_encoders 会将时间序列化为不带时区及微秒的字符串，回放时无法还原原始时间
+_spill_encoder = msgspec.json.Encoder(enc_hook=str)
+
+# 创建操作日志批量写入器单例
+opera_log_writer: BatchWriter[CreateOperaLogParam] = BatchWriter(
+    '操作日志',
+    write_opera_logs,
+    maxsize=settings.OPERA_LOG_QUEUE_MAXSIZE,
+    batch_size=settings.OPERA_LOG_QUEUE_BATCH_CONSUME_SIZE,
+    flush_interval=settings.OPERA_LOG_QUEUE_TIMEOUT,
+    full_policy=settings.OPERA_LOG_QUEUE_FULL_POLICY,
+    spill_file=OPERA_LOG_SPILL_FILE,
+    dumps=lambda obj: _spill_encoder.encode(obj.model_dump()).decode(),
+    loads=CreateOperaLogParam.model_validate_json,
+    max_retries=settings.OPERA_LOG_WRITE_MAX_RETRIES,
+    retry_backoff=settings.OPERA_LOG_WRITE_RETRY_BACKOFF,
+    max_replays=settings.OPERA_LOG_SPILL_MAX_REPLAYS,
+)
+
+# 创建操作日志参数脱敏器单例
+opera_log_desensitizer: Desensitizer = Desensitizer(
+    settings.OPERA_LOG_ENCRYPT_KEY_INCLUDE,
+    settings.OPERA_LOG_ENCRYPT_TYPE,
+    settings.OPERA_LOG_ENCRYPT_SECRET_KEY,
+)
+
+
+class OperaLogMiddleware:
     """操作日志中间件"""
 
-    opera_log_queue: Queue = Queue(maxsize=100000)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         处理请求并记录操作日志
 
-        :param request: FastAPI 请求对象
-        :param call_next: 下一个中间件或路由处理函数
+        :param scope: ASGI 请求范围
+        :param receive: ASGI 接收通道
+        :param send: ASGI 发送通道
         :return:
         """
-        response = None
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
         path = request.url.path
 
-        if path in settings.OPERA_LOG_PATH_EXCLUDE or not path.startswith(f'{settings.FASTAPI_API_V1_PATH}'):
-            response = await call_next(request)
-        else:
-            method = request.method
-            args = await self.get_request_args(request)
-
-            # 执行请求
-            elapsed = 0.0
-            code = 200
-            msg = 'Success'
-            status = StatusType.enable
-            error = None
-            try:
-                response = await call_next(request)
-                elapsed = (time.perf_counter() - request.state.perf_time) * 1000
-                for state in [
-                    '__request_http_exception__',
-                    '__request_validation_exception__',
-                    '__request_assertion_error__',
-                    '__request_custom_exception__',
-                    '__request_all_unknown_exception__',
-                    '__request_cors_500_exception__',
-                ]:
-                    exception = getattr(request.state, state, None)
-                    if exception:
-                        code = exception.get('code')
-                        msg = exception.get('msg')
-                        log.error(f'请求异常: {msg}')
-                        break
-            except Exception as e:
-                log.error(f'请求异常: {str(e)}')
-                code = getattr(e, 'code', code)  # 兼容 SQLAlchemy 异常用法
-                msg = getattr(e, 'msg', msg)
-                status = StatusType.disable
-                error = e
-
-            # 此信息只能在请求后获取
-            _route = request.scope.get('route')
-            summary = getattr(_route, 'summary', '')
-
-            try:
-                # 此信息来源于 JWT 认证中间件
-                username = request.user.username
-            except AttributeError:
-                username = None
-
-            # 日志记录
-            log.debug(f'接口摘要：[{summary}]')
-            log.debug(f'请求地址：[{request.state.ip}]')
-            log.debug(f'请求参数：{args}')
-
-            # 日志创建
-            opera_log_in = CreateOperaLogParam(
-                trace_id=get_request_trace_id(request),
-                username=username,
-                method=method,
-                title=summary,
-                path=path,
-                ip=request.state.ip,
-                country=request.state.country,
-                region=request.state.region,
-                city=request.state.city,
-                user_agent=request.state.user_agent,
-                os=request.state.os,
-                browser=request.state.browser,
-                device=request.state.device,
-                args=args,
-                status=status,
-                code=str(code),
-                msg=msg,
-                cost_time=elapsed,  # 可能和日志存在微小差异（可忽略）
-                opera_time=request.state.start_time,
-            )
-            await self.opera_log_queue.put(opera_log_in)
-
-            # 错误抛出
-            if error:
-                raise error from None
-
-        return response
-
-    async def get_request_args(self, request: Request) -> dict[str, Any] | None:
+        if path_policy.is_opera_log_exempt(path):
+            await self.app(scope, receive, send)
+            return
+
+        method = request.method
+
+        # 在路由处理函数读取请求体时同步捕获，不预先读取
+        body_capture = RequestBodyCapture(
+            receive,
+            request.headers.get('Content-Type', ''),
+            settings.OPERA_LOG_BODY_CAPTURE_MAX_BYTES,
+        )
+
+        # 执行请求
+        elapsed = 0.0
+        code = 200
+        msg = 'Success'
+        status = StatusType.enable
+        error = None
+        try:
+            await self.app(scope, body_capture, send)
+            elapsed = (time.perf_counter() - request.state.perf_time) * 1000
+            for state in [
+                '__request_http_exception__',
+                '__request_validation_exception__',
+                '__request_assertion_error__',
+                '__request_custom_exception__',
+                '__request_all_unknown_exception__',
+                '__request_cors_500_exception__',
+            ]:
+                exception = getattr(request.state, state, None)
+                if exception:
+                    code = exception.get('code')
+                    msg = exception.get('msg')
+                    log.error(f'请求异常: {msg}')
+                    break
+        except Exception as e:
+            log.error(f'请求异常: {str(e)}')
+            code = getattr(e, 'code', code)  # 兼容 SQLAlchemy 异常用法
+            msg = getattr(e, 'msg', msg)
+            status = StatusType.disable
+            error = e
+
+        # 此信息只能在请求后获取，路由匹配后路径参数才会写入请求范围
+        args = await self.get_request_args(request, body_capture)
+        await parse_ip_info(request)
+        _route = scope.get('route')
+        summary = getattr(_route, 'summary', '')
+
+        try:
+            # 此信息来源于 JWT 认证中间件
+            username = request.user.username
+        except (AssertionError, AttributeError):
+            username = None
+
+        # 日志记录
+        log.debug(f'接口摘要：[{summary}]')
+        log.debug(f'请求地址：[{request.state.ip}]')
+        log.debug(f'请求参数：{args}')
+
+        # SQL 执行统计，来源于访问日志中间件
+        query_stats = get_query_stats()
+
+        # 日志创建
+        opera_log_in = CreateOperaLogParam(
+            trace_id=get_request_trace_id(request),
+            username=username,
+            method=method,
+            title=summary,
+            path=path,
+            route=getattr(_route, 'path', None),
+            ip=request.state.ip,
+            country=request.state.country,
+            region=request.state.region,
+            city=request.state.city,
+            user_agent=request.state.user_agent,
+            os=request.state.os,
+            browser=request.state.browser,
+            device=request.state.device,
+            args=args,
+            status=status,
+            code=str(code),
+            msg=msg,
+            cost_time=elapsed,  # 可能和日志存在微小差异（可忽略）
+            query_count=query_stats.count if query_stats else 0,
+            query_cost_time=query_stats.cost if query_stats else 0.0,
+            opera_time=request.state.start_time,
+        )
+        await opera_log_writer.put(opera_log_in)
+
+        # 错误抛出
+        if error:
+            raise error from None
+
+    async def get_request_args(self, request: Request, body_capture: RequestBodyCapture) -> dict[str, Any] | None:
         """
         获取请求参数
 
         :param request: FastAPI 请求对象
+        :param body_capture: 请求体捕获
         :return:
         """
         args = {}
@@ -137,77 +200,28 @@ class OperaLogMiddleware(BaseHTTPMiddleware):
         if path_params:
             args['path_params'] = await self.desensitization(path_params)
 
-        # Tip: .body() 必须在 .form() 之前获取
-        # https://github.com/encode/starlette/discussions/1933
-        content_type = request.headers.get('Content-Type', '').split(';')
-
-        # 请求体
-        body_data = await request.body()
-        if body_data:
-            # 注意：非 json 数据默认使用 data 作为键
-            if 'application/json' not in content_type:
-                args['data'] = str(body_data)
-            else:
-                json_data = await request.json()
-                if isinstance(json_data, dict):
-                    args['json'] = await self.desensitization(json_data)
-                else:
-                    args['data'] = str(body_data)
-
-        # 表单参数
-        form_data = await request.form()
-        if len(form_data) > 0:
-            for k, v in form_data.items():
-                if isinstance(v, UploadFile):
-                    form_data = {k: v.filename}
-                else:
-                    form_data = {k: v}
-            if 'multipart/form-data' not in content_type:
-                args['x-www-form-urlencoded'] = await self.desensitization(form_data)
+        # 请求体，注意：非 json 及表单数据默认使用 data 作为键
+        body = body_capture.get_body()
+        if body:
+            key, value = body
+            # 解析后的 json 数组、表单等结构化数据均需脱敏，包括顶层为数组的 json
+            if isinstance(value, (dict, list)):
+                if value:
+                    args[key] = await self.desensitization(value, body_capture.size)
             else:
-                args['form-data'] = await self.desensitization(form_data)
+                args[key] = value
 
         return None if not args else args
 
     @staticmethod
-    @sync_to_async
-    def desensitization(args: dict[str, Any]) -> dict[str, Any]:
+    async def desensitization(args: dict[str, Any] | list[Any], size: int = 0) -> dict[str, Any] | list[Any]:
         """
-        脱敏处理
+        脱敏处理，参数较大时在线程池中执行，避免阻塞事件循环
 
-        :param args: 需要脱敏的参数字典
+        :param args: 需要脱敏的参数
+        :param size: 参数原始字节数
         :return:
         """
-        for key, value in args.items():
-            if key in settings.OPERA_LOG_ENCRYPT_KEY_INCLUDE:
-                match settings.OPERA_LOG_ENCRYPT_TYPE:
-                    case OperaLogCipherType.aes:
-                        args[key] = (AESCipher(settings.OPERA_LOG_ENCRYPT_SECRET_KEY).encrypt(value)).hex()
-                    case OperaLogCipherType.md5:
-                        args[key] = Md5Cipher.encrypt(value)
-                    case OperaLogCipherType.itsdangerous:
-                        args[key] = ItsDCipher(settings.OPERA_LOG_ENCRYPT_SECRET_KEY).encrypt(value)
-                    case OperaLogCipherType.plan:
-                        pass
-                    case _:
-                        args[key] = '******'
-
-        return args
-
-    @classmethod
-    async def consumer(cls) -> None:
-        """操作日志消费者"""
-        while True:
-            logs = await batch_dequeue(
-                cls.opera_log_queue,
-                max_items=settings.OPERA_LOG_QUEUE_BATCH_CONSUME_SIZE,
-                timeout=settings.OPERA_LOG_QUEUE_TIMEOUT,
-            )
-            if logs:
-                try:
-                    if settings.DATABASE_ECHO:
-                        log.info('自动执行【操作日志批量创建】任务...')
-                    await opera_log_service.bulk_create(objs=logs)
-                finally:
-                    if not cls.opera_log_queue.empty():
-                        cls.opera_log_queue.task_done()
+        if size >= settings.OPERA_LOG_DESENSITIZE_THREAD_THRESHOLD:
+            return await run_in_threadpool(opera_log_desensitizer, args)
+        return opera_log_desensitizer(args)
@@ -1,34 +1,72 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from typing import Any
 
-from backend.utils.request_parse import parse_ip_info, parse_user_agent_info
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from backend.utils.request_parse import get_request_ip, parse_user_agent_info
 
-class StateMiddleware(BaseHTTPMiddleware):
+
+class RequestState(dict):
+    """
+    请求状态
+
+    IP 和用户代理信息在首次访问时解析并缓存，未使用的请求不产生解析开销；
+    IP 属地（country、region、city）需异步解析，使用前须调用 `parse_ip_info`
+    """
+
+    def __init__(self, scope: Scope, state: dict[str, Any]) -> None:
+        """
+        初始化请求状态
+
+        :param scope: ASGI 请求范围
+        :param state: 已有的请求状态
+        :return:
+        """
+        super().__init__(state)
+        # 仅保留解析所需的请求头和客户端地址，避免状态与 scope 相互引用
+        self._scope: Scope = {'type': scope['type'], 'headers': scope['headers'], 'client': scope.get('client')}
+
+    def __missing__(self, key: str) -> Any:
+        """
+        按需解析请求状态
+
+        :param key: 状态名
+        :return:
+        """
+        if key == 'ip':
+            self['ip'] = get_request_ip(Request(self._scope))
+        elif key in ('user_agent', 'os', 'browser', 'device'):
+            ua_info = parse_user_agent_info(Request(self._scope))
+            self['user_agent'] = ua_info.user_agent
+            self['os'] = ua_info.os
+            self['browser'] = ua_info.browser
+            self['device'] = ua_info.device
+        else:
+            raise KeyError(key)
+        return self[key]
+
+
+class StateMiddleware:
     """请求状态中间件"""
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         处理请求并设置请求状态信息
 
-        :param request: FastAPI 请求对象
-        :param call_next: 下一个中间件或路由处理函数
+        :param scope: ASGI 请求范围
+        :param receive: ASGI 接收通道
+        :param send: ASGI 发送通道
         :return:
         """
-        ip_info = await parse_ip_info(request)
-        request.state.ip = ip_info.ip
-        request.state.country = ip_info.country
-        request.state.region = ip_info.region
-        request.state.city = ip_info.city
-
-        ua_info = parse_user_agent_info(request)
-        request.state.user_agent = ua_info.user_agent
-        request.state.os = ua_info.os
-        request.state.browser = ua_info.browser
-        request.state.device = ua_info.device
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
-        response = await call_next(request)
+        scope['state'] = RequestState(scope, scope.get('state') or {})
 
-        return response
+        await self.app(scope, receive, send)
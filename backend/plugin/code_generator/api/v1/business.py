@@ -9,7 +9,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 from backend.plugin.code_generator.schema.business import (
     CreateGenBusinessParam,
     GetGenBusinessDetail,
@@ -45,7 +45,7 @@ async def get_business(
     ],
 )
 async def get_businesses_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     table_name: Annotated[str | None, Query(description='代码生成业务表名称')] = None,
 ) -> ResponseSchemaModel[PageData[GetGenBusinessDetail]]:
     business_select = await gen_business_service.get_select(table_name=table_name)
@@ -5,7 +5,7 @@ from typing import Sequence
 from sqlalchemy import Select
 
 from backend.common.exception import errors
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, async_read_db_session
 from backend.plugin.code_generator.crud.crud_business import gen_business_dao
 from backend.plugin.code_generator.model import GenBusiness
 from backend.plugin.code_generator.schema.business import CreateGenBusinessParam, UpdateGenBusinessParam
@@ -31,7 +31,7 @@ class GenBusinessService:
     @staticmethod
     async def get_all() -> Sequence[GenBusiness]:
         """获取所有业务"""
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             return await gen_business_dao.get_all(db)
 
     @staticmethod
@@ -9,7 +9,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 from backend.plugin.config.schema.config import (
     CreateConfigParam,
     GetConfigDetail,
@@ -44,7 +44,7 @@ async def get_config(pk: Annotated[int, Path(description='参数配置 ID')]) ->
     ],
 )
 async def get_configs_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     name: Annotated[str | None, Query(description='参数配置名称')] = None,
     type: Annotated[str | None, Query(description='参数配置类型')] = None,
 ) -> ResponseSchemaModel[PageData[GetConfigDetail]]:
@@ -4,7 +4,7 @@
 from sqlalchemy import Select
 
 from backend.common.exception import errors
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, async_read_db_session
 from backend.plugin.config.crud.crud_config import config_dao
 from backend.plugin.config.model import Config
 from backend.plugin.config.schema.config import (
@@ -39,7 +39,7 @@ class ConfigService:
         :param type: 参数配置类型
         :return:
         """
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             return await config_dao.get_all(db, type)
 
     @staticmethod
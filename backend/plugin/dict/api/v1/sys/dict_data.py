@@ -9,7 +9,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 from backend.plugin.dict.schema.dict_data import (
     CreateDictDataParam,
     DeleteDictDataParam,
@@ -44,7 +44,7 @@ async def get_dict_data(
     ],
 )
 async def get_dict_datas_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     type_code: Annotated[str | None, Query(description='字典类型编码')] = None,
     label: Annotated[str | None, Query(description='字典数据标签')] = None,
     value: Annotated[str | None, Query(description='字典数据键值')] = None,
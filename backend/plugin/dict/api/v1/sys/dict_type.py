@@ -9,7 +9,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 from backend.plugin.dict.schema.dict_type import (
     CreateDictTypeParam,
     DeleteDictTypeParam,
@@ -38,7 +38,7 @@ async def get_dict_type(
     ],
 )
 async def get_dict_types_paged(
-    db: CurrentSession,
+    db: CurrentReadSession,
     name: Annotated[str | None, Query(description='字典类型名称')] = None,
     code: Annotated[str | None, Query(description='字典类型编码')] = None,
     status: Annotated[int | None, Query(description='状态')] = None,
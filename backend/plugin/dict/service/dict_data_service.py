@@ -5,7 +5,7 @@ from typing import Sequence
 from sqlalchemy import Select
 
 from backend.common.exception import errors
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, async_read_db_session
 from backend.plugin.dict.crud.crud_dict_data import dict_data_dao
 from backend.plugin.dict.crud.crud_dict_type import dict_type_dao
 from backend.plugin.dict.model import DictData
@@ -31,7 +31,7 @@ class DictDataService:
 
     @staticmethod
     async def get_all() -> Sequence[DictData]:
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             dict_datas = await dict_data_dao.get_all(db)
             return dict_datas
 
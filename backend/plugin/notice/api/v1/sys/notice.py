@@ -9,7 +9,7 @@ from backend.common.response.response_schema import ResponseModel, ResponseSchem
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.security.permission import RequestPermission
 from backend.common.security.rbac import DependsRBAC
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 from backend.plugin.notice.schema.notice import CreateNoticeParam, DeleteNoticeParam, GetNoticeDetail, UpdateNoticeParam
 from backend.plugin.notice.service.notice_service import notice_service
 
@@ -30,7 +30,7 @@ async def get_notice(pk: Annotated[int, Path(description='通知公告 ID')]) ->
         DependsPagination,
     ],
 )
-async def get_notices_paged(db: CurrentSession) -> ResponseSchemaModel[PageData[GetNoticeDetail]]:
+async def get_notices_paged(db: CurrentReadSession) -> ResponseSchemaModel[PageData[GetNoticeDetail]]:
     notice_select = await notice_service.get_select()
     page_data = await paging_data(db, notice_select)
     return response_base.success(data=page_data)
@@ -5,7 +5,7 @@ from typing import Sequence
 from sqlalchemy import Select
 
 from backend.common.exception import errors
-from backend.database.db import async_db_session
+from backend.database.db import async_db_session, async_read_db_session
 from backend.plugin.notice.crud.crud_notice import notice_dao
 from backend.plugin.notice.model import Notice
 from backend.plugin.notice.schema.notice import CreateNoticeParam, DeleteNoticeParam, UpdateNoticeParam
@@ -36,7 +36,7 @@ class NoticeService:
     @staticmethod
     async def get_all() -> Sequence[Notice]:
         """获取所有通知公告"""
-        async with async_db_session() as db:
+        async with async_read_db_session() as db:
             notices = await notice_dao.get_all(db)
             return notices
 
@@ -103,7 +103,7 @@ class OAuth2Service:
                 device=request.state.device,
             )
             refresh_token = await jwt.create_refresh_token(
-                access_token.session_uuid, sys_user.id, sys_user.is_multi_login
+                access_token.session_uuid, sys_user.id, access_token.generation
             )
             await user_dao.update_login_time(db, sys_user.username)
             await db.refresh(sys_user)
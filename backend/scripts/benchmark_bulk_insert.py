@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+操作日志批量写入性能基准测试
+
+对比 ORM、Core executemany 与 PostgreSQL COPY 三种写入方式的吞吐量；
+使用 .env 中配置的数据库，每组测试在事务中执行并回滚，不会留下测试数据
+
+用法（命令行空间位于 backend 目录下）::
+
+    python scripts/benchmark_bulk_insert.py --rows 20000 --batch-size 100
+"""
+
+import argparse
+import asyncio
+import time
+
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.admin.model import OperaLog
+from backend.app.admin.schema.opera_log import CreateOperaLogParam
+from backend.common.enums import StatusType
+from backend.database.bulk import build_rows, copy_records
+from backend.database.db import async_db_session, async_engine
+from backend.utils.timezone import timezone
+
+
+def build_logs(count: int) -> list[CreateOperaLogParam]:
+    """
+    构造测试操作日志
+
+    :param count: 数量
+    :return:
+    """
+    now = timezone.now()
+    return [
+        CreateOperaLogParam(
+            trace_id=f'{i:032x}',
+            username='admin',
+            method='POST',
+            title='基准测试',
+            path='/api/v1/benchmark',
+            ip='127.0.0.1',
+            country=None,
+            region=None,
+            city=None,
+            user_agent='benchmark',
+            os='Linux',
+            browser='Chrome 120.0',
+            device='PC',
+            args={'json': {'index': i, 'password': '******'}},
+            status=StatusType.enable,
+            code='200',
+            msg='Success',
+            cost_time=1.23,
+            opera_time=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def orm_insert(db: AsyncSession, objs: list[CreateOperaLogParam]) -> None:
+    # route 及 created_time 不属于 ORM 模型的初始化参数
+    db.add_all([OperaLog(**obj.model_dump(exclude={'route', 'created_time'})) for obj in objs])
+    await db.flush()
+
+
+async def core_insert(db: AsyncSession, objs: list[CreateOperaLogParam]) -> None:
+    await db.execute(insert(OperaLog.__table__), build_rows(OperaLog.__table__, objs))
+
+
+async def copy_insert(db: AsyncSession, objs: list[CreateOperaLogParam]) -> None:
+    await copy_records(db, OperaLog.__table__, build_rows(OperaLog.__table__, objs))
+
+
+async def measure(
+    func: Callable[[AsyncSession, list[CreateOperaLogParam]], Awaitable[None]],
+    logs: list[CreateOperaLogParam],
+    batch_size: int,
+) -> float:
+    """
+    测量写入吞吐量
+
+    :param func: 写入函数
+    :param logs: 操作日志列表
+    :param batch_size: 批次大小
+    :return: 每秒写入行数
+    """
+    async with async_db_session() as db:
+        start = time.perf_counter()
+        for i in range(0, len(logs), batch_size):
+            await func(db, logs[i : i + batch_size])
+        elapsed = time.perf_counter() - start
+        await db.rollback()
+    return len(logs) / elapsed
+
+
+async def main(rows: int, batch_size: int) -> None:
+    logs = build_logs(rows)
+    cases = [('ORM create_models', orm_insert), ('Core executemany', core_insert)]
+    if async_engine.dialect.name == 'postgresql':
+        cases.append(('PostgreSQL COPY', copy_insert))
+
+    print(f'rows: {rows}, batch size: {batch_size}, dialect: {async_engine.dialect.name}')
+    print(f'{"case":<20} {"rows/s":>12}')
+    for name, func in cases:
+        rate = await measure(func, logs, batch_size)
+        print(f'{name:<20} {rate:>12.0f}')
+    await async_engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='操作日志批量写入性能基准测试')
+    parser.add_argument('--rows', type=int, default=20000, help='写入总行数')
+    parser.add_argument('--batch-size', type=int, default=100, help='批次大小')
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch_size))
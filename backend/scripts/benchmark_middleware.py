@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中间件性能基准测试
+
+对比 BaseHTTPMiddleware 与纯 ASGI 中间件每一层带来的请求延迟，不依赖数据库和 redis
+
+用法（命令行空间位于 backend 目录下）::
+
+    python scripts/benchmark_middleware.py --requests 5000 --layers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.common.log import log
+from backend.middleware.access_middleware import AccessMiddleware
+from backend.middleware.i18n_middleware import I18nMiddleware
+
+
+class BaseHTTPPassthroughMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware 空中间件"""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        return await call_next(request)
+
+
+class ASGIPassthroughMiddleware:
+    """纯 ASGI 空中间件"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
+
+
+async def endpoint(request: Request) -> Response:
+    return PlainTextResponse('ok')
+
+
+def build_app(middleware_classes: list[type]) -> Starlette:
+    """
+    构建测试应用
+
+    :param middleware_classes: 中间件类列表
+    :return:
+    """
+    return Starlette(
+        routes=[Route('/ping', endpoint)],
+        middleware=[Middleware(cls) for cls in middleware_classes],
+    )
+
+
+async def call(app: ASGIApp) -> None:
+    """
+    直接通过 ASGI 协议调用一次应用，避免 HTTP 客户端开销干扰结果
+
+    :param app: ASGI 应用
+    :return:
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/ping',
+        'raw_path': b'/ping',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), (b'accept-language', b'zh-CN,zh;q=0.9')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+        'state': {},
+    }
+    request_sent = False
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.sleep(3600)
+        return {'type': 'http.disconnect'}
+
+    async def send(message: Message) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app: ASGIApp, requests: int) -> tuple[float, float]:
+    """
+    测量单次请求延迟
+
+    :param app: ASGI 应用
+    :param requests: 请求次数
+    :return: 平均值和 p99（微秒）
+    """
+    for _ in range(min(requests, 200)):
+        await call(app)
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call(app)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return statistics.fmean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+async def main(requests: int, layers: int) -> None:
+    # 访问日志中间件每次请求均会写日志，基准测试时关闭输出
+    log.remove()
+
+    cases: list[tuple[str, list[type]]] = [('no middleware', [])]
+    for n in range(1, layers + 1):
+        cases.append((f'BaseHTTPMiddleware x{n}', [BaseHTTPPassthroughMiddleware] * n))
+        cases.append((f'ASGI middleware x{n}', [ASGIPassthroughMiddleware] * n))
+    cases.append(('Access + I18n (ASGI)', [AccessMiddleware, I18nMiddleware]))
+
+    baseline = None
+    print(f'{"case":<28} {"mean(us)":>10} {"p99(us)":>10} {"per layer(us)":>14}')
+    for name, middleware_classes in cases:
+        mean, p99 = await measure(build_app(middleware_classes), requests)
+        if baseline is None:
+            baseline = mean
+        per_layer = (mean - baseline) / len(middleware_classes) if middleware_classes else 0.0
+        print(f'{name:<28} {mean:>10.1f} {p99:>10.1f} {per_layer:>14.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='中间件性能基准测试')
+    parser.add_argument('--requests', type=int, default=5000, help='每组测试的请求次数')
+    parser.add_argument('--layers', type=int, default=4, help='最大中间件层数')
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.layers))
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+
+from typing import Any
+from urllib.parse import parse_qsl
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.types import Message, Receive
+
+# 可按文本记录的请求体类型
+TEXT_MEDIA_TYPES = {
+    'application/javascript',
+    'application/xml',
+    'application/x-yaml',
+}
+
+
+class RequestBodyCapture:
+    """
+    请求体捕获
+
+    包装 ASGI 接收通道，在下游读取请求体的同时复制不超过上限的数据，不会提前读取或额外缓存完整请求体；
+    multipart 请求边接收边解析，文件仅记录文件名、类型和大小，不保留文件内容
+    """
+
+    def __init__(self, receive: Receive, content_type: str, max_bytes: int) -> None:
+        """
+        初始化请求体捕获
+
+        :param receive: ASGI 接收通道
+        :param content_type: 请求头 Content-Type
+        :param max_bytes: 最大捕获字节数
+        :return:
+        """
+        media_type, params = parse_options_header(content_type)
+        self.receive = receive
+        self.media_type = media_type.decode('latin-1').lower()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.complete = False
+        self.truncated = False
+        self.buffer = bytearray()
+        self.form_data: dict[str, Any] = {}
+        self._parser: MultipartParser | None = None
+        if self.media_type == 'multipart/form-data' and b'boundary' in params:
+            self._parser = MultipartParser(
+                params[b'boundary'],
+                {
+                    'on_part_begin': self._on_part_begin,
+                    'on_part_data': self._on_part_data,
+                    'on_part_end': self._on_part_end,
+                    'on_header_field': self._on_header_field,
+                    'on_header_value': self._on_header_value,
+                    'on_header_end': self._on_header_end,
+                },
+            )
+            self._part_headers: dict[bytes, bytes] = {}
+            self._part_options: dict[bytes, bytes] = {}
+            self._header_field = bytearray()
+            self._header_value = bytearray()
+            self._part_size = 0
+            self._part_value = bytearray()
+            self._form_value_size = 0
+
+    async def __call__(self) -> Message:
+        """接收 ASGI 消息，并复制请求体数据"""
+        message = await self.receive()
+        if message['type'] == 'http.request':
+            self.feed(message.get('body', b''), message.get('more_body', False))
+        return message
+
+    def feed(self, chunk: bytes, more_body: bool) -> None:
+        """
+        写入请求体分块
+
+        :param chunk: 请求体分块
+        :param more_body: 是否还有后续分块
+        :return:
+        """
+        self.size += len(chunk)
+        if not more_body:
+            self.complete = True
+        if self._parser is not None:
+            try:
+                self._parser.write(chunk)
+            except Exception:
+                # 格式错误的 multipart 请求不再继续解析，已解析的字段保留
+                self._parser = None
+                self.truncated = True
+        elif not self.truncated:
+            if len(self.buffer) + len(chunk) > self.max_bytes:
+                self.truncated = True
+                self.buffer = bytearray()
+            else:
+                self.buffer.extend(chunk)
+
+    def get_body(self) -> tuple[str, Any] | None:
+        """
+        获取捕获的请求体
+
+        :return: 参数类型及内容，未读取请求体时返回 None
+        """
+        if self.size == 0:
+            return None
+        if self.media_type == 'multipart/form-data':
+            return 'form-data', self.form_data
+        if self.truncated or not self.complete:
+            return 'data', f'<{self.size} bytes, 超出记录上限或未完整读取>'
+        if self.media_type == 'application/json' or self.media_type.endswith('+json'):
+            try:
+                data = json.loads(self.buffer)
+            except ValueError:
+                return 'data', self.buffer.decode('utf-8', 'replace')
+            return 'json', data
+        if self.media_type == 'application/x-www-form-urlencoded':
+            return 'x-www-form-urlencoded', dict(parse_qsl(self.buffer.decode('latin-1'), keep_blank_values=True))
+        if self.media_type.startswith('text/') or self.media_type in TEXT_MEDIA_TYPES:
+            return 'data', self.buffer.decode('utf-8', 'replace')
+        return 'data', f'<{self.size} bytes, {self.media_type or "unknown"}>'
+
+    def _on_part_begin(self) -> None:
+        self._part_headers = {}
+        self._part_options = {}
+        self._part_size = 0
+        self._part_value = bytearray()
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._part_size += end - start
+        # 非文件字段的值计入捕获上限，文件内容不保留
+        if b'filename' not in self._part_options and not self.truncated:
+            if self._form_value_size + end - start > self.max_bytes:
+                self.truncated = True
+            else:
+                self._part_value.extend(data[start:end])
+                self._form_value_size += end - start
+
+    def _on_part_end(self) -> None:
+        name = self._part_options.get(b'name', b'').decode('utf-8', 'replace')
+        filename = self._part_options.get(b'filename')
+        if filename is not None:
+            self.form_data[name] = {
+                'filename': filename.decode('utf-8', 'replace'),
+                'content_type': self._part_headers.get(b'content-type', b'').decode('latin-1'),
+                'size': self._part_size,
+            }
+        elif len(self._part_value) == self._part_size:
+            self.form_data[name] = self._part_value.decode('utf-8', 'replace')
+        else:
+            self.form_data[name] = f'<{self._part_size} bytes, 超出记录上限>'
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field.extend(data[start:end])
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value.extend(data[start:end])
+
+    def _on_header_end(self) -> None:
+        field = bytes(self._header_field).lower()
+        self._part_headers[field] = bytes(self._header_value)
+        if field == b'content-disposition':
+            _, self._part_options = parse_options_header(self._part_headers[field])
+        self._header_field.clear()
+        self._header_value.clear()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from typing import Any
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败次数达到阈值后熔断，熔断期间直接拒绝调用；恢复时间过后放行一次试探调用，
+    试探成功则恢复，失败则重新熔断
+    """
+
+    closed = 'closed'
+    open = 'open'
+    half_open = 'half_open'
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float) -> None:
+        """
+        初始化熔断器
+
+        :param failure_threshold: 触发熔断的连续失败次数
+        :param recovery_timeout: 熔断后等待恢复的时间（秒）
+        :return:
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.closed
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.probe = 0
+        self._probe_seq = 0
+
+    def allow(self) -> int | None:
+        """
+        申请调用
+
+        熔断恢复时间过后仅放行一次试探调用并为其分配编号，仅试探调用的持有者可以结束半开状态
+
+        :return: 调用令牌，None 表示拒绝调用，0 表示普通调用，其余为试探调用编号
+        """
+        if self.state == self.closed:
+            return 0
+        if self.state == self.open and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            # 结果返回前其余调用仍被拒绝
+            self._probe_seq += 1
+            self.probe = self._probe_seq
+            self.state = self.half_open
+            return self.probe
+        self.rejected += 1
+        return None
+
+    def is_probe(self, token: int) -> bool:
+        """
+        是否为当前的试探调用
+
+        :param token: 调用令牌
+        :return:
+        """
+        return token != 0 and self.state == self.half_open and token == self.probe
+
+    def record_success(self, token: int) -> None:
+        """
+        记录调用成功
+
+        :param token: 调用令牌
+        :return:
+        """
+        if self.is_probe(token):
+            self.state = self.closed
+            self.failures = 0
+        elif token == 0 and self.state == self.closed:
+            self.failures = 0
+
+    def record_failure(self, token: int) -> None:
+        """
+        记录调用失败
+
+        :param token: 调用令牌
+        :return:
+        """
+        if self.is_probe(token):
+            self.state = self.open
+            self.opened_at = time.monotonic()
+        elif token == 0 and self.state == self.closed:
+            # 熔断前已放行的普通调用不影响熔断及试探状态
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.state = self.open
+                self.opened_at = time.monotonic()
+
+    def release(self, token: int) -> None:
+        """
+        结束调用，试探调用未记录成功或失败（如被取消、出现非预期异常）时恢复为熔断状态
+
+        熔断时间不重置，下一次调用将重新试探，避免熔断器停留在半开状态而拒绝所有调用
+
+        :param token: 调用令牌
+        :return:
+        """
+        if self.is_probe(token):
+            self.state = self.open
+
+    def stats(self) -> dict[str, Any]:
+        """获取熔断器统计信息"""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'rejected': self.rejected,
+        }
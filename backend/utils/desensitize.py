@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Any, Callable, Iterable
+
+from backend.common.enums import OperaLogCipherType
+from backend.utils.encrypt import AESCipher, ItsDCipher, Md5Cipher
+
+
+class Desensitizer:
+    """
+    参数脱敏器
+
+    初始化时根据敏感键和加密类型预先构建加密函数，加密器实例全局复用；
+    脱敏时递归遍历嵌套的字典和列表，返回新的数据结构，不修改原始参数
+    """
+
+    def __init__(self, keys: Iterable[str], cipher_type: int, secret_key: str) -> None:
+        """
+        初始化参数脱敏器
+
+        :param keys: 需要脱敏的参数键
+        :param cipher_type: 加密类型，参考 OperaLogCipherType，其他值替换为 ******
+        :param secret_key: 密钥，16 进制字符串
+        :return:
+        """
+        self.keys = frozenset(keys)
+        self.encrypt = self._build_encrypt(cipher_type, secret_key)
+
+    @staticmethod
+    def _build_encrypt(cipher_type: int, secret_key: str) -> Callable[[Any], Any] | None:
+        """
+        构建加密函数
+
+        :param cipher_type: 加密类型
+        :param secret_key: 密钥
+        :return: 不加密时返回 None
+        """
+        match cipher_type:
+            case OperaLogCipherType.aes:
+                aes_cipher = AESCipher(secret_key)
+                return lambda value: aes_cipher.encrypt(value).hex()
+            case OperaLogCipherType.md5:
+                return Md5Cipher.encrypt
+            case OperaLogCipherType.itsdangerous:
+                return ItsDCipher(secret_key).encrypt
+            case OperaLogCipherType.plan:
+                return None
+            case _:
+                return lambda value: '******'
+
+    def __call__(self, data: Any) -> Any:
+        """
+        脱敏处理
+
+        :param data: 需要脱敏的参数
+        :return:
+        """
+        if self.encrypt is None or not self.keys:
+            return data
+        return self._walk(data)
+
+    def _walk(self, data: Any) -> Any:
+        if isinstance(data, dict):
+            return {key: self.encrypt(value) if key in self.keys else self._walk(value) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self._walk(item) for item in data]
+        return data
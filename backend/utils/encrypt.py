@@ -24,6 +24,7 @@ class AESCipher:
         :return:
         """
         self.key = key if isinstance(key, bytes) else bytes.fromhex(key)
+        self.algorithm = algorithms.AES(self.key)
 
     def encrypt(self, plaintext: bytes | str) -> bytes:
         """
@@ -35,7 +36,7 @@ class AESCipher:
         if not isinstance(plaintext, bytes):
             plaintext = str(plaintext).encode('utf-8')
         iv = os.urandom(16)
-        cipher = Cipher(algorithms.AES(self.key), modes.CBC(iv), backend=backend)
+        cipher = Cipher(self.algorithm, modes.CBC(iv), backend=backend)
         encryptor = cipher.encryptor()
         padder = padding.PKCS7(cipher.algorithm.block_size).padder()  # type: ignore
         padded_plaintext = padder.update(plaintext) + padder.finalize()
@@ -52,7 +53,7 @@ class AESCipher:
         ciphertext = ciphertext if isinstance(ciphertext, bytes) else bytes.fromhex(ciphertext)
         iv = ciphertext[:16]
         ciphertext = ciphertext[16:]
-        cipher = Cipher(algorithms.AES(self.key), modes.CBC(iv), backend=backend)
+        cipher = Cipher(self.algorithm, modes.CBC(iv), backend=backend)
         decryptor = cipher.decryptor()
         unpadder = padding.PKCS7(cipher.algorithm.block_size).unpadder()  # type: ignore
         padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
@@ -89,6 +90,7 @@ class ItsDCipher:
         :return:
         """
         self.key = key if isinstance(key, bytes) else bytes.fromhex(key)
+        self.serializer = URLSafeSerializer(self.key)
 
     def encrypt(self, plaintext: Any) -> str:
         """
@@ -97,9 +99,8 @@ class ItsDCipher:
         :param plaintext: 加密前的明文
         :return:
         """
-        serializer = URLSafeSerializer(self.key)
         try:
-            ciphertext = serializer.dumps(plaintext)
+            ciphertext = self.serializer.dumps(plaintext)
         except Exception as e:
             log.error(f'ItsDangerous encrypt failed: {e}')
             ciphertext = Md5Cipher.encrypt(plaintext)
@@ -112,9 +113,8 @@ class ItsDCipher:
         :param ciphertext: 解密前的密文
         :return:
         """
-        serializer = URLSafeSerializer(self.key)
         try:
-            plaintext = serializer.loads(ciphertext)
+            plaintext = self.serializer.loads(ciphertext)
         except Exception as e:
             log.error(f'ItsDangerous decrypt failed: {e}')
             plaintext = ciphertext
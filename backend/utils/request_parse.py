@@ -1,17 +1,51 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import mmap
+import threading
+
 import httpx
 
-from asgiref.sync import sync_to_async
 from fastapi import Request
 from ip2loc import XdbSearcher
 from user_agents import parse
 
+from backend.common.cache import LocalCache
 from backend.common.dataclasses import IpInfo, UserAgentInfo
 from backend.common.log import log
 from backend.core.conf import settings
 from backend.core.path_conf import IP2REGION_XDB
 from backend.database.redis import redis_client
+from backend.utils.circuit_breaker import CircuitBreaker
+from backend.utils.singleflight import SingleFlight
+
+# IP 属地进程内缓存，位于 redis 缓存之前
+ip_location_local_cache: LocalCache[str, IpInfo] = LocalCache(
+    maxsize=settings.IP_LOCATION_LOCAL_CACHE_MAXSIZE,
+    ttl=settings.IP_LOCATION_LOCAL_CACHE_EXPIRE_SECONDS,
+)
+
+# 用户代理解析结果进程内缓存，实际流量中的用户代理种类有限，命中率通常较高
+user_agent_local_cache: LocalCache[str, UserAgentInfo] = LocalCache(maxsize=settings.USER_AGENT_LOCAL_CACHE_MAXSIZE)
+
+# 在线获取 IP 属地失败的进程内缓存，避免短时间内重复请求
+ip_location_negative_cache: LocalCache[str, bool] = LocalCache(
+    maxsize=settings.IP_LOCATION_LOCAL_CACHE_MAXSIZE,
+    ttl=settings.IP_LOCATION_ONLINE_NEGATIVE_EXPIRE_SECONDS,
+)
+
+# 同一 IP 并发的在线获取请求合并为一次
+ip_location_flight = SingleFlight()
+
+# 在线获取 IP 属地熔断器，熔断期间降级为离线获取
+ip_location_circuit_breaker = CircuitBreaker(
+    failure_threshold=settings.IP_LOCATION_ONLINE_FAILURE_THRESHOLD,
+    recovery_timeout=settings.IP_LOCATION_ONLINE_RECOVERY_SECONDS,
+)
+
+_ip_location_client: httpx.AsyncClient | None = None
+
+_xdb_searcher: XdbSearcher | None = None
+_xdb_searcher_lock = threading.Lock()
 
 
 def get_request_ip(request: Request) -> str:
@@ -35,6 +69,62 @@ def get_request_ip(request: Request) -> str:
     return request.client.host
 
 
+def get_ip_location_client() -> httpx.AsyncClient:
+    """获取在线 IP 属地查询客户端，进程内复用连接池及长连接"""
+    global _ip_location_client
+    if _ip_location_client is None or _ip_location_client.is_closed:
+        _ip_location_client = httpx.AsyncClient(
+            timeout=settings.IP_LOCATION_ONLINE_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.IP_LOCATION_ONLINE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.IP_LOCATION_ONLINE_MAX_CONNECTIONS,
+            ),
+        )
+    return _ip_location_client
+
+
+async def close_ip_location_client() -> None:
+    """关闭在线 IP 属地查询客户端"""
+    global _ip_location_client
+    if _ip_location_client is not None:
+        await _ip_location_client.aclose()
+        _ip_location_client = None
+
+
+async def request_location_online(ip: str, user_agent: str, token: int) -> dict | None:
+    """
+    请求在线 IP 属地接口
+
+    :param ip: IP 地址
+    :param user_agent: 用户代理字符串
+    :param token: 熔断器调用令牌
+    :return:
+    """
+    ip_api_url = settings.IP_LOCATION_ONLINE_URL.format(ip=ip)
+    headers = {'User-Agent': user_agent}
+    try:
+        response = await get_ip_location_client().get(ip_api_url, headers=headers)
+    except Exception as e:
+        log.error(f'在线获取 IP 地址属地失败，错误信息：{e}')
+        ip_location_circuit_breaker.record_failure(token)
+        ip_location_negative_cache.set(ip, True)
+        return None
+
+    if response.status_code != 200:
+        log.error(f'在线获取 IP 地址属地失败，响应状态码：{response.status_code}')
+        ip_location_circuit_breaker.record_failure(token)
+        ip_location_negative_cache.set(ip, True)
+        return None
+
+    ip_location_circuit_breaker.record_success(token)
+    location_info = response.json()
+    # 接口可用，但无法解析此 IP（如内网地址）
+    if location_info.get('status') == 'fail':
+        ip_location_negative_cache.set(ip, True)
+        return None
+    return location_info
+
+
 async def get_location_online(ip: str, user_agent: str) -> dict | None:
     """
     在线获取 IP 地址属地，无法保证可用性，准确率较高
@@ -43,19 +133,37 @@ async def get_location_online(ip: str, user_agent: str) -> dict | None:
     :param user_agent: 用户代理字符串
     :return:
     """
-    async with httpx.AsyncClient(timeout=3) as client:
-        ip_api_url = f'http://ip-api.com/json/{ip}?lang=zh-CN'
-        headers = {'User-Agent': user_agent}
-        try:
-            response = await client.get(ip_api_url, headers=headers)
-            if response.status_code == 200:
-                return response.json()
-        except Exception as e:
-            log.error(f'在线获取 IP 地址属地失败，错误信息：{e}')
-            return None
+    if ip_location_negative_cache.get(ip):
+        return None
+    token = ip_location_circuit_breaker.allow()
+    if token is None:
+        return None
+    try:
+        return await ip_location_flight.do(ip, lambda: request_location_online(ip, user_agent, token))
+    finally:
+        # 试探调用被取消或并入其他调用时不会记录结果，需由持有者释放半开状态
+        ip_location_circuit_breaker.release(token)
+
+
+def get_xdb_searcher() -> XdbSearcher:
+    """
+    获取离线 IP 数据库查询器
+
+    xdb 文件以只读方式内存映射，每个进程仅加载一次，多个 worker 进程通过操作系统页缓存共享同一份物理内存；
+    基于内存内容的查询不持有文件句柄和游标，同一查询器可在多线程及协程间复用
+
+    :return:
+    """
+    global _xdb_searcher
+    if _xdb_searcher is None:
+        with _xdb_searcher_lock:
+            if _xdb_searcher is None:
+                with open(IP2REGION_XDB, 'rb') as f:
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                _xdb_searcher = XdbSearcher(contentBuff=content)
+    return _xdb_searcher
 
 
-@sync_to_async
 def get_location_offline(ip: str) -> dict | None:
     """
     离线获取 IP 地址属地，无法保证准确率，100% 可用
@@ -64,10 +172,7 @@ def get_location_offline(ip: str) -> dict | None:
     :return:
     """
     try:
-        cb = XdbSearcher.loadContentFromFile(dbfile=IP2REGION_XDB)
-        searcher = XdbSearcher(contentBuff=cb)
-        data = searcher.search(ip)
-        searcher.close()
+        data = get_xdb_searcher().search(ip)
         data = data.split('|')
         return {
             'country': data[0] if data[0] != '0' else None,
@@ -81,23 +186,49 @@ def get_location_offline(ip: str) -> dict | None:
 
 async def parse_ip_info(request: Request) -> IpInfo:
     """
-    解析请求的 IP 信息
+    解析请求的 IP 信息，结果缓存至请求状态，同一请求内仅解析一次
+
+    :param request: FastAPI 请求对象
+    :return:
+    """
+    ip_info = getattr(request.state, 'ip_info', None)
+    if ip_info is None:
+        ip_info = await get_ip_info(request)
+        request.state.ip_info = ip_info
+        request.state.country = ip_info.country
+        request.state.region = ip_info.region
+        request.state.city = ip_info.city
+    return ip_info
+
+
+async def get_ip_info(request: Request) -> IpInfo:
+    """
+    获取请求的 IP 信息
 
     :param request: FastAPI 请求对象
     :return:
     """
     country, region, city = None, None, None
     ip = get_request_ip(request)
+    ip_info = ip_location_local_cache.get(ip)
+    if ip_info is not None:
+        return ip_info
+
     location = await redis_client.get(f'{settings.IP_LOCATION_REDIS_PREFIX}:{ip}')
     if location:
         country, region, city = location.split('|')
-        return IpInfo(ip=ip, country=country, region=region, city=city)
+        ip_info = IpInfo(ip=ip, country=country, region=region, city=city)
+        ip_location_local_cache.set(ip, ip_info)
+        return ip_info
 
     location_info = None
     if settings.IP_LOCATION_PARSE == 'online':
         location_info = await get_location_online(ip, request.headers.get('User-Agent'))
+        # 在线获取失败或已熔断时，降级为离线获取
+        if location_info is None:
+            location_info = get_location_offline(ip)
     elif settings.IP_LOCATION_PARSE == 'offline':
-        location_info = await get_location_offline(ip)
+        location_info = get_location_offline(ip)
 
     if location_info:
         country = location_info.get('country')
@@ -108,7 +239,10 @@ async def parse_ip_info(request: Request) -> IpInfo:
             f'{country}|{region}|{city}',
             ex=settings.IP_LOCATION_EXPIRE_SECONDS,
         )
-    return IpInfo(ip=ip, country=country, region=region, city=city)
+    ip_info = IpInfo(ip=ip, country=country, region=region, city=city)
+    if location_info:
+        ip_location_local_cache.set(ip, ip_info)
+    return ip_info
 
 
 def parse_user_agent_info(request: Request) -> UserAgentInfo:
@@ -119,8 +253,14 @@ def parse_user_agent_info(request: Request) -> UserAgentInfo:
     :return:
     """
     user_agent = request.headers.get('User-Agent')
+    ua_info = user_agent_local_cache.get(user_agent)
+    if ua_info is not None:
+        return ua_info
+
     _user_agent = parse(user_agent)
     os = _user_agent.get_os()
     browser = _user_agent.get_browser()
     device = _user_agent.get_device()
-    return UserAgentInfo(user_agent=user_agent, device=device, os=os, browser=browser)
+    ua_info = UserAgentInfo(user_agent=user_agent, device=device, os=os, browser=browser)
+    user_agent_local_cache.set(user_agent, ua_info)
+    return ua_info
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    并发调用合并
+
+    相同键的并发调用只会执行一次，其余调用者共享同一结果（或异常），
+    执行任务独立于调用者，单个调用者取消不会影响其他调用者
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行调用，相同键的调用正在执行时，等待其结果
+
+        :param key: 调用键
+        :param func: 异步调用函数
+        :return:
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        """
+        调用完成回调
+
+        :param key: 调用键
+        :param task: 执行任务
+        :return:
+        """
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 所有调用者均已取消时，避免出现未获取异常的警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        """获取调用合并统计信息"""
+        return {
+            'in_flight': len(self._calls),
+            'executions': self.executions,
+            'shared': self.shared,
+        }
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import math
+
+from typing import Any
+
+# 分位数相对误差
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+# 不大于此值的数据计入零值桶
+SKETCH_MIN_VALUE = 1e-3
+
+_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class QuantileSketch:
+    """
+    可合并的分位数草图
+
+    参考 DDSketch，按对数间隔分桶计数，分位数估算值的相对误差不超过 SKETCH_RELATIVE_ACCURACY；
+    相同精度的草图可直接按桶累加合并，适用于预聚合后再按任意时间范围、维度汇总分位数
+    """
+
+    __slots__ = ('bins', 'zero_count', 'count')
+
+    def __init__(self, bins: dict[int, int] | None = None, zero_count: int = 0) -> None:
+        """
+        初始化分位数草图
+
+        :param bins: 分桶计数
+        :param zero_count: 零值桶计数
+        :return:
+        """
+        self.bins: dict[int, int] = bins or {}
+        self.zero_count = zero_count
+        self.count = zero_count + sum(self.bins.values())
+
+    def add(self, value: float) -> None:
+        """
+        添加数据
+
+        :param value: 数据，需为非负数
+        :return:
+        """
+        self.count += 1
+        if value <= SKETCH_MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[index] = self.bins.get(index, 0) + 1
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        合并草图
+
+        :param other: 其他草图
+        :return:
+        """
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def quantile(self, q: float) -> float | None:
+        """
+        估算分位数
+
+        :param q: 分位，0 ~ 1
+        :return: 无数据时返回 None
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return 2 * _GAMMA**index / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.bins) / (_GAMMA + 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        """序列化为可存储的字典"""
+        return {'z': self.zero_count, 'b': [[index, count] for index, count in sorted(self.bins.items())]}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> 'QuantileSketch':
+        """
+        从字典反序列化
+
+        :param data: to_dict 的结果
+        :return:
+        """
+        if not data:
+            return cls()
+        return cls({int(index): int(count) for index, count in data.get('b', [])}, int(data.get('z', 0)))